@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""benchmarks
+    * pydorkの解析処理(parser)のベンチマーク.
+    * 通信は発生しない. パッケージには含めない.
+
+Examples:
+    # 合成したコーパスで計測し、結果をjsonで保存
+    $ python -m benchmarks.bench_parser --output before.json
+
+    # `pydork search --record` で記録したレスポンスで計測し、前回の結果と比較
+    $ python -m benchmarks.bench_parser --archive serps.jsonl.gz --compare before.json
+"""
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""bench_parser
+    * 各検索エンジンの解析処理(`get_links`, `get_image_links`, `get_suggest_list`, `check_recaptcha`, `processings_elist`)を個別に計測する.
+    * 結果(pages/sec, µs/page, µs/result, peak memory)はjsonで出力し、`--compare` で前回の結果と比較できる.
+    * 通信は発生しない. Bing/Baiduの `processings_elist` はリダイレクト先の取得(通信)を行うため計測対象外とし、
+      `get_links` の計測時も `CommonEngine.processings_elist` に置き換えて計測する.
+
+Examples:
+    $ python -m benchmarks.bench_parser --output before.json
+    $ python -m benchmarks.bench_parser --compare before.json --threshold 1.2
+"""
+
+import argparse
+import functools
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+
+from time import perf_counter
+
+import lxml.etree
+
+from pydork.engine import SearchEngine, ENGINES
+from pydork.engine_common import CommonEngine
+
+from .corpus import generate_corpus, load_archive
+
+
+# processings_elistで通信が発生する検索エンジン
+NETWORK_BOUND_ENGINES = ['baidu', 'bing']
+
+# get_image_linksにBeautifulSoupではなくhtml(文字列)を渡す検索エンジン
+IMAGE_LINKS_HTML_ENGINES = ['google']
+
+
+# 検索結果の件数を取得する
+def count_results(result):
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values())
+    elif isinstance(result, tuple):
+        return len(result[0])
+    elif isinstance(result, list):
+        return len(result)
+
+    return 0
+
+
+# 検索エンジン・検索タイプごとに、計測する関数と引数のlistを生成する
+def gen_benchmarks(engine_name: str, search_type: str, pages: list):
+    """gen_benchmarks
+
+    検索エンジン・検索タイプごとに、計測する関数と各ページの引数を生成する.
+    引数の準備(セレクタの設定, elinksの取得など)は計測前に行う.
+
+    Args:
+        engine_name (str): 検索エンジン名.
+        search_type (str): 検索タイプ(text, image, suggest).
+        pages (list): ページのlist.
+
+    Returns:
+        list: `[(関数名, 検索エンジンのClass, 関数, 引数のlist), ...]`
+    """
+
+    se = SearchEngine()
+    se.set(engine_name)
+    engine = se.ENGINE
+
+    if engine_name in NETWORK_BOUND_ENGINES:
+        engine.processings_elist = functools.partial(  # type: ignore
+            CommonEngine.processings_elist, engine)
+
+    benchmarks = []
+    if search_type == 'text':
+        # NOTE: get_links内でセレクタが設定されるため、一度実行しておく
+        engine.get_links(pages[0]['url'], pages[0]['html'], 'text')
+
+        benchmarks.append((
+            'get_links', engine.get_links,
+            [(page['url'], page['html'], 'text') for page in pages]
+        ))
+        benchmarks.append((
+            'check_recaptcha', engine.check_recaptcha,
+            [(page['html'],) for page in pages]
+        ))
+
+        # processings_elistを実装している(通信を行わない)検索エンジンのみ
+        if type(engine).processings_elist is not CommonEngine.processings_elist and \
+                engine_name not in NETWORK_BOUND_ENGINES:
+            elists = [
+                engine.get_text_links(engine.parse_html(page['html']).tree)
+                for page in pages
+            ]
+            benchmarks.append(
+                ('processings_elist', engine.processings_elist, elists))
+
+    elif search_type == 'image':
+        engine.get_links(pages[0]['url'], pages[0]['html'], 'image')
+
+        benchmarks.append((
+            'get_links', engine.get_links,
+            [(page['url'], page['html'], 'image') for page in pages]
+        ))
+
+        # get_image_linksを実装している検索エンジンのみ
+        if type(engine).get_image_links is not CommonEngine.get_image_links:
+            if engine_name in IMAGE_LINKS_HTML_ENGINES:
+                args = [(page['html'],) for page in pages]
+            else:
+                args = [(engine.parse_html(page['html']).soup,) for page in pages]
+
+            benchmarks.append(('get_image_links', engine.get_image_links, args))
+
+    elif search_type == 'suggest':
+        benchmarks.append((
+            'get_suggest_list', engine.get_suggest_list,
+            [(dict(), '', page['html']) for page in pages]
+        ))
+
+    return [(name, engine, func, args) for name, func, args in benchmarks]
+
+
+# 1つの関数を計測する
+def run_benchmark(engine: CommonEngine, func, args_list: list, repeat: int):
+    """run_benchmark
+
+    全ページに対して関数を実行する処理をrepeat回行い、最も速かった時間で結果を返す.
+    解析結果の使い回しを避けるため、1ページごとに `engine.DOCUMENT` をリセットする.
+
+    Args:
+        engine (CommonEngine): 検索エンジンのClass.
+        func (function): 計測する関数.
+        args_list (list): 各ページの引数のlist.
+        repeat (int): 繰り返し回数.
+
+    Returns:
+        dict: 計測結果.
+    """
+
+    def run_once():
+        results = 0
+        for args in args_list:
+            engine.DOCUMENT = None
+            results += count_results(func(*args))
+        return results
+
+    # warmup
+    results = run_once()
+
+    # 処理時間
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        run_once()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # ピークメモリ(処理時間とは別に計測する)
+    tracemalloc.start()
+    run_once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pages = len(args_list)
+    return {
+        'pages': pages,
+        'results': results,
+        'seconds': best,
+        'pages_per_sec': pages / best if best else None,
+        'us_per_page': best * 1e6 / pages,
+        'us_per_result': best * 1e6 / results if results else None,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+# 実行環境の情報を取得する
+def get_meta(args: argparse.Namespace):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    corpus = 'archive:{0}'.format(args.archive) if args.archive else \
+        'synthetic(pages={0}, seed={1})'.format(args.pages, args.seed)
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'lxml': '.'.join(str(v) for v in lxml.etree.LXML_VERSION),
+        'platform': platform.platform(),
+        'corpus': corpus,
+        'repeat': args.repeat,
+    }
+
+
+# 前回の結果と比較する
+def compare(results: dict, baseline: dict, threshold: float):
+    """compare
+
+    前回の結果とµs/pageを比較し、threshold倍を超えて遅くなったものを返す.
+
+    Args:
+        results (dict): 今回の計測結果.
+        baseline (dict): 前回の計測結果.
+        threshold (float): 許容する比率.
+
+    Returns:
+        list: threshold倍を超えて遅くなった計測項目のlist.
+    """
+
+    slower = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        ratio = result['us_per_page'] / baseline[key]['us_per_page']
+        result['ratio'] = ratio
+
+        if ratio > threshold:
+            slower.append(key)
+
+    return slower
+
+
+def print_table(results: dict):
+    print('{0:<40} {1:>10} {2:>12} {3:>12} {4:>12} {5:>8}'.format(
+        'benchmark', 'pages/sec', 'us/page', 'us/result', 'peak(KB)', 'ratio'), file=sys.stderr)
+
+    for key, r in results.items():
+        print('{0:<40} {1:>10.1f} {2:>12.1f} {3:>12} {4:>12.1f} {5:>8}'.format(
+            key,
+            r['pages_per_sec'] or 0,
+            r['us_per_page'],
+            '-' if r['us_per_result'] is None else '{0:.2f}'.format(
+                r['us_per_result']),
+            r['peak_memory_kb'],
+            '{0:.2f}'.format(r['ratio']) if 'ratio' in r else '-',
+        ), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pydork parser benchmark')
+    parser.add_argument('--pages', type=int, default=20,
+                        help='pages per engine and search type (synthetic corpus)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed (synthetic corpus)')
+    parser.add_argument('--archive', type=str, default='',
+                        help='use responses recorded with `pydork search --record` instead of the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of repeats (the fastest is reported)')
+    parser.add_argument('--engine', action='append', choices=ENGINES,
+                        help='engine to benchmark (default: all)')
+    parser.add_argument('--output', type=str, default='',
+                        help='write the result json to the file (default: stdout)')
+    parser.add_argument('--compare', type=str, default='',
+                        help='compare with a previous result json')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='exit with 1 if any benchmark is slower than baseline * threshold')
+    args = parser.parse_args()
+
+    if args.archive:
+        corpus = load_archive(args.archive)
+    else:
+        corpus = generate_corpus(args.pages, args.seed)
+
+    # 検索エンジン・検索タイプごとにまとめる
+    groups = dict()
+    for page in corpus:
+        if args.engine and page['engine'] not in args.engine:
+            continue
+        groups.setdefault((page['engine'], page['type']), []).append(page)
+
+    results = dict()
+    for (engine_name, search_type), pages in sorted(groups.items()):
+        for name, engine, func, args_list in gen_benchmarks(engine_name, search_type, pages):
+            key = '{0}.{1}.{2}'.format(engine_name, search_type, name)
+            results[key] = run_benchmark(engine, func, args_list, args.repeat)
+
+    slower = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        slower = compare(results, baseline, args.threshold)
+
+    print_table(results)
+
+    output = json.dumps(
+        {'meta': get_meta(args), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if slower:
+        print('slower than baseline: {0}'.format(
+            ', '.join(slower)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
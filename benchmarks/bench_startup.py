@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""bench_startup
+    * `python -X importtime` で、pydorkの起動時(import, CLIの引数解析, 検索エンジンの指定)の読み込み時間を計測する.
+    * 結果(import時間の中央値, 読み込んだモジュール数, 読み込み時間の長いモジュール)はjsonで出力し、`--compare` で前回の結果と比較できる.
+    * 起動時(import, CLIの引数解析)のimport時間が、以前のバージョンで起動時に読み込んでいたモジュール(`BUDGET_STATEMENT`)の
+      import時間 * `--budget` を超えた場合は終了コード1で終了する.
+    * 通信は発生しない.
+    * `importlib.import_module` で読み込む検索エンジンのモジュール自体は `-X importtime` に出力されないが、
+      そこから読み込んだモジュールは最上位の階層として出力されるため、import時間には含まれる.
+
+Examples:
+    $ python -m benchmarks.bench_startup --budget 1.0
+    $ python -m benchmarks.bench_startup --output before.json
+    $ python -m benchmarks.bench_startup --compare before.json --threshold 1.2
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+
+
+# 計測する処理
+STATEMENTS = {
+    'import': 'import pydork',
+    'cli_help': 'import sys, pydork; sys.argv = ["pydork", "search", "-h"]; pydork.main()',
+}
+for _engine in ['baidu', 'bing', 'duckduckgo', 'google', 'yahoo']:
+    STATEMENTS['set.' + _engine] = \
+        'from pydork.engine import SearchEngine; SearchEngine().set("{0}")'.format(_engine)
+
+# 起動時のimport時間の予算の基準(以前のバージョンで `import pydork` 時に読み込んでいたモジュール)と、予算を適用する処理
+BUDGET_STATEMENT = 'import requests, bs4'
+BUDGET_KEYS = ['import', 'cli_help']
+
+
+# `-X importtime` の出力を解析する
+def parse_importtime(stderr: str):
+    """parse_importtime
+
+    Args:
+        stderr (str): `python -X importtime` の標準エラー出力.
+
+    Returns:
+        dict: モジュール名をkeyとした(self(µs), cumulative(µs), 階層)のdict.
+    """
+
+    modules = dict()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+
+    return modules
+
+
+# 1つの処理を計測する
+def run_benchmark(statement: str, repeat: int):
+    """run_benchmark
+
+    新しいプロセスで処理をrepeat回実行し、import時間の中央値と、読み込み時間の長いモジュールを返す.
+
+    Args:
+        statement (str): 実行する処理.
+        repeat (int): 繰り返し回数.
+
+    Returns:
+        dict: 計測結果.
+    """
+
+    totals = []
+    modules = dict()
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            capture_output=True, text=True,
+        )
+        modules = parse_importtime(proc.stderr)
+
+        # 最上位の階層のcumulativeの合計をimport時間とする
+        totals.append(sum(c for _, c, depth in modules.values() if depth == 0))
+
+    slowest = sorted(
+        ((name, c) for name, (_, c, _) in modules.items() if name.startswith('pydork')),
+        key=lambda v: -v[1])[:10]
+
+    return {
+        'us_import': statistics.median(totals),
+        'modules': len(modules),
+        'slowest_pydork_modules': dict(slowest),
+    }
+
+
+# 前回の結果と比較する
+def compare(results: dict, baseline: dict, threshold: float):
+    slower = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+
+        ratio = result['us_import'] / baseline[key]['us_import']
+        result['ratio'] = ratio
+
+        if ratio > threshold:
+            slower.append(key)
+
+    return slower
+
+
+# 予算を超えた処理を返す
+def check_budget(results: dict, reference: dict, budget: float):
+    over = []
+    for key in BUDGET_KEYS:
+        if results[key]['us_import'] > reference['us_import'] * budget:
+            over.append(key)
+
+    return over
+
+
+def print_table(results: dict):
+    print('{0:<20} {1:>12} {2:>8} {3:>8}'.format(
+        'benchmark', 'import(ms)', 'modules', 'ratio'), file=sys.stderr)
+
+    for key, r in results.items():
+        print('{0:<20} {1:>12.1f} {2:>8} {3:>8}'.format(
+            key,
+            r['us_import'] / 1000,
+            r['modules'],
+            '{0:.2f}'.format(r['ratio']) if 'ratio' in r else '-',
+        ), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='pydork startup benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of repeats (the median is reported)')
+    parser.add_argument('--output', type=str, default='',
+                        help='write the result json to the file (default: stdout)')
+    parser.add_argument('--compare', type=str, default='',
+                        help='compare with a previous result json')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='exit with 1 if any benchmark is slower than baseline * threshold')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='exit with 1 if the startup is slower than the import of the modules loaded by the previous version * budget')
+    args = parser.parse_args()
+
+    results = dict()
+    for key, statement in STATEMENTS.items():
+        results[key] = run_benchmark(statement, args.repeat)
+
+    slower = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        slower = compare(results, baseline, args.threshold)
+
+    reference = run_benchmark(BUDGET_STATEMENT, args.repeat)
+    over_budget = check_budget(results, reference, args.budget)
+
+    print_table(results)
+    print('budget: {0:.1f} ms ({1} * {2})'.format(
+        reference['us_import'] * args.budget / 1000, BUDGET_STATEMENT, args.budget), file=sys.stderr)
+
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'us_budget': reference['us_import'] * args.budget,
+    }
+    output = json.dumps({'meta': meta, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if slower:
+        print('slower than baseline: {0}'.format(
+            ', '.join(slower)), file=sys.stderr)
+
+    if over_budget:
+        print('over the budget: {0}'.format(
+            ', '.join(over_budget)), file=sys.stderr)
+
+    if slower or over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
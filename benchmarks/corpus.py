@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""corpus
+    * ベンチマークで使用するレスポンス(コーパス)を生成・読み込むモジュール.
+    * `generate_corpus` は各検索エンジンの現在のセレクタ・レスポンス形式に合わせたページを、seedから決定的に生成する.
+    * `load_archive` は `pydork search --record` で記録したアーカイブファイルを読み込む.
+"""
+
+import gzip
+import html as html_escape
+import json
+import random
+
+from urllib import parse
+
+from pydork.engine import SearchEngine, ENGINES
+from pydork.engine_google import RPC_ID
+
+
+# 生成するテキストに使用する単語
+WORDS = [
+    'pydork', 'search', 'engine', 'zelda', 'mario', 'python', 'dork', 'scraping',
+    'lxml', 'parser', 'benchmark', 'result', 'link', 'title', 'nintendo', 'switch',
+    'game', 'news', 'wiki', 'release', 'review', 'guide', 'download', 'update',
+    '検索', '結果', 'ゼルダ', 'マリオ', '攻略', 'ニュース', '最新', '情報',
+]
+
+# 検索エンジンごとの1ページあたりの検索結果数(text, image, suggest)
+RESULTS_PER_PAGE = {
+    'baidu': (10, 30, 10),
+    'bing': (10, 35, 8),
+    'duckduckgo': (30, 100, 8),
+    'google': (100, 100, 10),
+    'yahoo': (10, 60, 10),
+}
+
+
+def gen_sentence(rng: random.Random, length: int):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def gen_url(rng: random.Random, n: int):
+    return 'https://{0}.example.com/{1}/{2}.html'.format(
+        rng.choice(WORDS[:24]), n, rng.choice(WORDS[:24]))
+
+
+# 検索結果以外の要素(ナビゲーション, script等)を生成する
+def gen_filler(rng: random.Random, blocks: int = 30):
+    items = ''.join(
+        '<li class="nav-item"><a href="/{0}">{1}</a></li>'.format(
+            n, gen_sentence(rng, 2))
+        for n in range(blocks)
+    )
+    script = '<script>var data = {0};</script>'.format(
+        json.dumps([gen_sentence(rng, 8) for _ in range(blocks)], ensure_ascii=False))
+
+    return '<div class="nav"><ul>{0}</ul></div>{1}'.format(items, script)
+
+
+def gen_html(rng: random.Random, body: str):
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>{0}</title>'
+        '<style>.a{{color:#000}}</style></head><body>{1}{2}{3}</body></html>'
+    ).format(gen_sentence(rng, 3), gen_filler(rng), body, gen_filler(rng))
+
+
+# ===== Google =====
+def google_text(rng: random.Random, count: int):
+    results = []
+    for n in range(count):
+        url = gen_url(rng, n)
+        href = '/url?esrc=s&q=&rct=j&sa=U&url={0}&ved=0ah'.format(
+            parse.quote(url, safe=''))
+        results.append(
+            '<div><div><div class="kCrYT"><a href="{0}"><h3><div class="BNeawe">{1}</div></h3>'
+            '<div class="BNeawe UPmit">{2}</div></a></div>'
+            '<div class="kCrYT"><div><div><div><div><div class="BNeawe s3v9rd">{3}</div>'
+            '</div></div></div></div></div></div></div>'.format(
+                html_escape.escape(href), gen_sentence(rng, 5), url, gen_sentence(rng, 25))
+        )
+
+    return gen_html(rng, '<div id="main">{0}</div>'.format(''.join(results)))
+
+
+def google_image(rng: random.Random, count: int):
+    images = []
+    for n in range(count):
+        meta = [None] * 10
+        meta[3] = [gen_url(rng, n) + '.jpg', 600, 400]
+        meta[9] = {'2003': [None, None, gen_url(rng, n), gen_sentence(rng, 5)]}
+        images.append([1, meta])
+
+    block = [None] * 12
+    block[2] = images
+    block[11] = [None] * 5 + ['image_cursor']
+
+    data = [None] * 34
+    data[31] = [[None] * 12 + [block]]
+    data[32] = 'next_cursor'
+
+    line = json.dumps(
+        [['wrb.fr', RPC_ID, json.dumps(data), None, None, None, 'generic']])
+
+    return ')]}}\'\n\n{0}\n{1}\n58\n[["di",74],["af.httprm",73,"-1",1]]\n'.format(
+        len(line), line)
+
+
+def google_suggest(rng: random.Random, count: int):
+    items = ''.join(
+        '<CompleteSuggestion><suggestion data="{0}"/></CompleteSuggestion>'.format(
+            gen_sentence(rng, 3))
+        for _ in range(count)
+    )
+    return '<toplevel>{0}</toplevel>'.format(items)
+
+
+# ===== Bing =====
+def bing_text(rng: random.Random, count: int):
+    results = ''.join(
+        '<li class="b_algo"><h2><a href="{0}">{1}</a></h2>'
+        '<div class="b_caption"><p>{2}</p></div></li>'.format(
+            gen_url(rng, n), gen_sentence(rng, 5), gen_sentence(rng, 25))
+        for n in range(count)
+    )
+    return gen_html(rng, '<ol id="b_results">{0}</ol>'.format(results))
+
+
+def bing_image(rng: random.Random, count: int):
+    results = ''.join(
+        '<div class="imgpt"><a class="iusc" m="{0}" href="/images/search"></a></div>'.format(
+            html_escape.escape(json.dumps({
+                't': gen_sentence(rng, 5),
+                'purl': gen_url(rng, n),
+                'murl': gen_url(rng, n) + '.jpg',
+            }, ensure_ascii=False), quote=True))
+        for n in range(count)
+    )
+    return gen_html(rng, results)
+
+
+def bing_suggest(rng: random.Random, count: int):
+    items = ''.join(
+        '<li class="sa_sg" query="{0}"><span>{0}</span></li>'.format(
+            gen_sentence(rng, 3))
+        for _ in range(count)
+    )
+    return '<ul class="sa_drw">{0}</ul>'.format(items)
+
+
+# ===== DuckDuckGo =====
+def duckduckgo_text(rng: random.Random, count: int):
+    results = [
+        {
+            'u': gen_url(rng, n),
+            's': 'bingv7aa',
+            't': '<b>{0}</b> {1}'.format(gen_sentence(rng, 2), gen_sentence(rng, 3)),
+            'a': '{0} <b>{1}</b> &amp; {2}'.format(
+                gen_sentence(rng, 10), gen_sentence(rng, 2), gen_sentence(rng, 10)),
+        }
+        for n in range(count)
+    ]
+    results.append({'n': '/d.js?q=pydork&s={0}&dc={1}'.format(count, count + 1)})
+
+    return (
+        "if (DDG.deep && DDG.deep.setUpstream) DDG.deep.setUpstream(\"bingv7aa\");"
+        "DDG.pageLayout.load('d',{0});DDG.duckbar.load('images');"
+    ).format(json.dumps(results, ensure_ascii=False))
+
+
+def duckduckgo_image(rng: random.Random, count: int):
+    return json.dumps({
+        'results': [
+            {
+                'image': gen_url(rng, n) + '.jpg',
+                'title': gen_sentence(rng, 5),
+                'url': gen_url(rng, n),
+            }
+            for n in range(count)
+        ],
+        'vqd': {'pydork': '3-123456789'},
+        'next': 'i.js?q=pydork&o=json&p=1&s={0}'.format(count),
+    }, ensure_ascii=False)
+
+
+def duckduckgo_suggest(rng: random.Random, count: int):
+    return json.dumps(
+        [{'phrase': gen_sentence(rng, 3)} for _ in range(count)], ensure_ascii=False)
+
+
+# ===== Baidu =====
+def baidu_text(rng: random.Random, count: int):
+    results = ''.join(
+        '<div class="result c-container"><h3 class="t tts-title">'
+        '<a href="http://www.baidu.com/link?url={0}">{1}</a></h3>'
+        '<div class="c-gap-top-small"><span>{2}</span></div></div>'.format(
+            rng.getrandbits(128), gen_sentence(rng, 5), gen_sentence(rng, 25))
+        for _ in range(count)
+    )
+    return gen_html(rng, '<div id="content_left">{0}</div>'.format(results))
+
+
+def baidu_image(rng: random.Random, count: int):
+    data = [
+        {
+            'replaceUrl': [{
+                'ObjURL': 'http://img.example.com/image_search/src={0}&refer=http%3A%2F%2Fexample.com'.format(
+                    parse.quote(gen_url(rng, n) + '.jpg', safe='')),
+            }],
+            'fromPageTitle': gen_sentence(rng, 5),
+        }
+        for n in range(count)
+    ]
+    data.append({})
+
+    return json.dumps({'queryEnc': 'pydork', 'data': data}, ensure_ascii=False)
+
+
+def baidu_suggest(rng: random.Random, count: int):
+    return json.dumps(
+        {'q': 'pydork', 'g': [{'q': gen_sentence(rng, 3)} for _ in range(count)]},
+        ensure_ascii=False)
+
+
+# ===== Yahoo =====
+def yahoo_text(rng: random.Random, count: int):
+    results = ''.join(
+        '<div class="sw-CardBase"><div class="sw-Card__headerSpace"><div class="sw-Card__title">'
+        '<a href="{0}"><h3><span>{1}</span></h3></a></div></div>'
+        '<div class="sw-Card__floatContainer"><div class="sw-Card__summary">{2}</div></div></div>'.format(
+            gen_url(rng, n), gen_sentence(rng, 5), gen_sentence(rng, 25))
+        for n in range(count)
+    )
+    return gen_html(rng, '<div class="Contents__innerGroupBody">{0}</div>'.format(results))
+
+
+def yahoo_image(rng: random.Random, count: int):
+    return json.dumps({
+        'algos': [
+            {
+                'title': gen_sentence(rng, 5),
+                'refererUrl': gen_url(rng, n),
+                'original': {'url': gen_url(rng, n) + '.jpg'},
+            }
+            for n in range(count)
+        ]
+    }, ensure_ascii=False)
+
+
+def yahoo_suggest(rng: random.Random, count: int):
+    return json.dumps(
+        {'gossip': {'results': [{'key': gen_sentence(rng, 3)} for _ in range(count)]}},
+        ensure_ascii=False)
+
+
+GENERATORS = {
+    'baidu': (baidu_text, baidu_image, baidu_suggest),
+    'bing': (bing_text, bing_image, bing_suggest),
+    'duckduckgo': (duckduckgo_text, duckduckgo_image, duckduckgo_suggest),
+    'google': (google_text, google_image, google_suggest),
+    'yahoo': (yahoo_text, yahoo_image, yahoo_suggest),
+}
+
+
+# 合成したコーパスを生成する
+def generate_corpus(pages: int = 20, seed: int = 0):
+    """generate_corpus
+
+    各検索エンジン・検索タイプ(text, image, suggest)ごとに、合成したページを生成する.
+    同じseedであれば常に同じページを生成するため、commit間で結果を比較できる.
+
+    Args:
+        pages (int, optional): 検索エンジン・検索タイプごとのページ数. Defaults to 20.
+        seed (int, optional): 乱数のseed. Defaults to 0.
+
+    Returns:
+        list: ページのlist(`[{'engine': 'google', 'type': 'text', 'url': '...', 'html': '...'}, ...]`)
+    """
+
+    rng = random.Random(seed)
+
+    corpus = []
+    for engine in ENGINES:
+        se = SearchEngine()
+        se.set(engine)
+
+        urls = (se.ENGINE.SEARCH_URL, se.ENGINE.IMAGE_URL, se.ENGINE.SUGGEST_URL)
+        for search_type, generator, count, url in zip(
+                ('text', 'image', 'suggest'), GENERATORS[engine], RESULTS_PER_PAGE[engine], urls):
+            for _ in range(pages):
+                corpus.append({
+                    'engine': engine,
+                    'type': search_type,
+                    'url': url,
+                    'html': generator(rng, count),
+                })
+
+    return corpus
+
+
+# 記録済みのアーカイブファイルを読み込む
+def load_archive(archive_file: str):
+    """load_archive
+
+    `pydork search --record` (`SearchEngine.set_archive`) で記録したアーカイブファイルを、コーパスとして読み込む.
+    検索タイプはリクエスト先のurlから判別し、判別できないものは除外する.
+
+    Args:
+        archive_file (str): アーカイブファイルのPATH.
+
+    Returns:
+        list: ページのlist(`[{'engine': 'google', 'type': 'text', 'url': '...', 'html': '...'}, ...]`)
+    """
+
+    # 検索エンジンごとのurlと検索タイプの対応
+    url_types = dict()
+    for engine in ENGINES:
+        se = SearchEngine()
+        se.set(engine)
+        url_types[se.ENGINE.NAME] = (
+            (se.ENGINE.SEARCH_URL, 'text'),
+            (se.ENGINE.IMAGE_URL, 'image'),
+            (se.ENGINE.SUGGEST_URL, 'suggest'),
+        )
+
+    corpus = []
+    with gzip.open(archive_file, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip() == '':
+                continue
+
+            record = json.loads(line)
+            for url, search_type in url_types.get(record['engine'], ()):
+                if record['url'].startswith(url):
+                    corpus.append({
+                        'engine': record['engine'].lower(),
+                        'type': search_type,
+                        'url': record['url'],
+                        'html': record['html'],
+                    })
+                    break
+
+    return corpus
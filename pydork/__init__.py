@@ -9,17 +9,18 @@ from .sub_commands import run_subcommand
 from .engine import ENGINES
 from . import messages
 
-from pkg_resources import get_distribution
+from importlib.metadata import version, PackageNotFoundError
 from datetime import datetime
 
 import copy
 import argparse
 
-# TODO: returnではなくyieldに切り替えて、返り値をgeneratorにすることである程度途中状態でも状況を見れるような仕組みとする
 
-
-# version (setup.pyから取得してくる)
-__version__ = get_distribution('pydork').version
+# version (setup.pyから取得してくる. pkg_resourcesは読み込みに時間がかかるため、importlib.metadataを使用する)
+try:
+    __version__ = version('pydork')
+except PackageNotFoundError:
+    __version__ = 'unknown'
 
 
 # main
@@ -97,6 +98,11 @@ def main():
             "action": "store_true",
             "help": messages.help_message_op_json,
         },
+        {
+            "args": ["--ndjson"],
+            "action": "store_true",
+            "help": messages.help_message_op_ndjson,
+        },
         {
             "args": ["-k", "--insecure"],
             "action": "store_true",
@@ -143,6 +149,58 @@ def main():
             "action": "store_true",
             "help": messages.help_message_op_delete_cookies,
         },
+        {
+            "args": ["--sticky-user-agent"],
+            "action": "store_true",
+            "help": messages.help_message_op_sticky_user_agent,
+        },
+        {
+            "args": ["--jobs"],
+            "default": 1,
+            "type": int,
+            "help": messages.help_message_op_jobs,
+        },
+        {
+            "args": ["--rate"],
+            "default": None,
+            "type": float,
+            "help": messages.help_message_op_rate,
+        },
+        {
+            "args": ["--burst"],
+            "default": 1,
+            "type": int,
+            "help": messages.help_message_op_burst,
+        },
+        {
+            "args": ["--cache"],
+            "action": "store_true",
+            "help": messages.help_message_op_cache,
+        },
+        {
+            "args": ["--cache-ttl"],
+            "default": 86400,
+            "type": int,
+            "help": messages.help_message_op_cache_ttl,
+        },
+        {
+            "args": ["--cache-size"],
+            "default": 100,
+            "type": int,
+            "help": messages.help_message_op_cache_size,
+        },
+        {
+            "args": ["--record"],
+            "default": "",
+            "type": str,
+            "help": messages.help_message_op_record,
+        },
+        {
+            "args": ["--replay"],
+            "default": "",
+            "type": str,
+            "help": messages.help_message_op_replay,
+        },
     ]
 
     # サブコマンド `search` の引数
@@ -183,6 +241,33 @@ def main():
             "action": "store_true",
             "help": messages.help_message_op_disable_headless,
         },
+        {
+            "args": ["--lazy-resolve"],
+            "action": "store_true",
+            "help": messages.help_message_op_lazy_resolve,
+        },
+        {
+            "args": ["--dedup"],
+            "default": None,
+            "choices": ["run", "engine", "query"],
+            "help": messages.help_message_op_dedup,
+        },
+        {
+            "args": ["--saturation"],
+            "default": 2,
+            "type": int,
+            "help": messages.help_message_op_saturation,
+        },
+        {
+            "args": ["--prefetch"],
+            "action": "store_true",
+            "help": messages.help_message_op_prefetch,
+        },
+        {
+            "args": ["--adaptive-page-size"],
+            "action": "store_true",
+            "help": messages.help_message_op_adaptive_page_size,
+        },
     ]
     search_args_map.extend(copy.deepcopy(common_args_map))
 
@@ -229,6 +314,28 @@ def main():
             "action": "store_true",
             "help": messages.help_message_op_disable_headless,
         },
+        {
+            "args": ["--dedup"],
+            "default": None,
+            "choices": ["run", "engine", "query"],
+            "help": messages.help_message_op_dedup,
+        },
+        {
+            "args": ["--saturation"],
+            "default": 2,
+            "type": int,
+            "help": messages.help_message_op_saturation,
+        },
+        {
+            "args": ["--prefetch"],
+            "action": "store_true",
+            "help": messages.help_message_op_prefetch,
+        },
+        {
+            "args": ["--adaptive-page-size"],
+            "action": "store_true",
+            "help": messages.help_message_op_adaptive_page_size,
+        },
     ]
     image_args_map.extend(copy.deepcopy(common_args_map))
 
@@ -249,6 +356,18 @@ def main():
             "action": "store_true",
             "help": messages.help_message_op_suggest_num
         },
+        {
+            "args": ["--suggest-workers"],
+            "default": 8,
+            "type": int,
+            "help": messages.help_message_op_suggest_workers
+        },
+        {
+            "args": ["--depth"],
+            "default": 1,
+            "type": int,
+            "help": messages.help_message_op_suggest_depth
+        },
     ]
     suggest_args_map.extend(copy.deepcopy(common_args_map))
 
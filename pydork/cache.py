@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""cache
+    * 検索エンジンから取得したレスポンス(html)をSQLiteに保存する、`ResponseCache` を持つモジュール.
+    * 解析済みのサジェストをメモリ(LRU)・SQLiteに保存する、`SuggestCache` を持つモジュール.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+
+from collections import OrderedDict
+from time import time
+
+
+# 検索エンジンから取得したレスポンスをSQLiteに保存するClass
+class ResponseCache:
+    """ResponseCache
+
+    検索エンジンから取得したレスポンス(html)をSQLiteに保存するClass.
+    検索エンジン名・接続方式・method・url・data・lang・localeをkeyとし、TTLの経過したもの、
+    合計サイズが上限を超えた場合は古いものから削除する.
+
+    Examples:
+        cache = ResponseCache('~/.pydork_cookies/.cache.sqlite3', ttl=3600)
+        key = cache.gen_key(engine, 'GET', url, None)
+        html = cache.get(key)
+    """
+
+    def __init__(self, cache_file: str, ttl: int = 86400, max_size: int = 100 * 1024 * 1024):
+        """[summary]
+
+        Args:
+            cache_file (str): キャッシュファイル(SQLite)のPATH.
+            ttl (int, optional): キャッシュの有効期間(秒). 0以下の場合は期限なし. Defaults to 86400.
+            max_size (int, optional): キャッシュの合計サイズ(bytes)の上限. 0以下の場合は上限なし. Defaults to 100MB.
+        """
+
+        self.CACHE_FILE = cache_file
+        self.TTL = ttl
+        self.MAX_SIZE = max_size
+        self.LOCK = threading.Lock()
+
+        # NOTE: 複数のthreadから使用するため、LOCKで排他したうえで1つのconnectionを共有する
+        self.CONNECTION = sqlite3.connect(
+            cache_file, timeout=30, check_same_thread=False)
+
+        with self.LOCK, self.CONNECTION:
+            self.CONNECTION.execute('PRAGMA journal_mode=WAL')
+            self.CONNECTION.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, engine TEXT, url TEXT, '
+                'created REAL, size INTEGER, body BLOB)'
+            )
+            self.CONNECTION.execute(
+                'CREATE INDEX IF NOT EXISTS responses_created ON responses (created)')
+
+    # キャッシュのkeyを生成する
+    @staticmethod
+    def gen_key(engine, method: str, url: str, data=None):
+        """gen_key
+
+        キャッシュのkeyを生成する.
+        接続方式(Selenium/Splash/requests)によって取得できるhtmlが異なるため、接続方式もkeyに含める.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            method (str): リクエストメソッド.
+            url (str): リクエスト先のurl.
+            data (optional): POSTメソッド時に利用するdata.
+
+        Returns:
+            str: キャッシュのkey.
+        """
+
+        mode = 'requests'
+        if engine.USE_SELENIUM:
+            mode = 'selenium'
+        elif engine.USE_SPLASH:
+            mode = 'splash'
+
+        source = json.dumps(
+            [engine.NAME, mode, method, url, data, engine.LANG, engine.LOCALE],
+            ensure_ascii=False, sort_keys=True, default=str,
+        )
+
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    # キャッシュからレスポンスを取得する
+    def get(self, key: str):
+        """get
+
+        キャッシュからレスポンスを取得する.
+
+        Args:
+            key (str): キャッシュのkey.
+
+        Returns:
+            str: レスポンスのhtml. キャッシュが存在しない(期限切れの)場合はNone.
+        """
+
+        with self.LOCK:
+            row = self.CONNECTION.execute(
+                'SELECT created, body FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        created, body = row
+        if self.TTL > 0 and created + self.TTL < time():
+            return None
+
+        return zlib.decompress(body).decode('utf-8')
+
+    # レスポンスをキャッシュに保存する
+    def set(self, key: str, engine_name: str, url: str, html: str):
+        """set
+
+        レスポンスをキャッシュに保存し、期限切れ・サイズ超過分のキャッシュを削除する.
+
+        Args:
+            key (str): キャッシュのkey.
+            engine_name (str): 検索エンジン名.
+            url (str): リクエスト先のurl.
+            html (str): レスポンスのhtml.
+        """
+
+        body = zlib.compress(html.encode('utf-8'))
+
+        with self.LOCK, self.CONNECTION:
+            self.CONNECTION.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (key, engine_name, url, time(), len(body), body)
+            )
+            self._evict()
+
+    # 期限切れ・サイズ超過分のキャッシュを削除する(LOCK取得済みの状態で呼び出すこと)
+    def _evict(self):
+        if self.TTL > 0:
+            self.CONNECTION.execute(
+                'DELETE FROM responses WHERE created < ?', (time() - self.TTL,))
+
+        if self.MAX_SIZE <= 0:
+            return
+
+        total, = self.CONNECTION.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if total <= self.MAX_SIZE:
+            return
+
+        # 古いものから順に、合計サイズが上限以下になるまで削除する
+        rows = self.CONNECTION.execute(
+            'SELECT key, size FROM responses ORDER BY created').fetchall()
+        keys = []
+        for key, size in rows:
+            if total <= self.MAX_SIZE:
+                break
+            keys.append((key,))
+            total -= size
+
+        self.CONNECTION.executemany('DELETE FROM responses WHERE key = ?', keys)
+
+    # キャッシュをすべて削除する
+    def clear(self):
+        """clear
+
+        キャッシュをすべて削除する.
+        """
+
+        with self.LOCK, self.CONNECTION:
+            self.CONNECTION.execute('DELETE FROM responses')
+
+    # connectionをcloseする
+    def close(self):
+        """close
+
+        SQLiteのconnectionをcloseする.
+        """
+
+        with self.LOCK:
+            self.CONNECTION.close()
+
+
+# 解析済みのサジェストを保存するClass
+class SuggestCache:
+    """SuggestCache
+
+    キーワード(prefix)ごとの解析済みのサジェストを、メモリ上のLRUと、SQLite(任意)に保存するClass.
+    検索エンジン名・lang・locale・prefixをkeyとし、TTLの経過したものは使用しない.
+    複数の検索エンジン(thread)から同時に使用でき、hit/missの件数を保持する.
+
+    Examples:
+        cache = SuggestCache(cache_file='~/.pydork_cookies/.suggest_cache.sqlite3', ttl=3600)
+        key = cache.gen_key(engine, 'zelda a')
+        suggests = cache.get(key)
+    """
+
+    def __init__(self, cache_file: str = '', ttl: int = 3600, max_entries: int = 10000):
+        """[summary]
+
+        Args:
+            cache_file (str, optional): キャッシュファイル(SQLite)のPATH. ブランクの場合はメモリ上のみ. Defaults to ''.
+            ttl (int, optional): キャッシュの有効期間(秒). 0以下の場合は期限なし. Defaults to 3600.
+            max_entries (int, optional): メモリ上に保持するprefixの上限数. Defaults to 10000.
+        """
+
+        self.CACHE_FILE = cache_file
+        self.TTL = ttl
+        self.MAX_ENTRIES = max(1, max_entries)
+        self.LOCK = threading.Lock()
+
+        # keyごとの(作成日時, サジェスト). 参照したものを末尾に移動し、上限を超えた場合は先頭から削除する
+        self.ENTRIES = OrderedDict()
+
+        # hit/missの件数
+        self.HITS = 0
+        self.MISSES = 0
+
+        self.CONNECTION = None
+        if cache_file != '':
+            # NOTE: 複数のthreadから使用するため、LOCKで排他したうえで1つのconnectionを共有する
+            self.CONNECTION = sqlite3.connect(
+                cache_file, timeout=30, check_same_thread=False)
+
+            with self.LOCK, self.CONNECTION:
+                self.CONNECTION.execute('PRAGMA journal_mode=WAL')
+                self.CONNECTION.execute(
+                    'CREATE TABLE IF NOT EXISTS suggests ('
+                    'key TEXT PRIMARY KEY, engine TEXT, prefix TEXT, created REAL, body TEXT)'
+                )
+                self.CONNECTION.execute(
+                    'CREATE INDEX IF NOT EXISTS suggests_created ON suggests (created)')
+
+    # キャッシュのkeyを生成する
+    @staticmethod
+    def gen_key(engine, prefix: str):
+        """gen_key
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            prefix (str): サジェストを取得したキーワード(追加した文字を含む).
+
+        Returns:
+            str: キャッシュのkey.
+        """
+
+        return json.dumps([engine.NAME, engine.LANG, engine.LOCALE, prefix], ensure_ascii=False)
+
+    # 有効期間内かどうかを返す
+    def _is_fresh(self, created: float):
+        return self.TTL <= 0 or created + self.TTL >= time()
+
+    # キャッシュからサジェストを取得する
+    def get(self, key: str):
+        """get
+
+        メモリ上のキャッシュ、SQLiteの順にサジェストを取得する.
+
+        Args:
+            key (str): キャッシュのkey.
+
+        Returns:
+            dict: サジェスト(`{'with char': ['suggest1', ...]}`). キャッシュが存在しない(期限切れの)場合はNone.
+        """
+
+        with self.LOCK:
+            entry = self.ENTRIES.get(key)
+            if entry is not None:
+                if self._is_fresh(entry[0]):
+                    self.ENTRIES.move_to_end(key)
+                    self.HITS += 1
+                    return entry[1]
+
+                del self.ENTRIES[key]
+
+            row = None
+            if self.CONNECTION is not None:
+                row = self.CONNECTION.execute(
+                    'SELECT created, body FROM suggests WHERE key = ?', (key,)
+                ).fetchone()
+
+            if row is None or not self._is_fresh(row[0]):
+                self.MISSES += 1
+                return None
+
+            created, body = row
+            suggests = json.loads(body)
+            self._put(key, created, suggests)
+            self.HITS += 1
+
+        return suggests
+
+    # サジェストをキャッシュに保存する
+    def set(self, key: str, suggests: dict):
+        """set
+
+        Args:
+            key (str): キャッシュのkey.
+            suggests (dict): サジェスト(`{'with char': ['suggest1', ...]}`).
+        """
+
+        created = time()
+
+        with self.LOCK:
+            self._put(key, created, suggests)
+
+            if self.CONNECTION is None:
+                return
+
+            engine_name, _, _, prefix = json.loads(key)
+            with self.CONNECTION:
+                self.CONNECTION.execute(
+                    'INSERT OR REPLACE INTO suggests VALUES (?, ?, ?, ?, ?)',
+                    (key, engine_name, prefix, created, json.dumps(suggests, ensure_ascii=False))
+                )
+
+                if self.TTL > 0:
+                    self.CONNECTION.execute(
+                        'DELETE FROM suggests WHERE created < ?', (created - self.TTL,))
+
+    # メモリ上のキャッシュに追加する(LOCK取得済みの状態で呼び出すこと)
+    def _put(self, key: str, created: float, suggests: dict):
+        self.ENTRIES[key] = (created, suggests)
+        self.ENTRIES.move_to_end(key)
+
+        while len(self.ENTRIES) > self.MAX_ENTRIES:
+            self.ENTRIES.popitem(last=False)
+
+    # キャッシュをすべて削除する
+    def clear(self):
+        """clear
+
+        キャッシュをすべて削除し、hit/missの件数をリセットする.
+        """
+
+        with self.LOCK:
+            self.ENTRIES = OrderedDict()
+            self.HITS = 0
+            self.MISSES = 0
+
+            if self.CONNECTION is not None:
+                with self.CONNECTION:
+                    self.CONNECTION.execute('DELETE FROM suggests')
+
+    # connectionをcloseする
+    def close(self):
+        """close
+
+        SQLiteのconnectionをcloseする.
+        """
+
+        with self.LOCK:
+            if self.CONNECTION is not None:
+                self.CONNECTION.close()
+                self.CONNECTION = None
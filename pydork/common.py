@@ -12,7 +12,10 @@
 
 import sys
 import datetime
+import functools
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from string import Template
 
 
@@ -247,23 +250,86 @@ class Message:
 
 
 # 渡されたリスト内のdictに`num`を追加する関数
-def set_counter(links: list):
+def set_counter(links: list, start: int = 1):
     """set_counter
 
-    links(list)の要素に`num`キーを追加し、連続した数値を入れていく
+    links(list)の要素に`num`キーを追加し、連続した数値を入れていく(要素はそのまま更新し、新たなlistは生成しない)
 
     Args:
-        links(list): リンクのリスト. ex) [{'link', 'http://...', 'title': 'hogehoge...'}, {'link': '...', 'title': '...'}, ... ]
+        links(list): リンク(result.SearchResult)のリスト. ex) [{'link', 'http://...', 'title': 'hogehoge...'}, {'link': '...', 'title': '...'}, ... ]
+        start(int, optional): 最初の要素に指定する番号. ページごとに番号を付ける場合に使用する. Defaults to 1.
     Returns:
         result(list):  [{'link', 'http://...', 'title': 'hogehoge...', num: 1}, {'link': '...', 'title': '...', num: 2}, ... ]
     """
-    # result(list)の生成
-    result = list()
-
-    num = 1
-    for d in links:
+    for num, d in enumerate(links, start):
         d["num"] = num
-        num += 1
-        result.append(d)
 
-    return result
+    return links
+
+
+# asyncio版の処理で、ブロッキング処理(通信・解析・driverの操作)を実行するthread poolの最大thread数
+# (loopのデフォルトのexecutor(min(32, cpu数+4))とは別に、プロセス内で共有する)
+ASYNC_WORKERS = 64
+ASYNC_EXECUTOR = None
+ASYNC_EXECUTOR_LOCK = threading.Lock()
+
+
+# asyncio版の処理で使用するthread poolを取得する
+def get_async_executor():
+    """get_async_executor
+
+    asyncio版の処理でブロッキング処理を実行するthread poolを返す(最初に使用した時点で作成する).
+
+    Returns:
+        ThreadPoolExecutor: thread pool.
+    """
+
+    global ASYNC_EXECUTOR
+
+    with ASYNC_EXECUTOR_LOCK:
+        if ASYNC_EXECUTOR is None:
+            ASYNC_EXECUTOR = ThreadPoolExecutor(
+                max_workers=ASYNC_WORKERS, thread_name_prefix='pydork_async')
+
+    return ASYNC_EXECUTOR
+
+
+# asyncio版の処理で使用するthread poolの最大thread数を指定する
+def set_async_workers(workers: int):
+    """set_async_workers
+
+    asyncio版の処理で使用するthread poolの最大thread数を指定する.
+    作成済みのthread poolは、実行中の処理が完了した後に終了し、次に使用する時点で作り直す.
+
+    Args:
+        workers (int): 最大thread数.
+    """
+
+    global ASYNC_WORKERS, ASYNC_EXECUTOR
+
+    with ASYNC_EXECUTOR_LOCK:
+        ASYNC_WORKERS = max(1, workers)
+
+        if ASYNC_EXECUTOR is not None:
+            ASYNC_EXECUTOR.shutdown(wait=False)
+            ASYNC_EXECUTOR = None
+
+
+# ブロッキング処理をasyncio版の処理用のthread poolで実行する
+async def run_in_executor(func, *args, **kwargs):
+    """run_in_executor
+
+    Args:
+        func (function): 実行する関数.
+        *args: 関数に渡す引数.
+        **kwargs: 関数に渡すキーワード引数.
+
+    Returns:
+        関数の戻り値.
+    """
+
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_async_executor(), functools.partial(func, *args, **kwargs))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""dedup
+    * 検索結果のurlを正規化し、ページ・クエリ・検索エンジンをまたいで重複を除外する `DedupIndex` を持つモジュール.
+"""
+
+import hashlib
+import threading
+
+from urllib import parse
+
+
+# 除外するトラッキング用パラメータ
+TRACKING_PARAMS = frozenset([
+    'gclid', 'gbraid', 'wbraid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src', 'spm',
+])
+
+# 除外するトラッキング用パラメータのprefix
+TRACKING_PARAM_PREFIXES = ('utm_',)
+
+# 重複チェックの範囲
+DEDUP_SCOPES = ['run', 'engine', 'query']
+
+
+# トラッキング用パラメータかどうかを返す
+def is_tracking_param(key: str):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)
+
+
+# 重複チェック用にurlを正規化する
+def canonicalize_url(url: str):
+    """canonicalize_url
+
+    重複チェック用にurlを正規化する.
+    schemeとhostは小文字にし(http/httpsは同一として扱う)、デフォルトのport、ユーザ情報、fragment、
+    トラッキング用パラメータ(`utm_*`, `gclid` など)、pathの末尾のスラッシュを除外して、パラメータをソートする.
+
+    Args:
+        url (str): url.
+
+    Returns:
+        str: 正規化したurl(urlとして解析できない場合はそのまま).
+    """
+
+    try:
+        parts = parse.urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+
+    netloc = (parts.hostname or '').rstrip('.')
+    if port is not None and port not in (80, 443):
+        netloc = '{0}:{1}'.format(netloc, port)
+
+    query = sorted(
+        (key, value)
+        for key, value in parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(key)
+    )
+
+    path = parts.path.rstrip('/')
+
+    return parse.urlunsplit((scheme, netloc, path, parse.urlencode(query), ''))
+
+
+# 重複チェック用のindex
+class DedupIndex:
+    """DedupIndex
+
+    正規化したurlのhash(64bit)をscopeごとのsetで保持し、すでに出現したurlの検索結果を除外するClass.
+    複数の検索エンジン(thread)から同時に使用できる.
+
+    Examples:
+        index = DedupIndex()
+        links = index.filter(links, scope='')
+        print(index.DUPLICATES)
+    """
+
+    def __init__(self):
+        self.LOCK = threading.Lock()
+
+        # scopeごとの、正規化したurlのhashのset
+        self.INDEXES = dict()
+
+        # scopeごとの、除外した件数
+        self.DUPLICATES = dict()
+
+    # 正規化したurlのhashを取得する
+    @staticmethod
+    def gen_key(url: str):
+        digest = hashlib.blake2b(
+            canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    # urlを追加する
+    def add(self, url: str, scope: str = ''):
+        """add
+
+        Args:
+            url (str): url.
+            scope (str, optional): 重複チェックの範囲を表すkey. Defaults to ''.
+
+        Returns:
+            bool: 新しいurlの場合はTrue, 重複していた場合はFalse.
+        """
+
+        key = self.gen_key(url)
+
+        with self.LOCK:
+            index = self.INDEXES.setdefault(scope, set())
+            if key in index:
+                self.DUPLICATES[scope] = self.DUPLICATES.get(scope, 0) + 1
+                return False
+
+            index.add(key)
+
+        return True
+
+    # 重複した検索結果を除外する
+    def filter(self, links: list, scope: str = '', limit: int = None):  # type: ignore
+        """filter
+
+        すでに出現したurl(linkの値)の検索結果を除外する.
+        遷移先を取得中(`status` が `pending`)の検索結果はリダイレクト用リンクのため、重複チェックを行わず(indexにも追加せず)そのまま返す.
+
+        Args:
+            links (list): 検索結果のlist.
+            scope (str, optional): 重複チェックの範囲を表すkey. Defaults to ''.
+            limit (int, optional): 返す件数の上限. 上限以降の検索結果はindexに追加しない. Defaults to None.
+
+        Returns:
+            list: 重複を除外した検索結果のlist.
+        """
+
+        result = []
+        for d in links:
+            if limit is not None and len(result) >= limit:
+                break
+
+            if d.get('status') == 'pending' or self.add(d['link'], scope):
+                result.append(d)
+
+        return result
+
+    # 除外した件数を取得する
+    def count_duplicates(self, scope: str = None):  # type: ignore
+        with self.LOCK:
+            if scope is None:
+                return sum(self.DUPLICATES.values())
+
+            return self.DUPLICATES.get(scope, 0)
+
+    # indexをクリアする
+    def clear(self):
+        with self.LOCK:
+            self.INDEXES = dict()
+            self.DUPLICATES = dict()
+
+
+# プロセス内で共有するDedupIndex
+DEDUP_INDEX = DedupIndex()
@@ -13,26 +13,41 @@
 """
 
 
+import heapq
+import importlib
 import os
 import pathlib
 import sys
 
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as futures_wait
 from string import ascii_lowercase, digits
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from .common import Color, Message
-from .common import set_counter
-from .engine_baidu import Baidu
-from .engine_bing import Bing
-from .engine_duckduckgo import DuckDuckGo
-from .engine_google import Google
-from .engine_yahoo import Yahoo
+from .common import run_in_executor, set_async_workers, set_counter
+
+# NOTE: asyncio、キャッシュ・記録/再生・重複チェック・リダイレクト先の取得などのモジュールは、
+#       起動時間を短くするため、使用する関数内で読み込む
+if TYPE_CHECKING:
+    from .dedup import DedupIndex
+    from .result import ResultBatch
 
 
 # 対応する検索エンジンのリスト
 ENGINES = ['baidu', 'bing', 'duckduckgo', 'google', 'yahoo']
 
+# 検索エンジンごとの、Classを持つモジュールとClass名
+# (起動時間を短くするよう、各検索エンジンのモジュールは `SearchEngine.set` で指定された時点で読み込む)
+ENGINE_CLASSES = {
+    'baidu': ('.engine_baidu', 'Baidu'),
+    'bing': ('.engine_bing', 'Bing'),
+    'duckduckgo': ('.engine_duckduckgo', 'DuckDuckGo'),
+    'google': ('.engine_google', 'Google'),
+    'yahoo': ('.engine_yahoo', 'Yahoo'),
+}
+
 
 # 各種SearchEngineへの処理をまとめるWrapper用Class
 class SearchEngine:
@@ -52,6 +67,13 @@ class SearchEngine:
         >>>
         >>> # Get Suggest in the accepted query
         >>> search_result = search_engine.suggest('zelda')
+        >>>
+        >>> # Text search with asyncio
+        >>> search_result = asyncio.run(search_engine.asearch('zelda'))
+
+    A SearchEngine holds the state of one query (session, parsed page, paging),
+    so the coroutine versions (`asearch`, `aiter_search`, `asuggest`, `aiter_suggest_crawl`) run one at a time per instance:
+    concurrent calls on the same instance wait for each other. Use one SearchEngine per concurrent query.
     """
 
     def __init__(self):
@@ -68,29 +90,34 @@ class SearchEngine:
         """
 
         # TODO: 値チェックして、許可した値以外はエラーにする
-        if engine == 'baidu':
-            self.ENGINE = Baidu()
+        if engine not in ENGINE_CLASSES:
+            raise Exception('Error!')
 
-        elif engine == 'bing':
-            self.ENGINE = Bing()
+        # 使用する検索エンジンのモジュールのみ読み込む
+        module_name, class_name = ENGINE_CLASSES[engine]
+        module = importlib.import_module(module_name, __package__)
+        self.ENGINE = getattr(module, class_name)()
 
-        elif engine == 'duckduckgo':
-            self.ENGINE = DuckDuckGo()
+        self.IS_COLOR = False
 
-        elif engine == 'google':
-            self.ENGINE = Google()
+        # 検索をまたいでsessionを維持しているかどうか(`open_session` で有効になる)
+        self.IS_KEEP_SESSION = False
 
-        elif engine == 'yahoo':
-            self.ENGINE = Yahoo()
+        # プロセス内で共有するRateLimiterを使用する
+        from .ratelimit import RATE_LIMITER
+        self.RATE_LIMITER = RATE_LIMITER
 
-        else:
-            raise Exception('Error!')
+        # asyncio版の検索・サジェスト取得を、1つのSearchEngineで同時に1つだけ実行するためのLockと、Lockを作成したloop
+        self.ASYNC_LOCK = None
+        self.ASYNC_LOCK_LOOP = None
 
-        self.IS_COLOR = False
+        # サジェストのキャッシュ(SuggestCache. `set_suggest_cache` で指定するまでは無効)
+        self.SUGGEST_CACHE = None
 
         # Messageを定義
         self.MESSAGE = Message()
         self.MESSAGE.set_engine(self.ENGINE.NAME, self.ENGINE.COLOR)
+        self.ENGINE.set_messages(self.MESSAGE)
 
     # multithreading用のlockを渡すための関数(現在未使用？)
     def set_lock(self, lock):
@@ -282,18 +309,22 @@ class SearchEngine:
         self.ENGINE.set_splash(splash_url)
 
     # user_agentの設定値を受け付ける
-    def set_user_agent(self, useragent: str = None):  # type: ignore
+    def set_user_agent(self, useragent: str = None, sticky_key: str = None):  # type: ignore
         """set_user_agent
 
         Specify the UserAgent.
-        If not specified, FakeUA or hard-coded UserAgent will be used.
-
+        If not specified, a UserAgent is chosen at random (weighted) from the bundled UserAgent database,
+        without any network access.
+        With `sticky_key`, the same UserAgent is always chosen for the same key (e.g. the cookie file).
+        Google without Selenium/Splash always uses a fixed mobile UserAgent (`useragent.DEFAULT_USER_AGENT`),
+        since its parser expects the mobile html.
 
         Args:
             useragent (str, optional): useragent. Defaults to None.
+            sticky_key (str, optional): key to keep the same UserAgent (e.g. `search_engine.ENGINE.COOKIE_FILE`). Defaults to None.
         """
 
-        self.ENGINE.set_user_agent(useragent)
+        self.ENGINE.set_user_agent(useragent, key=sticky_key)
 
     # sslの検証を無効化する
     def set_ignore_ssl(self, verify: bool):
@@ -306,261 +337,1793 @@ class SearchEngine:
         """
         self.ENGINE.set_ignore_ssl = verify  # type: ignore
 
-    # 検索を行う
-    def search(self, keyword: str, search_type='text', maximum=100):
-        """search
+    # リクエスト間隔の制御に使用するRateLimiterを指定する
+    def set_rate_limiter(self, rate_limiter):
+        """set_rate_limiter
 
-        Search with a search engine.
+        Specify the RateLimiter used to control the request interval.
+        By default, a RateLimiter shared by all SearchEngine in the process is used.
 
         Args:
-            keyword (str): query.
-            search_type (str, optional): search type. text or image. Defaults to 'text'.
-            maximum (int, optional): Max count of searches. Defaults to 100.
+            rate_limiter (ratelimit.RateLimiter): RateLimiter (any object with `acquire`/`aacquire`).
+        """
 
-        Returns:
-            [list]: [{'link', 'http://...', 'title': 'hogehoge...'}, {'link': '...', 'title': '...'}, ... ]
+        self.RATE_LIMITER = rate_limiter
+
+    # サジェストのキャッシュに使用するSuggestCacheを指定する
+    def set_suggest_cache(self, suggest_cache):
+        """set_suggest_cache
+
+        Specify the SuggestCache used to cache the parsed suggest of each prefix.
+        By default, no cache is used (the command line enables it with `--cache`).
+        The same SuggestCache can be shared by several SearchEngine. The cache is not used in replay mode.
+
+        Args:
+            suggest_cache (cache.SuggestCache): SuggestCache (None to disable the cache).
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> # keep the suggest in memory and in a SQLite file for 1 day
+            >>> search_engine.set_suggest_cache(SuggestCache('/tmp/suggest.sqlite3', ttl=86400))
         """
 
-        # ENGINE.MESSAGEへis_command/is_debugを渡す
-        self.MESSAGE.set_is_command(self.ENGINE.IS_COMMAND)
-        self.MESSAGE.set_is_debug(self.ENGINE.IS_DEBUG)
+        self.SUGGEST_CACHE = suggest_cache
 
-        # Set header
-        header = '[${ENGINE_NAME}Search]'
-        if self.IS_COLOR:
-            sc = Color(self.ENGINE.COLOR)
-            header = sc.out(header)
-        self.MESSAGE.set_header(header)
+    # リクエスト間隔の制限を指定する
+    def set_rate_limit(self, rate: float, burst: int = 1, kind: str = 'search'):
+        """set_rate_limit
 
-        # ENGINEへMessage()を渡す
-        self.ENGINE.set_messages(self.MESSAGE)
+        Set the rate limit of requests to the search engine.
+        The limit is shared by every thread or task that uses the same search engine and proxy.
 
-        if self.ENGINE.LANG == "" and self.ENGINE.LOCALE == "":
-            self.set_lang()
+        Args:
+            rate (float): requests per second (no limit if 0 or less).
+            burst (int, optional): number of requests that can be sent in a row. Defaults to 1.
+            kind (str, optional): request kind (`search` or `suggest`). Defaults to 'search'.
 
-        # メッセージ出力（コマンド実行時のみ）
-        colored_keyword = self.ENGINE.MESSAGE.ENGINE_COLOR.out(keyword)
-        self.ENGINE.MESSAGE.print_text(
-            "$ENGINE: {} Search: {}".format(
-                search_type.capitalize(), colored_keyword),
-            use_header=False,
-            file=sys.stderr
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> # 1 request per second, up to 3 requests in a row
+            >>> search_engine.set_rate_limit(1.0, burst=3)
+        """
 
-        )
-        result, total = [], 0
+        self.RATE_LIMITER.set_rate_limit(
+            rate, burst, engine=self.ENGINE.NAME, kind=kind)
 
-        # maximumが0の場合、返す値は0個になるのでこのままreturn
-        if maximum == 0:
-            return result
+    # レスポンスのキャッシュを有効にする
+    def set_cache(self, cache_file: str, ttl: int = 86400, max_size: int = 100 * 1024 * 1024):
+        """set_cache
 
-        # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
-        self.ENGINE.create_session()
+        Enable the response cache (SQLite).
+        Responses are cached by search engine, connection method, request method, url, data, lang and locale,
+        and a cached request is not sent to the search engine (and does not wait for the rate limit).
+        ReCaptcha pages are not cached.
 
-        # 検索処理の開始
-        gen_url = self.ENGINE.gen_search_url(keyword, search_type)
-        while True:
-            # リクエスト先のurlを取得
-            try:
-                method, url, data = next(gen_url)
-            except Exception:
-                break
+        Args:
+            cache_file (str): PATH of the cache file (SQLite).
+            ttl (int, optional): cache lifetime in seconds (no expiration if 0 or less). Defaults to 86400.
+            max_size (int, optional): max total size of the cache in bytes (no limit if 0 or less). Defaults to 100MB.
 
-            # debug
-            self.ENGINE.MESSAGE.print_text(
-                url,
-                mode='debug',
-                separator=": ",  # type: ignore
-                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
-                Color.GRAY + '[DEBUG]: [TargetURL]' + Color.END
-            )
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> # cache responses for 1 hour
+            >>> search_engine.set_cache('~/.pydork_cookies/.cache.sqlite3', ttl=3600)
+        """
 
-            # debug
-            self.ENGINE.MESSAGE.print_text(
-                self.ENGINE.USER_AGENT,
-                mode='debug',
-                separator=": ",  # type: ignore
-                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
-                Color.GRAY + '[DEBUG]: [UserAgent]' + Color.END
-            )
+        # フルパスに変換
+        cache_file = str(pathlib.Path(cache_file).expanduser().resolve())
 
-            # 検索結果の取得
-            html = self.ENGINE.get_result(
-                url, method=method, data=data)  # type: ignore
+        from .cache import ResponseCache
+        self.ENGINE.CACHE = ResponseCache(cache_file, ttl, max_size)  # type: ignore
 
-            # debug
-            self.ENGINE.MESSAGE.print_text(
-                html,
-                mode='debug',
-                separator=": ",  # type: ignore
-                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
-                Color.GRAY + '[DEBUG]: [Response]' + Color.END
-            )
+    # レスポンスの記録・再生を有効にする
+    def set_archive(self, archive_file: str, mode: str = 'record'):
+        """set_archive
 
-            # 初期値
-            is_recaptcha = False
+        Record the responses of the search engine to an archive file (gzip compressed JSON Lines),
+        or replay the recorded responses without sending any request.
+        In replay mode, the browser (Selenium) is not started, and the rate limit and the cache are not used.
 
-            while True:
-                # ReCaptchaページかどうかを識別
-                if html is not None:
-                    is_recaptcha = self.ENGINE.check_recaptcha(html)
-                else:
-                    break
+        Args:
+            archive_file (str): PATH of the archive file.
+            mode (str, optional): `record` or `replay`. Defaults to 'record'.
 
-                if is_recaptcha:
-                    # commandの場合の出力処理
-                    self.ENGINE.MESSAGE.print_text(
-                        'Oh, Redirect to ReCaptcha Window.',
-                        mode='warn',
-                        header=self.ENGINE.MESSAGE.ENGINE,
-                        separator=": "
-                    )
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> # record
+            >>> search_engine.set_archive('google.jsonl.gz', 'record')
+            >>> search_engine.search('zelda')
+            >>>
+            >>> # replay (same settings as when recorded)
+            >>> search_engine.set_archive('google.jsonl.gz', 'replay')
+            >>> search_engine.search('zelda')
+        """
 
-                    # headless browserを使っている場合
-                    if self.ENGINE.USE_SELENIUM or self.ENGINE.USE_SPLASH:
-                        # byass用の関数にわたす
-                        html = self.ENGINE.bypass_recaptcha(
-                            url, html)  # type: ignore
+        from .replay import open_archive
+        self.ENGINE.ARCHIVE = open_archive(archive_file, mode)  # type: ignore
 
-                        if html is not None:
-                            # debug
-                            self.ENGINE.MESSAGE.print_text(
-                                html,
-                                mode='debug',  # type: ignore
-                                header=self.ENGINE.MESSAGE.HEADER + ': ' + Color.GRAY + \
-                                '[DEBUG]: [ReCaptchaedResponse]' + Color.END,
-                                separator=": "
-                            )
+    # 検索結果の重複チェックを有効にする
+    def set_dedup(self, scope: str = 'run', index: 'DedupIndex' = None):  # type: ignore
+        """set_dedup
 
-                    else:
-                        # headless browserが無い場合、Recaptchaには対応していない旨のエラーメッセージを出力する
-                        None
+        Drop results whose url (canonicalized: scheme/host case, default port, fragment,
+        tracking parameters such as `utm_*`, trailing slash and parameter order) has already been returned.
+        The number of dropped results is printed in the debug output and counted in `index.DUPLICATES`
+        (except for the `query` scope, which uses a new index for each search).
+        The `run` and `engine` scopes last as long as the index: the default index is shared in the process and never cleared,
+        so pass a new `DedupIndex` (or call `index.clear()`) to start over.
+        With `set_lazy_resolve`, pending results (still a redirect link) are not checked nor added to the index,
+        so they may duplicate other results once resolved.
 
-                else:  # is_recaptchaがFalseの場合、whileを抜ける
-                    break
+        Args:
+            scope (str, optional): `run` (across pages, queries and engines), `engine` (across pages and queries of the same engine) or `query` (across pages of each search). Defaults to 'run'.
+            index (DedupIndex, optional): index to use. Defaults to None (the index shared in the process).
 
-            # htmlがNone、かつReCaptchaチェックでTrueであった場合
-            if html is None and is_recaptcha:
-                # commandの場合の出力処理
-                self.ENGINE.MESSAGE.print_text(
-                    'FAiled ReCaptcha. exit process.',
-                    mode='warn',
-                    header=self.ENGINE.MESSAGE.ENGINE,
-                    separator=": "
-                )
+        Examples:
+            >>> index = DedupIndex()
+            >>> for name in ['google', 'bing']:
+            >>>     search_engine = SearchEngine()
+            >>>     search_engine.set(name)
+            >>>     search_engine.set_dedup('run', index)
+            >>>     search_engine.search('zelda')
+        """
 
-                break
+        from .dedup import DEDUP_INDEX, DEDUP_SCOPES
 
-            # TODO: resultも関数に渡して重複チェックを行わせる
-            # 検索結果をパースしてurlリストを取得する
-            links = self.ENGINE.get_links(
-                url, html, search_type)  # type: ignore
+        if scope not in DEDUP_SCOPES:
+            raise ValueError('scope must be one of {0}'.format(DEDUP_SCOPES))
 
-            # linksの件数に応じて処理を実施
-            if not len(links):
-                # commandの場合の出力処理
-                self.ENGINE.MESSAGE.print_text(
-                    'No more links.',
-                    header=self.ENGINE.MESSAGE.ENGINE,
-                    separator=": ",
-                    file=sys.stderr,
-                )
+        self.ENGINE.DEDUP = DEDUP_INDEX if index is None else index  # type: ignore
+        self.ENGINE.DEDUP_SCOPE = scope  # type: ignore
 
-                # loopを抜ける
-                if self.ENGINE.NAME == "Google":
-                    if self.ENGINE.SEARCH_NEXT_URL is None:  # type: ignore
-                        break
-                else:
-                    break
+    # 検索結果の飽和を検出して検索を終了するページ数を設定する
+    def set_saturation(self, pages: int = 2):
+        """set_saturation
 
-            # maximumで指定した件数を超える場合、その件数までを追加してloopを抜ける
-            elif len(links) > maximum - total:
-                result += links[:maximum - total]
-                break
+        Stop the pagination when `pages` consecutive pages contain no url that has not been seen in the same query
+        (e.g. the search engine keeps serving the same last page).
+        The decisions are printed in the debug output.
 
-            # TODO: bingのときだけ追加する処理として外だしする方法を考える
-            elif len(links) < 10 and self.ENGINE.NAME == "Bing":
-                # Bingの場合、件数以下でも次のページが表示されてしまうため件数でbreak
-                result += links[:maximum - total]
-                break
+        Args:
+            pages (int, optional): count of consecutive pages without new urls. 0 disables the detection. Defaults to 2.
+        """
 
-            else:
-                result += links
-                total += len(links)
+        self.ENGINE.SATURATION_PAGES = pages  # type: ignore
 
-            # 連続でアクセスすると問題があるため、3秒待機
-            sleep(3)
+    # 次のページのリクエストを、直前のページの解析と並行して行う
+    def set_prefetch(self, is_prefetch: bool = True):
+        """set_prefetch
 
-        # 検索番号を指定
-        result = set_counter(result)
+        Send the request for the next page (within the rate limit) in the background while the results
+        of the current page are consumed, for engines whose next url does not depend on the current response
+        (Google text, Bing, Baidu, Yahoo text). Selenium is not supported.
+        The next request is only started once the current page has been parsed and the search continues,
+        so the order of the results and the requested pages are not changed.
+        If the iteration is stopped before the next page is used, the prefetch is cancelled
+        (or, if the request has already been sent, its response is discarded).
 
-        # commandの場合の出力処理
-        self.ENGINE.MESSAGE.print_text(
-            # type: ignore
-            'Finally got ' + self.ENGINE.COLOR + \
-            str(len(result)) + Color.END + ' links.',
-            header=self.ENGINE.MESSAGE.ENGINE,
-            separator=": ",
-            file=sys.stderr,
-        )
+        Args:
+            is_prefetch (bool, optional): prefetch flag. Defaults to True.
+        """
 
-        # save cookies
-        if self.ENGINE.COOKIE_FILE != '':
-            self.ENGINE.write_cookies()
+        self.ENGINE.IS_PREFETCH = is_prefetch  # type: ignore
 
-        # delete cookie file
-        if self.ENGINE.COOKIE_FILE_DELETE:
-            os.remove(self.ENGINE.COOKIE_FILE)
+    # サジェスト取得時に並行してリクエストを行う数を指定する
+    def set_suggest_workers(self, workers: int = 8):
+        """set_suggest_workers
 
-        # sessionを終了
-        self.ENGINE.close_session()
+        Set the number of suggest requests (one per added character) sent concurrently by `suggest` and `asuggest`.
+        The requests still follow the suggest rate limit (`set_rate_limit(kind='suggest')`, 2 requests per second by default),
+        so raise the rate and burst to actually send them concurrently.
+        With Selenium, the requests are always sent one by one.
 
-        return result
+        Args:
+            workers (int, optional): number of concurrent requests (1 to send them one by one). Defaults to 8.
+        """
 
-    # suggestを取得する
-    def suggest(self, keyword: str, jap=False, alph=False, num=False):
-        """suggest
+        self.ENGINE.SUGGEST_WORKERS = workers  # type: ignore
 
-        get suggest with a search engine.
+    # asyncio版の処理で使用するthread poolの最大thread数を指定する
+    def set_async_workers(self, workers: int = 64):
+        """set_async_workers
+
+        Set the max number of threads of the thread pool used by the coroutine versions
+        (`asearch`, `asuggest`, ...) to run the blocking work (requests, parsing, browser).
+        The thread pool is shared by all SearchEngine in the process, and is separate from the default executor of the loop.
 
         Args:
-            keyword (str): query
-            jap (bool, optional): with japanese char. Defaults to False.
-            alph (bool, optional): with alphabet char. Defaults to False.
-            num (bool, optional): with number. Defaults to False.
+            workers (int, optional): max number of threads. Defaults to 64.
+        """
+
+        set_async_workers(workers)
+
+    # 1ページごとの件数を学習する
+    def set_adaptive_page_size(self, store_file: str, ttl: int = 7 * 86400):
+        """set_adaptive_page_size
+
+        Learn, per engine, search type, lang and locale, the page size the search engine really returns
+        (Google text, Bing, Baidu), persist it to a json file, and request that size instead of the default.
+        The request is also limited to the count still needed to reach `maximum`
+        (e.g. `num=37` for `maximum=37`).
+        A learned size is only decreased, and is discarded after `ttl` to probe the default size again.
+
+        Args:
+            store_file (str): PATH of the json file.
+            ttl (int, optional): lifetime of a learned size in seconds. Defaults to 7 days.
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>> search_engine.set_adaptive_page_size('~/.pydork_cookies/.page_size.json')
+        """
+
+        from .pagesize import open_store
+        self.ENGINE.PAGE_SIZE_STORE = open_store(store_file, ttl)  # type: ignore
+
+    # リダイレクト先の取得を待たずに検索結果を返す
+    def set_lazy_resolve(self, is_lazy_resolve: bool = True):
+        """set_lazy_resolve
+
+        Yield the results without waiting for the redirect links (Bing `/ck/a`, Baidu `/link`) to be resolved.
+        Such results have the raw redirect link and `'status': 'pending'`, and are resolved in the background.
+        Use `resolve_links` (or `aresolve_links`) to replace the links with the resolved urls.
+        Pending results are skipped by `set_dedup` and `set_saturation`, so duplicates are not dropped across pages for them.
+
+        Args:
+            is_lazy_resolve (bool, optional): lazy resolve flag. Defaults to True.
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('bing')
+            >>> search_engine.set_lazy_resolve(True)
+            >>>
+            >>> result = search_engine.search('zelda')  # links are still pending
+            >>> result = search_engine.resolve_links(result)
+        """
+
+        self.ENGINE.IS_LAZY_RESOLVE = is_lazy_resolve  # type: ignore
+
+    # lazy resolveで遷移先を取得中の検索結果のlinkを置き換える
+    def resolve_links(self, links: list, timeout: float = None):  # type: ignore
+        """resolve_links
+
+        Replace the pending links (`'status': 'pending'`) with the resolved urls, and set the status to `resolved`.
+        Results that are not pending are returned unchanged.
+
+        Args:
+            links (list): results of `search` / `iter_search`.
+            timeout (float, optional): seconds to wait for each link. If the link is not resolved in time, it is left pending. Defaults to None (wait until resolved).
 
         Returns:
-            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+            list: links.
         """
 
-        # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
-        self.ENGINE.create_session()
+        from .resolver import RESOLVER
+        return [RESOLVER.resolve_result(d, timeout) for d in links]
 
-        # 文字リスト作成
-        chars = ['', ' ']
+    # lazy resolveで遷移先を取得中の検索結果のlinkを置き換える(asyncio)
+    async def aresolve_links(self, links: list, timeout: float = None):  # type: ignore
+        """aresolve_links
 
-        # japフラグが有効な場合、キーワードに日本語を含めてサジェストを検索
-        chars += [' ' + chr(i) for i in range(12353, 12436)] if jap else []
+        Coroutine version of `resolve_links`.
 
-        # alphフラグが有効な場合、キーワードにアルファベットを含めてサジェストを検索
-        chars += [' ' + char for char in ascii_lowercase] if alph else []
+        Args:
+            links (list): results of `asearch` / `aiter_search`.
+            timeout (float, optional): seconds to wait for each link. Defaults to None (wait until resolved).
 
-        # numフラグが有効な場合、キーワードに数字を含めてサジェストを検索
-        chars += [' ' + char for char in digits] if num else []
+        Returns:
+            list: links.
+        """
 
-        # サジェスト取得
-        suggests = {}
-        for char in chars:
-            word = keyword + char
-            url = self.ENGINE.gen_suggest_url(word)
-            html = self.ENGINE.get_result(url)
+        return await run_in_executor(self.resolve_links, links, timeout)
 
-            # TODO: 各エンジンでjson/textの変換処理を別途実装する必要がある
-            suggests = self.ENGINE.get_suggest_list(
-                suggests, char, html)  # type: ignore
+    # 検索をまたいで使用するsessionを作成する
+    def open_session(self):
+        """open_session
+
+        Create a session (or Selenium WebDriver) that is kept across multiple `search` / `suggest` calls.
+        Cookies are read only once when the session is created.
+        Call `close_session` when finished, or use SearchEngine as a context manager.
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>> search_engine.set_selenium()
+            >>>
+            >>> # The browser is started only once
+            >>> with search_engine:
+            >>>     for query in ['zelda', 'mario']:
+            >>>         search_result = search_engine.search(query)
+        """
 
-            sleep(0.5)
+        if not self.IS_KEEP_SESSION:
+            self.ENGINE.create_session()
+            self.IS_KEEP_SESSION = True
 
-        # sessionを終了
-        self.ENGINE.close_session()
+    # 検索をまたいで使用していたsessionを終了する
+    def close_session(self):
+        """close_session
 
-        return suggests
+        Close the session created by `open_session`.
+        """
+
+        if self.IS_KEEP_SESSION:
+            self.IS_KEEP_SESSION = False
+            self.ENGINE.close_session()
+
+    # 検索をまたいで使用するsessionを作成する(asyncio)
+    async def aopen_session(self):
+        """aopen_session
+
+        Coroutine version of `open_session`.
+        """
+
+        if not self.IS_KEEP_SESSION:
+            await self.ENGINE.acreate_session()
+            self.IS_KEEP_SESSION = True
+
+    # 検索をまたいで使用していたsessionを終了する(asyncio)
+    async def aclose_session(self):
+        """aclose_session
+
+        Coroutine version of `close_session`.
+        """
+
+        if self.IS_KEEP_SESSION:
+            self.IS_KEEP_SESSION = False
+            await self.ENGINE.aclose_session()
+
+    def __enter__(self):
+        self.open_session()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_session()
+
+    async def __aenter__(self):
+        await self.aopen_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose_session()
+
+    # 検索を行う
+    def search(self, keyword: str, search_type='text', maximum=100):
+        """search
+
+        Search with a search engine.
+        Each result is a plain dict (JSON serializable). Use `iter_search` to get the `SearchResult` records.
+
+        Args:
+            keyword (str): query.
+            search_type (str, optional): search type. text or image. Defaults to 'text'.
+            maximum (int, optional): Max count of searches. Defaults to 100.
+
+        Returns:
+            [list]: [{'link', 'http://...', 'title': 'hogehoge...'}, {'link': '...', 'title': '...'}, ... ]
+        """
+
+        return [d.to_dict() for d in self.iter_search(keyword, search_type, maximum)]
+
+    # 検索を行い、結果を列ごとにまとめて返す
+    def search_batch(self, keyword: str, search_type='text', maximum=100, batch: 'ResultBatch' = None):  # type: ignore
+        """search_batch
+
+        Search with a search engine, and store the results in a columnar `ResultBatch`
+        (one list per field instead of one object per result), to reduce memory usage on bulk runs.
+
+        Args:
+            keyword (str): query.
+            search_type (str, optional): search type. text or image. Defaults to 'text'.
+            maximum (int, optional): Max count of searches. Defaults to 100.
+            batch (ResultBatch, optional): batch to append the results to. Defaults to None (a new batch).
+
+        Returns:
+            ResultBatch: results.
+
+        Examples:
+            >>> batch = ResultBatch()
+            >>> for query in queries:
+            >>>     search_engine.search_batch(query, batch=batch)
+            >>>
+            >>> links = batch.column('link')
+        """
+
+        from .result import ResultBatch
+
+        if batch is None:
+            batch = ResultBatch()
+
+        batch.extend(self.iter_search(keyword, search_type, maximum))
+        return batch
+
+    # 検索を行う(asyncio)
+    async def asearch(self, keyword: str, search_type='text', maximum=100):
+        """asearch
+
+        Coroutine version of `search`.
+        The request and the parsing are executed in a thread pool shared in the process (`set_async_workers`),
+        and the wait between requests is done with asyncio.
+        Only one query runs at a time per SearchEngine (concurrent calls on the same instance wait for each other),
+        so use one SearchEngine per concurrent query.
+
+        Args:
+            keyword (str): query.
+            search_type (str, optional): search type. text or image. Defaults to 'text'.
+            maximum (int, optional): Max count of searches. Defaults to 100.
+
+        Returns:
+            [list]: [{'link', 'http://...', 'title': 'hogehoge...'}, {'link': '...', 'title': '...'}, ... ]
+
+        Examples:
+            >>> async def main():
+            >>>     engines = []
+            >>>     for name in ['google', 'bing']:
+            >>>         search_engine = SearchEngine()
+            >>>         search_engine.set(name)
+            >>>         engines.append(search_engine)
+            >>>
+            >>>     return await asyncio.gather(*[se.asearch('zelda') for se in engines])
+            >>>
+            >>> results = asyncio.run(main())
+        """
+
+        return [d.to_dict() async for d in self.aiter_search(keyword, search_type, maximum)]
+
+    # 検索を行い、1ページ解析するごとに結果を返す
+    def iter_search(self, keyword: str, search_type='text', maximum=100):
+        """iter_search
+
+        Search with a search engine, and yield each result (already numbered) as soon as its page has been parsed.
+        The next page is not requested until all results of the current page have been consumed,
+        and the search is finished (and the session closed) when the generator is closed.
+
+        Args:
+            keyword (str): query.
+            search_type (str, optional): search type. text or image. Defaults to 'text'.
+            maximum (int, optional): Max count of searches. Defaults to 100.
+
+        Yields:
+            [SearchResult]: {'link', 'http://...', 'title': 'hogehoge...', 'num': 1} (use `d.to_dict()` for a plain dict)
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> for d in search_engine.iter_search('zelda', maximum=300):
+            >>>     print(d['num'], d['link'])
+            >>>     if 'nintendo' in d['link']:
+            >>>         break
+        """
+
+        # 検索開始時のメッセージ等の設定
+        self._start_search(keyword, search_type)
+
+        # maximumが0の場合、返す値は0個になるのでこのままreturn
+        if maximum == 0:
+            return
+
+        # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+        # (`open_session` でsessionを維持している場合はそのsessionを使用する)
+        if not self.IS_KEEP_SESSION:
+            self.ENGINE.create_session()
+
+        # 検索処理の開始(通信以外の処理は self._search_process で行う)
+        process = self._search_process(keyword, search_type, maximum)
+        count = 0
+
+        # prefetch用のthread poolと、prefetch中のリクエスト((method, url, data), Future)
+        executor = None
+        prefetched = None
+        try:
+            response = None
+            while True:
+                is_done, step = self._send_process(process, response)
+                if is_done:
+                    break
+
+                response = None
+                kind, value = step
+
+                # 次のページのリクエストを別threadで開始する
+                if kind == 'prefetch':
+                    if executor is None:
+                        executor = ThreadPoolExecutor(
+                            max_workers=1, thread_name_prefix='pydork_prefetch')
+
+                    method, url, data = value
+                    prefetched = (value, executor.submit(
+                        self._prefetch_result, url, method, data))
+
+                # リクエストを行う
+                elif kind == 'request':
+                    # 検索結果の取得(prefetch済みの場合はその結果を待ち、キャッシュへの保存はこのthreadで行う)
+                    method, url, data = value
+                    if prefetched is not None and prefetched[0] == value:
+                        response, is_fetched = prefetched[1].result()
+                        if is_fetched:
+                            self.ENGINE.write_cache(url, response, method=method, data=data)
+                    else:
+                        # 異なるリクエストのprefetchは、結果を破棄してからリクエストを行う
+                        if prefetched is not None:
+                            self._discard_prefetch(prefetched[1])
+                        response = self._get_result(url, method, data, 'search')
+
+                    prefetched = None
+
+                # 解析済みの検索結果に検索番号を指定して返す
+                elif kind == 'links':
+                    links = set_counter(value, count + 1)
+                    count += len(links)
+
+                    for link in links:
+                        yield link
+
+            # 検索終了時の処理
+            self._finish_search(count)
+
+        except GeneratorExit:
+            # 途中で打ち切られた場合も、それまでの検索結果で終了時の処理を行う
+            self._finish_search(count)
+            raise
+
+        finally:
+            process.close()
+
+            # 使用されなかったprefetchは取り消す(実行中の場合はsessionを終了する前に完了を待つ)
+            if prefetched is not None:
+                self._discard_prefetch(prefetched[1])
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+            # sessionを終了(維持している場合は `close_session` で終了する)
+            if not self.IS_KEEP_SESSION:
+                self.ENGINE.close_session()
+
+    # 検索を行い、1ページ解析するごとに結果を返す(asyncio)
+    async def aiter_search(self, keyword: str, search_type='text', maximum=100):
+        """aiter_search
+
+        Async generator version of `iter_search`.
+        Only one query runs at a time per SearchEngine: the next query on the same instance waits
+        until this generator is exhausted or closed.
+
+        Args:
+            keyword (str): query.
+            search_type (str, optional): search type. text or image. Defaults to 'text'.
+            maximum (int, optional): Max count of searches. Defaults to 100.
+
+        Yields:
+            [SearchResult]: {'link', 'http://...', 'title': 'hogehoge...', 'num': 1} (use `d.to_dict()` for a plain dict)
+        """
+
+        import asyncio
+
+        # 同じSearchEngineでの他の検索・サジェスト取得の完了を待つ(ENGINEの状態を共有するため)
+        async with self._get_async_lock():
+            # 検索開始時のメッセージ等の設定
+            self._start_search(keyword, search_type)
+
+            # maximumが0の場合、返す値は0個になるのでこのままreturn
+            if maximum == 0:
+                return
+
+            # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+            # (`aopen_session` でsessionを維持している場合はそのsessionを使用する)
+            if not self.IS_KEEP_SESSION:
+                await self.ENGINE.acreate_session()
+
+            # 検索処理の開始(解析処理はexecutorで実行する)
+            process = self._search_process(keyword, search_type, maximum)
+            count = 0
+
+            # prefetch中のリクエスト((method, url, data), Task)
+            prefetched = None
+            try:
+                response = None
+                while True:
+                    is_done, step = await run_in_executor(
+                        self._send_process, process, response)
+                    if is_done:
+                        break
+
+                    response = None
+                    kind, value = step
+
+                    # 次のページのリクエストを開始する(解析中も並行して実行される)
+                    if kind == 'prefetch':
+                        method, url, data = value
+                        prefetched = (value, asyncio.ensure_future(
+                            self._aprefetch_result(url, method, data)))
+
+                    # リクエストを行う
+                    elif kind == 'request':
+                        # 検索結果の取得(prefetch済みの場合はその結果を待ち、キャッシュへの保存はその後に行う)
+                        method, url, data = value
+                        if prefetched is not None and prefetched[0] == value:
+                            response, is_fetched = await prefetched[1]
+                            if is_fetched:
+                                await run_in_executor(
+                                    self.ENGINE.write_cache, url, response, method=method, data=data)
+                        else:
+                            # 異なるリクエストのprefetchは、結果を破棄してからリクエストを行う
+                            if prefetched is not None:
+                                await self._adiscard_prefetch(prefetched[1])
+                            response = await self._aget_result(url, method, data, 'search')
+
+                        prefetched = None
+
+                    # 解析済みの検索結果に検索番号を指定して返す
+                    elif kind == 'links':
+                        links = set_counter(value, count + 1)
+                        count += len(links)
+
+                        for link in links:
+                            yield link
+
+                # 検索終了時の処理
+                await run_in_executor(self._finish_search, count)
+
+            except GeneratorExit:
+                # 途中で打ち切られた場合も、それまでの検索結果で終了時の処理を行う
+                await run_in_executor(self._finish_search, count)
+                raise
+
+            finally:
+                process.close()
+
+                # 使用されなかったprefetchは取り消す(実行中の場合はsessionを終了する前に完了を待つ)
+                if prefetched is not None:
+                    await self._adiscard_prefetch(prefetched[1])
+
+                # sessionを終了(維持している場合は `aclose_session` で終了する)
+                if not self.IS_KEEP_SESSION:
+                    await self.ENGINE.aclose_session()
+
+    # asyncio版の検索・サジェスト取得で使用するLockを取得する
+    def _get_async_lock(self):
+        """_get_async_lock
+
+        Return the lock that allows only one coroutine query per SearchEngine,
+        since the queries share the state of the engine (session, parsed page, paging).
+        The lock is created for each running loop (an asyncio.Lock cannot be shared between loops).
+
+        Returns:
+            asyncio.Lock: lock.
+        """
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self.ASYNC_LOCK is None or self.ASYNC_LOCK_LOOP is not loop:
+            self.ASYNC_LOCK = asyncio.Lock()
+            self.ASYNC_LOCK_LOOP = loop
+
+        return self.ASYNC_LOCK
+
+    # 検索開始時の設定・メッセージ出力を行う
+    def _start_search(self, keyword: str, search_type: str):
+        """_start_search
+
+        Set the message used during the search, and print the search start message.
+
+        Args:
+            keyword (str): query.
+            search_type (str): search type. text or image.
+        """
+
+        # ENGINE.MESSAGEへis_command/is_debugを渡す
+        self.MESSAGE.set_is_command(self.ENGINE.IS_COMMAND)
+        self.MESSAGE.set_is_debug(self.ENGINE.IS_DEBUG)
+
+        # Set header
+        header = '[${ENGINE_NAME}Search]'
+        if self.IS_COLOR:
+            sc = Color(self.ENGINE.COLOR)
+            header = sc.out(header)
+        self.MESSAGE.set_header(header)
+
+        # ENGINEへMessage()を渡す
+        self.ENGINE.set_messages(self.MESSAGE)
+
+        if self.ENGINE.LANG == "" and self.ENGINE.LOCALE == "":
+            self.set_lang()
+
+        # メッセージ出力（コマンド実行時のみ）
+        colored_keyword = self.ENGINE.MESSAGE.ENGINE_COLOR.out(keyword)
+        self.ENGINE.MESSAGE.print_text(
+            "$ENGINE: {} Search: {}".format(
+                search_type.capitalize(), colored_keyword),
+            use_header=False,
+            file=sys.stderr
+
+        )
+
+    # 検索終了時の処理を行う
+    def _finish_search(self, count: int):
+        """_finish_search
+
+        Print the result message and save cookies.
+
+        Args:
+            count (int): count of search results.
+        """
+
+        # commandの場合の出力処理
+        self.ENGINE.MESSAGE.print_text(
+            # type: ignore
+            'Finally got ' + self.ENGINE.COLOR + \
+            str(count) + Color.END + ' links.',
+            header=self.ENGINE.MESSAGE.ENGINE,
+            separator=": ",
+            file=sys.stderr,
+        )
+
+        # save cookies
+        if self.ENGINE.COOKIE_FILE != '':
+            self.ENGINE.write_cookies()
+
+        # delete cookie file
+        if self.ENGINE.COOKIE_FILE_DELETE:
+            # 他のworkerで削除済みの場合がある
+            try:
+                os.remove(self.ENGINE.COOKIE_FILE)
+            except FileNotFoundError:
+                pass
+
+            # sessionを維持している場合、session上のcookieも削除する
+            if self.IS_KEEP_SESSION:
+                self.ENGINE.delete_cookies()
+
+    # リクエストを行い、htmlを取得する
+    def _get_result(self, url: str, method='GET', data=None, kind='search'):
+        """_get_result
+
+        Send a request with the rate limit, and return the html.
+        If the response is cached, return it without sending the request and waiting for the rate limit.
+        The cache is looked up only once per request (`ENGINE.fetch_result` does not look it up again).
+
+        Args:
+            url (str): request url.
+            method (str, optional): request method. Defaults to 'GET'.
+            data (optional): data used for POST method. Defaults to None.
+            kind (str, optional): request kind (`search` or `suggest`). Defaults to 'search'.
+
+        Returns:
+            str: html.
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return self.ENGINE.get_result(url, method=method, data=data)
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = self._read_cache(url, method, data)
+        if result is not None:
+            return result
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける
+        self.RATE_LIMITER.acquire(self.ENGINE, kind)
+
+        # キャッシュは参照済みのため、キャッシュを参照せずにリクエストを行う
+        return self.ENGINE.fetch_result(url, method=method, data=data)
+
+    # キャッシュからレスポンスを取得する
+    def _read_cache(self, url: str, method='GET', data=None):
+        """_read_cache
+
+        Return the cached response, and record it in record mode.
+
+        Args:
+            url (str): request url.
+            method (str, optional): request method. Defaults to 'GET'.
+            data (optional): data used for POST method. Defaults to None.
+
+        Returns:
+            str: html (None if not cached).
+        """
+
+        result = self.ENGINE.read_cache(url, method=method, data=data)
+        if result is not None:
+            self.ENGINE.record_result(url, result, method=method, data=data)
+
+        return result
+
+    # リクエストを行い、htmlを取得する(asyncio)
+    async def _aget_result(self, url: str, method='GET', data=None, kind='search'):
+        """_aget_result
+
+        Coroutine version of `_get_result`.
+
+        Args:
+            url (str): request url.
+            method (str, optional): request method. Defaults to 'GET'.
+            data (optional): data used for POST method. Defaults to None.
+            kind (str, optional): request kind (`search` or `suggest`). Defaults to 'search'.
+
+        Returns:
+            str: html.
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return await self.ENGINE.aget_result(url, method=method, data=data)
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = await run_in_executor(self._read_cache, url, method, data)
+        if result is not None:
+            return result
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける
+        await self.RATE_LIMITER.aacquire(self.ENGINE, kind)
+
+        # キャッシュは参照済みのため、キャッシュを参照せずにリクエストを行う
+        return await self.ENGINE.afetch_result(url, method=method, data=data)
+
+    # 次のページのリクエストを先に行い、htmlを取得する(prefetch)
+    def _prefetch_result(self, url: str, method='GET', data=None):
+        """_prefetch_result
+
+        `_get_result` for the prefetch, run in a background thread while the results of the current page are consumed.
+        The response is not written to the cache here: writing the cache parses the html (ReCaptcha check)
+        into the document shared by the engine, so the caller writes it when the response is used.
+
+        Args:
+            url (str): request url.
+            method (str, optional): request method. Defaults to 'GET'.
+            data (optional): data used for POST method. Defaults to None.
+
+        Returns:
+            str: html.
+            bool: True if the response has been fetched (and has to be written to the cache).
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return self.ENGINE.get_result(url, method=method, data=data), False
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = self._read_cache(url, method, data)
+        if result is not None:
+            return result, False
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける
+        self.RATE_LIMITER.acquire(self.ENGINE, 'search')
+
+        return self.ENGINE.fetch_result(url, method=method, data=data, is_write_cache=False), True
+
+    # 次のページのリクエストを先に行い、htmlを取得する(prefetch, asyncio)
+    async def _aprefetch_result(self, url: str, method='GET', data=None):
+        """_aprefetch_result
+
+        Coroutine version of `_prefetch_result`.
+        When cancelled, the blocking part already running in the thread pool is waited for (see `_arun_until_done`).
+
+        Args:
+            url (str): request url.
+            method (str, optional): request method. Defaults to 'GET'.
+            data (optional): data used for POST method. Defaults to None.
+
+        Returns:
+            str: html.
+            bool: True if the response has been fetched (and has to be written to the cache).
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return await self._arun_until_done(self.ENGINE.get_result, url, method=method, data=data), False
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = await self._arun_until_done(self._read_cache, url, method, data)
+        if result is not None:
+            return result, False
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける(待機中に取り消された場合はリクエストを行わない)
+        await self.RATE_LIMITER.aacquire(self.ENGINE, 'search')
+
+        return await self._arun_until_done(
+            self.ENGINE.fetch_result, url, method=method, data=data, is_write_cache=False), True
+
+    # executorで処理を行う(取り消された場合も、実行中の処理の完了を待つ)
+    @staticmethod
+    async def _arun_until_done(func, *args, **kwargs):
+        """_arun_until_done
+
+        Run func in the thread pool like `run_in_executor`, but when the task is cancelled,
+        wait until func has finished before raising CancelledError,
+        so that the session is not used by a cancelled prefetch and the next request at the same time.
+        """
+
+        import asyncio
+
+        future = asyncio.ensure_future(run_in_executor(func, *args, **kwargs))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    # 使用しないprefetchを取り消す
+    @staticmethod
+    def _discard_prefetch(future):
+        """_discard_prefetch
+
+        Cancel the prefetch if it has not started yet, otherwise wait for it and discard its result.
+
+        Args:
+            future (concurrent.futures.Future): future of `_prefetch_result`.
+        """
+
+        if not future.cancel():
+            futures_wait([future])
+
+    # 使用しないprefetchを取り消す(asyncio)
+    @staticmethod
+    async def _adiscard_prefetch(task):
+        """_adiscard_prefetch
+
+        Coroutine version of `_discard_prefetch`.
+
+        Args:
+            task (asyncio.Task): task of `_aprefetch_result`.
+        """
+
+        import asyncio
+
+        task.cancel()
+        await asyncio.wait([task])
+
+        # 結果(例外)は破棄する
+        if not task.cancelled():
+            task.exception()
+
+    # 検索処理のgeneratorを1ステップ進める
+    @staticmethod
+    def _send_process(process, response):
+        """_send_process
+
+        Send the response to the search process generator, and receive the next step.
+        (StopIteration cannot be passed through the executor, so it is converted to a return value.)
+
+        Args:
+            process (generator): generator created by `_search_process`.
+            response (str): response html of the previous request (None otherwise).
+
+        Returns:
+            bool: True if the search process is finished.
+            tuple: next step (`('request', (method, url, data))` or `('links', links)`), or None if finished.
+        """
+
+        try:
+            return False, process.send(response)
+        except StopIteration:
+            return True, None
+
+    # 通信以外の検索処理を行うgenerator
+    def _search_process(self, keyword: str, search_type: str, maximum: int):
+        """_search_process
+
+        Generator that performs the search process except for the communication.
+        It yields `('request', (method, url, data))` and receives the response html with `send()`,
+        and yields `('links', links)` each time a page has been parsed.
+        The same process is used by both `iter_search` and `aiter_search`.
+
+        In prefetch mode, `('prefetch', (method, url, data))` is yielded after a page has been parsed
+        and the search is known to continue (so the next url reflects the parsed page), before its links:
+        the caller starts the request in the background (nothing is sent back) while the links are consumed,
+        and the same request is yielded next as `('request', ...)` to receive its response.
+
+        Args:
+            keyword (str): query.
+            search_type (str): search type. text or image.
+            maximum (int): Max count of searches.
+
+        Yields:
+            tuple: `('request', (method, url, data))`, `('prefetch', (method, url, data))` or `('links', links)` (links without `num`).
+        """
+
+        total = 0
+
+        # クエリ内で出現したurlのhashと、新しいurlが含まれないページの連続回数(飽和の検出用)
+        fingerprints = set()
+        stale_pages = 0
+
+        # 重複チェックに使用するindex(queryの範囲の場合は、検索ごとに新しく作成する)
+        dedup_index = self.ENGINE.DEDUP
+        if dedup_index is not None and self.ENGINE.DEDUP_SCOPE == 'query':
+            from .dedup import DedupIndex
+            dedup_index = DedupIndex()
+
+        # 次のページのリクエスト(prefetchで先にリクエストを開始したもの)と、そのリクエストで要求した件数
+        next_request = None
+        next_page_size = None
+
+        # 1ページごとの件数の学習待ちの値(次のページにも検索結果があった場合に学習する)
+        pending_page_size = None
+
+        # 検索処理の開始
+        gen_url = self.ENGINE.gen_search_url(keyword, search_type)
+        while True:
+            # リクエスト先のurlを取得(prefetch済みの場合はそのリクエスト)
+            if next_request is None:
+                next_request, next_page_size = self._gen_next_request(gen_url, search_type, maximum - total)
+                if next_request is None:
+                    break
+
+            (method, url, data), page_size = next_request, next_page_size
+            next_request = None
+
+            # debug
+            self.ENGINE.MESSAGE.print_text(
+                url,
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [TargetURL]' + Color.END
+            )
+
+            # debug
+            self.ENGINE.MESSAGE.print_text(
+                self.ENGINE.USER_AGENT,
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [UserAgent]' + Color.END
+            )
+
+            # 検索結果の取得(リクエストは呼び出し元で行う)
+            html = yield 'request', (method, url, data)
+
+            # debug
+            self.ENGINE.MESSAGE.print_text(
+                html,
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [Response]' + Color.END
+            )
+
+            # 初期値
+            is_recaptcha = False
+
+            while True:
+                # ReCaptchaページかどうかを識別
+                if html is not None:
+                    is_recaptcha = self.ENGINE.check_recaptcha(html)
+                else:
+                    break
+
+                if is_recaptcha:
+                    # commandの場合の出力処理
+                    self.ENGINE.MESSAGE.print_text(
+                        'Oh, Redirect to ReCaptcha Window.',
+                        mode='warn',
+                        header=self.ENGINE.MESSAGE.ENGINE,
+                        separator=": "
+                    )
+
+                    # headless browserを使っている場合
+                    if self.ENGINE.USE_SELENIUM or self.ENGINE.USE_SPLASH:
+                        # byass用の関数にわたす
+                        html = self.ENGINE.bypass_recaptcha(
+                            url, html)  # type: ignore
+
+                        if html is not None:
+                            # debug
+                            self.ENGINE.MESSAGE.print_text(
+                                html,
+                                mode='debug',  # type: ignore
+                                header=self.ENGINE.MESSAGE.HEADER + ': ' + Color.GRAY + \
+                                '[DEBUG]: [ReCaptchaedResponse]' + Color.END,
+                                separator=": "
+                            )
+
+                    else:
+                        # headless browserが無い場合、Recaptchaには対応していない旨のエラーメッセージを出力する
+                        None
+
+                else:  # is_recaptchaがFalseの場合、whileを抜ける
+                    break
+
+            # htmlがNone、かつReCaptchaチェックでTrueであった場合
+            if html is None and is_recaptcha:
+                # commandの場合の出力処理
+                self.ENGINE.MESSAGE.print_text(
+                    'FAiled ReCaptcha. exit process.',
+                    mode='warn',
+                    header=self.ENGINE.MESSAGE.ENGINE,
+                    separator=": "
+                )
+
+                break
+
+            # 検索結果をパースしてurlリストを取得する
+            links = self.ENGINE.get_links(
+                url, html, search_type)  # type: ignore
+
+            # 次のページがあるかどうか(各検索エンジンで判定する)
+            has_next_page = self.ENGINE.has_next_page(links, search_type)
+
+            # 前のページで返された件数を学習する(最後のページの件数を学習しないよう、次のページにも検索結果があった場合のみ)
+            # (各エンジンの加工処理で除外した分を含めた、検索エンジンが返した件数で学習する)
+            if pending_page_size is not None and len(links):
+                self.ENGINE.learn_page_size(search_type, *pending_page_size)
+            pending_page_size = (page_size, self.ENGINE.RETURNED_LINK_COUNT) if page_size and has_next_page else None
+
+            # linksの件数に応じて処理を実施
+            if not len(links):
+                # commandの場合の出力処理
+                self.ENGINE.MESSAGE.print_text(
+                    'No more links.',
+                    header=self.ENGINE.MESSAGE.ENGINE,
+                    separator=": ",
+                    file=sys.stderr,
+                )
+
+                # loopを抜ける
+                if not has_next_page:
+                    break
+
+                # 次のページがある場合は、重複チェックを行わずに次のページへ
+                continue
+
+            # 新しいurlが含まれないページが続いた場合、検索結果が飽和したとみなしてloopを抜ける
+            # (遷移先を取得中の検索結果しか無いページは判定できないため、数えない)
+            resolved_links = [d for d in links if d.get('status') != 'pending']
+            if self.ENGINE.SATURATION_PAGES > 0 and resolved_links:
+                stale_pages = 0 if self._count_novel_links(resolved_links, fingerprints) else stale_pages + 1
+                if stale_pages >= self.ENGINE.SATURATION_PAGES:
+                    # debug
+                    self.ENGINE.MESSAGE.print_text(
+                        'stop paging: no new urls on {0} consecutive pages'.format(stale_pages),
+                        mode='debug',
+                        separator=": ",  # type: ignore
+                        header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                        Color.GRAY + '[DEBUG]: [Saturation]' + Color.END
+                    )
+
+                    break
+
+            # すでに出現したurlの検索結果を除外する(maximumを超える分はindexに追加しない)
+            if dedup_index is not None:
+                links = self._dedup_links(links, dedup_index, maximum - total)
+
+            # maximumで指定した件数を超える場合、その件数までを返してloopを抜ける
+            if len(links) >= maximum - total:
+                yield 'links', links[:maximum - total]
+                break
+
+            total += len(links)
+
+            # 次のページのリクエストを、このページの検索結果の処理と並行して開始する(prefetch)
+            # (次のページのurlはこのページの解析後に取得し、検索を続ける場合のみ行う)
+            if has_next_page and self.ENGINE.can_prefetch(search_type):
+                next_request, next_page_size = self._gen_next_request(gen_url, search_type, maximum - total)
+                if next_request is not None:
+                    yield 'prefetch', next_request
+
+            yield 'links', links
+
+            # 次のページが無い場合はloopを抜ける
+            if not has_next_page:
+                break
+
+    # 次のページのリクエストを取得する
+    def _gen_next_request(self, gen_url, search_type: str, limit: int):
+        """_gen_next_request
+
+        Get the next request from the url generator of the engine, and the count of results requested by it.
+
+        Args:
+            gen_url (generator): generator created by `ENGINE.gen_search_url`.
+            search_type (str): search type. text or image.
+            limit (int): remaining count of results (the requested count is limited to it when the page size is learned).
+
+        Returns:
+            tuple: `(method, url, data)` (None if there is no next page).
+            int: requested count of results (None if not specified by the engine).
+        """
+
+        # 残りの必要件数(件数の学習が有効な場合、リクエストする件数をこの件数までに抑える)
+        self.ENGINE.PAGE_SIZE_LIMIT = limit
+        try:
+            request = next(gen_url)
+        except Exception:
+            return None, None
+
+        # このリクエストで要求した件数
+        return request, self.ENGINE.get_page_size(search_type)
+
+    # ページ内の、クエリ内で初めて出現したurlの件数を数える
+    def _count_novel_links(self, links: list, fingerprints: set):
+        """_count_novel_links
+
+        Count the urls in the page that have not been seen in the same query, add them to `fingerprints`,
+        and print the count in the debug output.
+
+        Args:
+            links (list): results of a page.
+            fingerprints (set): hashes of the canonicalized urls seen in the query.
+
+        Returns:
+            int: count of new urls.
+        """
+
+        from .dedup import DedupIndex
+
+        novel = 0
+        for d in links:
+            key = DedupIndex.gen_key(d['link'])
+            if key not in fingerprints:
+                fingerprints.add(key)
+                novel += 1
+
+        # debug
+        self.ENGINE.MESSAGE.print_text(
+            '{0} new urls on this page ({1} in the query)'.format(novel, len(fingerprints)),
+            mode='debug',
+            separator=": ",  # type: ignore
+            header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+            Color.GRAY + '[DEBUG]: [Saturation]' + Color.END
+        )
+
+        return novel
+
+    # すでに出現したurlの検索結果を除外する
+    def _dedup_links(self, links: list, index: 'DedupIndex', limit: int):
+        """_dedup_links
+
+        Drop the results already returned in the dedup scope, and print the number of dropped results in the debug output.
+
+        Args:
+            links (list): results of a page.
+            index (DedupIndex): index of the search (`ENGINE.DEDUP`, or the index created for each search with the `query` scope).
+            limit (int): max count of results to return.
+
+        Returns:
+            list: results without duplicates.
+        """
+
+        # 重複チェックの範囲を表すkey(queryの範囲の場合は、検索ごとのindexを使用する)
+        scope = ''
+        if self.ENGINE.DEDUP_SCOPE == 'engine':
+            scope = self.ENGINE.NAME
+
+        before = index.count_duplicates(scope)
+        links = index.filter(links, scope, limit)
+        after = index.count_duplicates(scope)
+
+        # debug
+        self.ENGINE.MESSAGE.print_text(
+            'dropped {0} duplicates on this page ({1} in total, scope: {2})'.format(
+                after - before, after, self.ENGINE.DEDUP_SCOPE),
+            mode='debug',
+            separator=": ",  # type: ignore
+            header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+            Color.GRAY + '[DEBUG]: [Duplicates]' + Color.END
+        )
+
+        return links
+
+    # suggestを取得する
+    def suggest(self, keyword: str, jap=False, alph=False, num=False):
+        """suggest
+
+        get suggest with a search engine.
+
+        Args:
+            keyword (str): query
+            jap (bool, optional): with japanese char. Defaults to False.
+            alph (bool, optional): with alphabet char. Defaults to False.
+            num (bool, optional): with number. Defaults to False.
+
+        Returns:
+            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+        """
+
+        # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+        # (`open_session` でsessionを維持している場合はそのsessionを使用する)
+        if not self.IS_KEEP_SESSION:
+            self.ENGINE.create_session()
+
+        # サジェスト取得
+        suggests = self._get_suggests(
+            keyword, self._gen_suggest_chars(jap, alph, num))
+
+        # sessionを終了(維持している場合は `close_session` で終了する)
+        if not self.IS_KEEP_SESSION:
+            self.ENGINE.close_session()
+
+        return suggests
+
+    # suggestを取得する(asyncio)
+    async def asuggest(self, keyword: str, jap=False, alph=False, num=False):
+        """asuggest
+
+        Coroutine version of `suggest`.
+
+        Args:
+            keyword (str): query
+            jap (bool, optional): with japanese char. Defaults to False.
+            alph (bool, optional): with alphabet char. Defaults to False.
+            num (bool, optional): with number. Defaults to False.
+
+        Returns:
+            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+        """
+
+        # 同じSearchEngineでの他の検索・サジェスト取得の完了を待つ(ENGINEの状態を共有するため)
+        async with self._get_async_lock():
+            # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+            # (`aopen_session` でsessionを維持している場合はそのsessionを使用する)
+            if not self.IS_KEEP_SESSION:
+                await self.ENGINE.acreate_session()
+
+            # サジェスト取得
+            suggests = await self._aget_suggests(
+                keyword, self._gen_suggest_chars(jap, alph, num))
+
+            # sessionを終了(維持している場合は `aclose_session` で終了する)
+            if not self.IS_KEEP_SESSION:
+                await self.ENGINE.aclose_session()
+
+            return suggests
+
+    # サジェストを再帰的に取得する
+    def iter_suggest_crawl(self, keyword: str, depth=2, jap=False, alph=False, num=False, maximum=0):
+        """iter_suggest_crawl
+
+        Crawl the suggest breadth-first: each new suggestion is fed back as a keyword (with the same added characters),
+        up to `depth` levels, and yielded as soon as its parent keyword has been expanded.
+        A suggestion already seen in the crawl (case and spaces are ignored) is neither yielded nor expanded again.
+        Within a level, higher-ranked suggestions are expanded first.
+
+        Args:
+            keyword (str): query
+            depth (int, optional): number of levels (1 is the same as `suggest`). Defaults to 2.
+            jap (bool, optional): with japanese char. Defaults to False.
+            alph (bool, optional): with alphabet char. Defaults to False.
+            num (bool, optional): with number. Defaults to False.
+            maximum (int, optional): max count of suggestions (no limit if 0). Defaults to 0.
+
+        Yields:
+            [dict]: {'suggest': 'zelda switch', 'parent': 'zelda', 'depth': 1}
+
+        Examples:
+            >>> search_engine = SearchEngine()
+            >>> search_engine.set('google')
+            >>>
+            >>> for d in search_engine.iter_suggest_crawl('zelda', depth=3):
+            >>>     print(d['depth'], d['suggest'])
+        """
+
+        # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+        # (`open_session` でsessionを維持している場合はそのsessionを使用する)
+        if not self.IS_KEEP_SESSION:
+            self.ENGINE.create_session()
+
+        # 通信以外の処理は self._suggest_crawl_process で行う
+        process = self._suggest_crawl_process(keyword, depth, maximum)
+        chars = self._gen_suggest_chars(jap, alph, num)
+
+        try:
+            suggests = None
+            while True:
+                is_finished, step = self._send_process(process, suggests)
+                if is_finished:
+                    break
+
+                suggests = None
+                event, data = step  # type: ignore
+                if event == 'expand':
+                    suggests = self._get_suggests(data, chars)
+                else:
+                    yield data
+
+        finally:
+            process.close()
+
+            # sessionを終了(維持している場合は `close_session` で終了する)
+            if not self.IS_KEEP_SESSION:
+                self.ENGINE.close_session()
+
+    # サジェストを再帰的に取得する(asyncio)
+    async def aiter_suggest_crawl(self, keyword: str, depth=2, jap=False, alph=False, num=False, maximum=0):
+        """aiter_suggest_crawl
+
+        Async generator version of `iter_suggest_crawl`.
+
+        Args:
+            keyword (str): query
+            depth (int, optional): number of levels (1 is the same as `suggest`). Defaults to 2.
+            jap (bool, optional): with japanese char. Defaults to False.
+            alph (bool, optional): with alphabet char. Defaults to False.
+            num (bool, optional): with number. Defaults to False.
+            maximum (int, optional): max count of suggestions (no limit if 0). Defaults to 0.
+
+        Yields:
+            [dict]: {'suggest': 'zelda switch', 'parent': 'zelda', 'depth': 1}
+        """
+
+        # 同じSearchEngineでの他の検索・サジェスト取得の完了を待つ(ENGINEの状態を共有するため)
+        async with self._get_async_lock():
+            # ENGINEのproxyやブラウザオプションを、各接続方式(Selenium, Splash, requests)に応じてセットし、ブラウザ(session)を作成する
+            # (`aopen_session` でsessionを維持している場合はそのsessionを使用する)
+            if not self.IS_KEEP_SESSION:
+                await self.ENGINE.acreate_session()
+
+            # 通信以外の処理は self._suggest_crawl_process で行う
+            process = self._suggest_crawl_process(keyword, depth, maximum)
+            chars = self._gen_suggest_chars(jap, alph, num)
+
+            try:
+                suggests = None
+                while True:
+                    is_finished, step = self._send_process(process, suggests)
+                    if is_finished:
+                        break
+
+                    suggests = None
+                    event, data = step  # type: ignore
+                    if event == 'expand':
+                        suggests = await self._aget_suggests(data, chars)
+                    else:
+                        yield data
+
+            finally:
+                process.close()
+
+                # sessionを終了(維持している場合は `aclose_session` で終了する)
+                if not self.IS_KEEP_SESSION:
+                    await self.ENGINE.aclose_session()
+
+    # 通信以外のサジェストの再帰的な取得処理を行うgenerator
+    def _suggest_crawl_process(self, keyword: str, depth: int, maximum: int):
+        """_suggest_crawl_process
+
+        Generator that performs the suggest crawl except for the communication.
+        It yields `('expand', keyword)` and receives the suggest dict of the keyword with `send()`,
+        and yields `('suggest', d)` for each new suggestion.
+
+        The frontier is a heap ordered by (level, rank in the parent's suggestions, discovery order),
+        and the visited set holds the normalized suggestions (`_normalize_suggest`) seen in the crawl.
+
+        Args:
+            keyword (str): query.
+            depth (int): number of levels.
+            maximum (int): max count of suggestions (no limit if 0).
+
+        Yields:
+            tuple: `('expand', keyword)` or `('suggest', {'suggest': ..., 'parent': ..., 'depth': ...})`.
+        """
+
+        frontier = [(0, 0, 0, keyword)]
+        visited = {self._normalize_suggest(keyword)}
+        count = 0
+        order = 0
+
+        while frontier:
+            level, _, _, prefix = heapq.heappop(frontier)
+
+            # debug
+            self.ENGINE.MESSAGE.print_text(
+                '{0} (depth: {1}, frontier: {2}, visited: {3})'.format(prefix, level, len(frontier), len(visited)),
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [SuggestCrawl]' + Color.END
+            )
+
+            suggests = yield 'expand', prefix
+
+            rank = 0
+            for words in suggests.values():
+                for word in words:
+                    key = self._normalize_suggest(word)
+                    if key in visited:
+                        continue
+                    visited.add(key)
+
+                    yield 'suggest', {'suggest': word, 'parent': prefix, 'depth': level + 1}
+
+                    count += 1
+                    if maximum > 0 and count >= maximum:
+                        return
+
+                    # 次の階層で、このサジェストをキーワードとして取得する
+                    if level + 1 < depth:
+                        order += 1
+                        heapq.heappush(frontier, (level + 1, rank, order, word))
+
+                    rank += 1
+
+    # 重複チェック用にサジェストを正規化する
+    @staticmethod
+    def _normalize_suggest(word: str):
+        return ' '.join(word.lower().split())
+
+    # キーワードに文字を追加したサジェストを取得する
+    def _get_suggests(self, keyword: str, chars: list):
+        """_get_suggests
+
+        Get the suggest of `keyword + char` for each char, and merge them in the order of `chars`.
+        The session must be created by the caller.
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+
+        Returns:
+            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+        """
+
+        # キャッシュに無い文字のリクエストのみ並行して行い、結果は文字の順にまとめる
+        cached, missing = self._read_suggest_cache(keyword, chars)
+        responses = self._get_suggest_results(keyword, missing)
+
+        return self._merge_suggests(keyword, chars, cached, missing, responses)
+
+    # キーワードに文字を追加したサジェストを取得する(asyncio)
+    async def _aget_suggests(self, keyword: str, chars: list):
+        """_aget_suggests
+
+        Coroutine version of `_get_suggests`.
+        The cache lookup and the parsing (with the SQLite cache) are executed in the thread pool, not in the loop.
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+
+        Returns:
+            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+        """
+
+        cached, missing = await run_in_executor(self._read_suggest_cache, keyword, chars)
+        responses = await self._aget_suggest_results(keyword, missing)
+
+        return await run_in_executor(self._merge_suggests, keyword, chars, cached, missing, responses)
+
+    # キャッシュからキーワードに文字を追加したサジェストを取得する
+    def _read_suggest_cache(self, keyword: str, chars: list):
+        """_read_suggest_cache
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+
+        Returns:
+            dict: cached suggest of each char.
+            list: chars not in the cache.
+        """
+
+        cached = {}
+
+        # replayモードの場合は記録したレスポンスを使用するため、キャッシュは使用しない
+        if self.SUGGEST_CACHE is not None and not self.ENGINE.is_replay():
+            for char in chars:
+                suggests = self.SUGGEST_CACHE.get(
+                    self.SUGGEST_CACHE.gen_key(self.ENGINE, keyword + char))
+                if suggests is not None:
+                    cached[char] = suggests
+
+        return cached, [char for char in chars if char not in cached]
+
+    # 取得したサジェストをキャッシュに保存し、文字の順にまとめる
+    def _merge_suggests(self, keyword: str, chars: list, cached: dict, missing: list, responses: list):
+        """_merge_suggests
+
+        Parse the responses of the chars not in the cache, save them to the cache,
+        and merge the suggest of all chars in the order of `chars`.
+        The fetched responses are written to the response cache here, in the calling thread,
+        not in the threads sending the requests (see `_fetch_suggest_result`).
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+            cached (dict): cached suggest of each char.
+            missing (list): chars not in the cache.
+            responses (list): responses of `missing` (`_fetch_suggest_result`).
+
+        Returns:
+            [list]: {'with char': ['suggest1', 'suggest2' ...]}
+        """
+
+        is_cache = self.SUGGEST_CACHE is not None and not self.ENGINE.is_replay()
+
+        for char, (html, is_fetched) in zip(missing, responses):
+            if is_fetched:
+                self.ENGINE.write_cache(self.ENGINE.gen_suggest_url(keyword + char), html)
+
+            # TODO: 各エンジンでjson/textの変換処理を別途実装する必要がある
+            cached[char] = self.ENGINE.get_suggest_list(
+                {}, char, html)  # type: ignore
+
+            if is_cache:
+                self.SUGGEST_CACHE.set(
+                    self.SUGGEST_CACHE.gen_key(self.ENGINE, keyword + char), cached[char])
+
+        # キャッシュの値を変更しないよう、listはコピーして返す
+        suggests = {}
+        for char in chars:
+            for key, words in cached[char].items():
+                suggests[key] = list(words)
+
+        if is_cache:
+            # debug
+            self.ENGINE.MESSAGE.print_text(
+                '{0}: {1} hits, {2} misses ({3} hits, {4} misses in total)'.format(
+                    keyword, len(chars) - len(missing), len(missing),
+                    self.SUGGEST_CACHE.HITS, self.SUGGEST_CACHE.MISSES),
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.ENGINE.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [SuggestCache]' + Color.END
+            )
+
+        return suggests
+
+    # サジェスト取得時に並行してリクエストを行う数を返す
+    def _get_suggest_workers(self, count: int):
+        """_get_suggest_workers
+
+        Return the number of suggest requests sent concurrently.
+        Requests are sent one by one with Selenium, since the browser cannot be shared between threads.
+
+        Args:
+            count (int): number of suggest requests.
+
+        Returns:
+            int: number of concurrent requests.
+        """
+
+        if self.ENGINE.USE_SELENIUM:
+            return 1
+
+        return max(1, min(self.ENGINE.SUGGEST_WORKERS, count))
+
+    # キーワードに文字を追加したサジェストのレスポンスを取得する
+    def _get_suggest_results(self, keyword: str, chars: list):
+        """_get_suggest_results
+
+        Send the suggest requests for `keyword + char` through a bounded thread pool,
+        under the rate limit of the search engine.
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+
+        Returns:
+            list: responses (`_fetch_suggest_result`), in the order of `chars`.
+        """
+
+        def get_result(char):
+            url = self.ENGINE.gen_suggest_url(keyword + char)
+            return self._fetch_suggest_result(url)
+
+        workers = self._get_suggest_workers(len(chars))
+        if workers <= 1:
+            return [get_result(char) for char in chars]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pydork_suggest') as executor:
+            return list(executor.map(get_result, chars))
+
+    # キーワードに文字を追加したサジェストのレスポンスを取得する(asyncio)
+    async def _aget_suggest_results(self, keyword: str, chars: list):
+        """_aget_suggest_results
+
+        Coroutine version of `_get_suggest_results`.
+
+        Args:
+            keyword (str): query.
+            chars (list): characters added to the keyword (`_gen_suggest_chars`).
+
+        Returns:
+            list: responses (`_fetch_suggest_result`), in the order of `chars`.
+        """
+
+        import asyncio
+
+        semaphore = asyncio.Semaphore(self._get_suggest_workers(len(chars)))
+
+        async def aget_result(char):
+            async with semaphore:
+                url = self.ENGINE.gen_suggest_url(keyword + char)
+                return await self._afetch_suggest_result(url)
+
+        return await asyncio.gather(*[aget_result(char) for char in chars])
+
+    # サジェストのリクエストを行い、レスポンスを取得する
+    def _fetch_suggest_result(self, url: str):
+        """_fetch_suggest_result
+
+        `_get_result` for the suggest requests sent concurrently.
+        The response is not written to the cache here: writing the cache parses the html (ReCaptcha check)
+        into the document shared by the engine, so the caller writes it (`_merge_suggests`).
+
+        Args:
+            url (str): request url.
+
+        Returns:
+            str: html.
+            bool: True if the response has been fetched (and has to be written to the cache).
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return self.ENGINE.get_result(url), False
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = self._read_cache(url)
+        if result is not None:
+            return result, False
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける
+        self.RATE_LIMITER.acquire(self.ENGINE, 'suggest')
+
+        return self.ENGINE.fetch_result(url, is_write_cache=False), True
+
+    # サジェストのリクエストを行い、レスポンスを取得する(asyncio)
+    async def _afetch_suggest_result(self, url: str):
+        """_afetch_suggest_result
+
+        Coroutine version of `_fetch_suggest_result`.
+
+        Args:
+            url (str): request url.
+
+        Returns:
+            str: html.
+            bool: True if the response has been fetched (and has to be written to the cache).
+        """
+
+        # replayモードの場合は通信を行わないため、キャッシュ・RateLimiterは使用しない
+        if self.ENGINE.is_replay():
+            return await self.ENGINE.aget_result(url), False
+
+        # キャッシュが存在する場合は、リクエストを行わずに返す
+        result = await run_in_executor(self._read_cache, url)
+        if result is not None:
+            return result, False
+
+        # 連続でアクセスすると問題があるため、RateLimiterで間隔を空ける
+        await self.RATE_LIMITER.aacquire(self.ENGINE, 'suggest')
+
+        return await run_in_executor(self.ENGINE.fetch_result, url, is_write_cache=False), True
+
+    # サジェスト取得時にキーワードに追加する文字のリストを生成する
+    @staticmethod
+    def _gen_suggest_chars(jap=False, alph=False, num=False):
+        """_gen_suggest_chars
+
+        Generate a list of characters to add to the keyword when getting suggest.
+
+        Args:
+            jap (bool, optional): with japanese char. Defaults to False.
+            alph (bool, optional): with alphabet char. Defaults to False.
+            num (bool, optional): with number. Defaults to False.
+
+        Returns:
+            [list]: ['', ' ', ' a', ...]
+        """
+
+        # 文字リスト作成
+        chars = ['', ' ']
+
+        # japフラグが有効な場合、キーワードに日本語を含めてサジェストを検索
+        chars += [' ' + chr(i) for i in range(12353, 12436)] if jap else []
+
+        # alphフラグが有効な場合、キーワードにアルファベットを含めてサジェストを検索
+        chars += [' ' + char for char in ascii_lowercase] if alph else []
+
+        # numフラグが有効な場合、キーワードに数字を含めてサジェストを検索
+        chars += [' ' + char for char in digits] if num else []
+
+        return chars
@@ -12,13 +12,13 @@
 
 import requests
 import json
-import asyncio
 import sys
 
 from urllib import parse
-from bs4 import BeautifulSoup
 
 from .engine_common import CommonEngine
+from .result import SearchResult
+from .resolver import RESOLVER
 from .common import Color
 
 
@@ -47,6 +47,15 @@ class Baidu(CommonEngine):
         self.IMAGE_URL = 'https://image.baidu.com/search/acjson'
         self.SUGGEST_URL = 'https://www.baidu.com/sugrec'
 
+        # 1ページごとに要求する検索結果の件数
+        self.PAGE_SIZES = {'text': 50, 'image': 30}
+
+        # prefetchできる検索タイプ
+        self.PREFETCH_TYPES = ['text', 'image']
+
+        # 1ページごとの件数を指定できる検索タイプ
+        self.RESIZABLE_TYPES = ['text', 'image']
+
     def gen_search_url(self, keyword: str, type: str):
         """gen_search_url
 
@@ -62,7 +71,7 @@ class Baidu(CommonEngine):
 
         if type == 'text':
             # 1ページごとの表示件数
-            view_num = 50
+            view_num = self.get_page_size(type)
 
             # 検索urlを指定
             search_url = self.SEARCH_URL
@@ -78,7 +87,7 @@ class Baidu(CommonEngine):
 
         elif type == 'image':
             # 1ページごとの表示件数
-            view_num = 30
+            view_num = self.get_page_size(type)
 
             # example:
             #   'https://image.baidu.com/search/acjson?tn=resultjson_com&logid=10696586825489113064&ipn=rj&ct=201326592&is=&fp=result&queryWord=poop&cl=2&lm=-1&ie=utf-8&oe=utf-8&adpicid=&st=&z=&ic=&hd=&latest=&copyright=&word=poop&s=&se=&tab=&width=&height=&face=&istype=&qc=&nc=1&fr=&expermode=&force=&pn=30&rn=30&gsm=1e&1617708591950='
@@ -105,17 +114,20 @@ class Baidu(CommonEngine):
                 'gsm': '3c',
             }
 
-        page = 0
+        start = 0
         while True:
-            # parameterにページを開始する番号を指定
-            url_param['pn'] = str(page * view_num)
+            # parameterに1ページごとの件数、ページを開始する番号を指定
+            view_num = self.get_page_size(type)
+            url_param['rn'] = view_num
+            url_param['pn'] = str(start)
             params = parse.urlencode(url_param)
 
             target_url = search_url + '?' + params
 
             yield 'GET', target_url, None
 
-            page += 1
+            # 次のページの開始位置(学習した件数が少ない場合はその件数分だけ進める)
+            start += min(view_num, self.get_learned_page_size(type) or view_num)
 
     def gen_suggest_url(self, keyword: str):
         """gen_suggest_url
@@ -171,7 +183,7 @@ class Baidu(CommonEngine):
             # seleniumを使用している場合、htmlで返ってくるためjson要素のみを抽出する
             if self.USE_SELENIUM:
                 html_text = ""
-                soup = BeautifulSoup(html, "lxml")
+                soup = self.parse_html(html).soup
 
                 for text in soup.find_all(text=True):
                     if text.strip():
@@ -191,7 +203,7 @@ class Baidu(CommonEngine):
 
                 for d in data:
                     if 'replaceUrl' in d:
-                        result = dict()
+                        result = SearchResult()
 
                         # 画像ファイルのurlをパラメータに持つvalueを取得する
                         replace_url = d['replaceUrl'][0]['ObjURL']
@@ -209,10 +221,10 @@ class Baidu(CommonEngine):
                             continue
 
                         # 画像urlを取得
-                        result['link'] = replace_url_query_dict['src'][0]
+                        result.link = replace_url_query_dict['src'][0]
 
                         if 'fromPageTitle' in d:
-                            result['title'] = d['fromPageTitle']
+                            result.title = d['fromPageTitle']
 
                         links.append(result)
 
@@ -235,6 +247,7 @@ class Baidu(CommonEngine):
         try:
             data = json.loads(html)
         except Exception:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html, "lxml")
             json_data = soup.select_one('html > body')
             data = json.loads(json_data.text)
@@ -262,91 +275,56 @@ class Baidu(CommonEngine):
             etexts (list): etexts(検索結果のtext)の配列
         """
 
-        # 通常のスクレイピングとは別にセッションを作成
-        session = requests.session()
+        # replayモードの場合は通信を行わないため、リダイレクト先は取得しない
+        if self.is_replay():
+            return elinks, etitles, etexts
 
-        # pool sizeを調整
-        adapter = requests.adapters.HTTPAdapter(
-            pool_connections=100, pool_maxsize=100)
-        session.mount('http://', adapter)
+        # lazy resolveの場合はリダイレクト先の取得を開始し、元のurlのまま返す
+        if self.IS_LAZY_RESOLVE:
+            self.PENDING_LINKS.update(RESOLVER.submit_links(
+                elinks, resolv_url, proxy=self.PROXY, user_agent=self.USER_AGENT,
+                is_target=is_redirect_link))
+            return elinks, etitles, etexts
 
-        # proxyを設定
-        if self.PROXY != '':
-            proxies = {
-                'http': self.PROXY,
-                'https': self.PROXY
-            }
-            session.proxies = proxies
-
-        # user-agentを設定
-        if self.USER_AGENT != '':
-            session.headers.update(
-                {
-                    'User-Agent': self.USER_AGENT,
-                    'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3'
-                }
-            )
-
-        # asyncio loopを作成
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        # リダイレクト先のurlに置き換え
-        elinks = loop.run_until_complete(
-            resolv_links(loop, session, elinks))
-        loop.close()
+        # リダイレクト先のurlに置き換え(プロセス内で共有するRedirectResolverで取得する)
+        elinks = RESOLVER.resolve(
+            elinks, resolv_url, proxy=self.PROXY, user_agent=self.USER_AGENT,
+            is_target=is_redirect_link)
 
         return elinks, etitles, etexts
 
 
-async def resolv_links(loop: asyncio.AbstractEventLoop, session: requests.Session, links: list):
-    """resolv_links
+def is_redirect_link(url: str):
+    """is_redirect_link
 
-    リダイレクト先のurlをパラレルで取得する(Baiduで使用)
+    baiduのリダイレクト用リンク(`http://www.baidu.com/link?url=...`)かどうかを返す.
 
     Args:
-        loop (asyncio.AbstractEventLoop): loop
-        session (requests.Session): 使用するSession
-        links (list): リダイレクト先を取得するurlのリスト
+        url (str): url
 
     Returns:
-        data (list): リダイレクト先を取得したurlのリスト
+        bool: リダイレクト用リンクの場合はTrue
     """
 
-    async def req(session: requests.Session, url: str):
-        task = await loop.run_in_executor(None, resolv_url, session, url)
-        return task
-
-    tasks = []
-    for link in links:
-        task = req(session, link)
-        tasks.append(task)
-
-    data = await asyncio.gather(*tasks)
+    parsed = parse.urlparse(url)
+    return parsed.netloc.endswith('baidu.com') and parsed.path == '/link'
 
-    return data
 
-
-def resolv_url(session: requests.Session, url: str):
+def resolv_url(session: requests.Session, url: str, timeout: float):
     """resolv_url
 
-    リダイレクト先のurlを取得する(Baiduで使用)
+    リダイレクト先のurlを取得する(RedirectResolverから呼び出す).
+    通信エラーの場合は例外(requests.RequestException)をそのまま返す.
 
     Args:
         session (request.Session): リダイレクト先を取得する際に使用するSession
         url (str): リダイレクト先を取得するurl
+        timeout (float): timeout(秒)
+
     Returns:
-        url (str): リダイレクト先のurl
+        url (str): リダイレクト先のurl(Locationヘッダがない場合は元のurl)
     """
-    while True:
-        try:
-            res_header = session.head(url, allow_redirects=False).headers
-        except requests.RequestException:
-            continue
-        except ConnectionError:
-            continue
-        else:
-            url = res_header['Location']
-            break
-
-    return url
+
+    res_header = session.head(url, allow_redirects=False, timeout=timeout).headers
+
+    return res_header.get('Location', url)
@@ -13,14 +13,14 @@
 import requests
 import datetime
 import json
-import asyncio
 import re
 
 from urllib import parse
-from bs4 import BeautifulSoup
 
 from .common import Color
 from .engine_common import CommonEngine
+from .result import SearchResult
+from .resolver import RESOLVER
 
 
 class Bing(CommonEngine):
@@ -43,6 +43,15 @@ class Bing(CommonEngine):
         self.IMAGE_URL = 'https://www.bing.com/images/async'
         self.SUGGEST_URL = 'https://www.bing.com/AS/Suggestions'
 
+        # 1ページごとに要求する検索結果の件数
+        self.PAGE_SIZES = {'text': 100, 'image': 100}
+
+        # prefetchできる検索タイプ
+        self.PREFETCH_TYPES = ['text', 'image']
+
+        # 1ページごとの件数を指定できる検索タイプ
+        self.RESIZABLE_TYPES = ['text', 'image']
+
     def gen_search_url(self, keyword: str, type: str):
         """gen_search_url
 
@@ -81,7 +90,7 @@ class Bing(CommonEngine):
             # 検索パラメータの設定
             url_param = {
                 'q': keyword,    # 検索キーワード
-                'count': '100',  # 1ページごとの表示件数
+                'count': str(self.get_page_size(type)),  # 1ページごとの表示件数
                 'search': '送信',
                 'rdr': '1',
                 'from': 'PERE',
@@ -121,7 +130,7 @@ class Bing(CommonEngine):
             # 検索パラメータの設定
             url_param = {
                 'q': keyword,    # 検索キーワード
-                'count': '100',  # 1回ごとの件数
+                'count': str(self.get_page_size(type)),  # 1回ごとの件数
                 'first': '',     # 検索位置
                 'tsc': 'ImageBasicHover',
                 'layout': 'RowBased',
@@ -130,17 +139,36 @@ class Bing(CommonEngine):
             # rangeが指定されている場合
             # TODO: 日時パラメータを追加(ex: `qft=+filterui%3aage-lt43200`)
 
-        page = 0
+        start = 0
         while True:
-            # parameterにページを開始する番号を指定
-            url_param['first'] = str(page * 100)
+            # parameterに1ページごとの件数、ページを開始する番号を指定
+            count = self.get_page_size(type)
+            url_param['count'] = str(count)
+            url_param['first'] = str(start)
             params = parse.urlencode(url_param)
 
             target_url = search_url + '?' + params
 
             yield 'GET', target_url, None
 
-            page += 1
+            # 次のページの開始位置(学習した件数が少ない場合はその件数分だけ進める)
+            start += min(count, self.get_learned_page_size(type) or count)
+
+    def has_next_page(self, links: list, type: str):
+        """has_next_page
+
+        次のページがあるかどうかを返す.
+        Bingの場合、検索結果が最後まで表示された後も次のページが表示されてしまうため、10件未満のページを最後のページとみなす.
+
+        Args:
+            links (list): 直前に解析したページの検索結果.
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            bool: 次のページがある場合はTrue.
+        """
+
+        return len(links) >= 10
 
     def gen_suggest_url(self, keyword: str):
         """gen_suggest_url
@@ -191,7 +219,7 @@ class Bing(CommonEngine):
         return links
 
     # 画像検索ページの検索結果(links(list()))を生成するfunction
-    def get_image_links(self, soup: BeautifulSoup):
+    def get_image_links(self, soup):
         """get_image_links
         BeautifulSoupから画像検索ページを解析して結果を返す関数.
 
@@ -214,11 +242,11 @@ class Bing(CommonEngine):
             elink = je['purl']
             eimage = je['murl']
 
-            el = {
-                'title': etitle,
-                'pagelink': elink,
-                'link': eimage,
-            }
+            el = SearchResult(
+                title=etitle,
+                pagelink=elink,
+                link=eimage,
+            )
 
             result.append(el)
 
@@ -237,6 +265,7 @@ class Bing(CommonEngine):
         Returns:
             dict: サジェスト配列
         """
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'lxml')
         elements = soup.select('ul > li')
         suggests[char if char == '' else char[-1]] = [e['query']
@@ -260,102 +289,64 @@ class Bing(CommonEngine):
             etexts (list): etexts(検索結果のtext)の配列
         """
 
-        # 通常のスクレイピングとは別にセッションを作成
-        session = requests.session()
-
-        # pool sizeを調整
-        adapter = requests.adapters.HTTPAdapter(
-            pool_connections=100, pool_maxsize=100)
-        session.mount('https://', adapter)
-
-        # proxyを設定
-        if self.PROXY != '':
-            proxies = {
-                'http': self.PROXY,
-                'https': self.PROXY
-            }
-            session.proxies = proxies
-
-        # user-agentを設定
-        if self.USER_AGENT != '':
-            session.headers.update(
-                {
-                    'User-Agent': self.USER_AGENT,
-                    'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3'
-                }
-            )
+        # replayモードの場合は通信を行わないため、リダイレクト先は取得しない
+        if self.is_replay():
+            return elinks, etitles, etexts
 
-        # asyncio loopを作成
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # lazy resolveの場合はリダイレクト先の取得を開始し、元のurlのまま返す
+        if self.IS_LAZY_RESOLVE:
+            self.PENDING_LINKS.update(RESOLVER.submit_links(
+                elinks, resolv_url, proxy=self.PROXY, user_agent=self.USER_AGENT,
+                is_target=is_redirect_link))
+            return elinks, etitles, etexts
 
-        # リダイレクト先のurlに置き換え
-        elinks = loop.run_until_complete(
-            resolv_links(loop, session, elinks))
-        loop.close()
+        # リダイレクト先のurlに置き換え(プロセス内で共有するRedirectResolverで取得する)
+        elinks = RESOLVER.resolve(
+            elinks, resolv_url, proxy=self.PROXY, user_agent=self.USER_AGENT,
+            is_target=is_redirect_link)
 
         return elinks, etitles, etexts
 
 
-async def resolv_links(loop: asyncio.AbstractEventLoop, session: requests.Session, links: list):
-    """resolv_links
+def is_redirect_link(url: str):
+    """is_redirect_link
 
-    リダイレクト先のurlをパラレルで取得する(Baiduで使用)
+    bingの遷移ページ(`https://www.bing.com/ck/a?...`)のurlかどうかを返す.
 
     Args:
-        loop (asyncio.AbstractEventLoop): loop
-        session (requests.Session): 使用するSession
-        links (list): リダイレクト先を取得するurlのリスト
+        url (str): url
 
     Returns:
-        data (list): リダイレクト先を取得したurlのリスト
+        bool: 遷移ページのurlの場合はTrue
     """
 
-    async def req(session: requests.Session, url: str):
-        task = await loop.run_in_executor(None, resolv_url, session, url)
-        return task
-
-    tasks = []
-    for link in links:
-        # urlをパース
-        url = parse.urlparse(link)
+    parsed = parse.urlparse(url)
+    return parsed.netloc == 'www.bing.com' and parsed.path == '/ck/a'
 
-        # bingの遷移ページの場合はリダイレクトして処理
-        if url.netloc == 'www.bing.com' and url.path == '/ck/a':
-            task = req(session, link)
-            tasks.append(task)
 
-    data = await asyncio.gather(*tasks)
-
-    return data
+def resolv_url(session: requests.Session, url: str, timeout: float):
+    """resolv_url
 
+    遷移ページのbodyからリダイレクト先のurlを取得する(RedirectResolverから呼び出す).
+    通信エラーの場合は例外(requests.RequestException)をそのまま返す.
 
-def resolv_url(session: requests.Session, url: str):
-    """resolv_url
-    リダイレクト先のurlを取得する(Baiduで使用)
     Args:
         session (request.Session): リダイレクト先を取得する際に使用するSession
         url (str): リダイレクト先を取得するurl
+        timeout (float): timeout(秒)
+
     Returns:
-        url (str): リダイレクト先のurl
+        url (str): リダイレクト先のurl(取得できなかった場合は元のurl)
     """
 
-    while True:
-        try:
-            # リダイレクト先のbodyを取得する
-            res = session.get(url).text
-
-        except requests.RequestException:
-            continue
-        except ConnectionError:
-            continue
-        else:
-            # resから１行ずつチェック
-            for line in res.splitlines():
-                if re.match('^ +var u', line):
-                    text = re.findall('"([^"]*)"', line)
-                    url = text[0]
-                    break
-            break
+    # リダイレクト先のbodyを取得する
+    res = session.get(url, timeout=timeout).text
+
+    # resから１行ずつチェック
+    for line in res.splitlines():
+        if re.match('^ +var u', line):
+            text = re.findall('"([^"]*)"', line)
+            if len(text) > 0:
+                return text[0]
 
     return url
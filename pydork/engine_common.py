@@ -10,30 +10,179 @@
     * SearchEngine Classから呼び出す、各検索エンジンで共通の処理を保持させる継承用Classである `CommonEngine` を持つモジュール.
 """
 
+import functools
 import requests
 import os
 import pickle
+import re
+import threading
 
-# selenium driver auto install packages
-import chromedriver_autoinstaller
-import geckodriver_autoinstaller
-
-# seleniumrequests
-from seleniumrequests import Chrome, Firefox
-
-# selenium
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# NOTE: selenium(seleniumrequests, driverのauto install用パッケージを含む)、bs4は読み込みに時間がかかるため、
+#       起動時間を短くするよう、使用する関数内で読み込む
 
 from urllib import parse
-from fake_useragent import UserAgent
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
 from datetime import datetime
 
-from .common import Color, Message
+from .common import Color, Message, run_in_executor
+from .result import SearchResult
+from .useragent import get_user_agent_pool
+
+
+# CSSセレクタをlxmlのセレクタ(XPath)にコンパイルする
+@functools.lru_cache(maxsize=None)
+def compile_selector(selector: str):
+    """compile_selector
+
+    CSSセレクタをlxmlのCSSSelector(XPath)にコンパイルする.
+    同じセレクタは1度だけコンパイルし、以降はキャッシュしたものを返す.
+
+    Args:
+        selector (str): CSSセレクタ.
+
+    Returns:
+        CSSSelector: コンパイル済みのセレクタ. selectorがブランクの場合はNone.
+    """
+
+    if selector == '':
+        return None
+
+    return CSSSelector(selector, translator='html')
+
+
+# htmlをlxmlのtreeに変換する
+def parse_html_tree(html: str):
+    """parse_html_tree
+
+    htmlの文字列をlxmlで解析し、ルート要素を返す.
+
+    Args:
+        html (str): 解析するhtml.
+
+    Returns:
+        lxml.html.HtmlElement: ルート要素. htmlが空の場合はNone.
+    """
+
+    # NOTE: encoding宣言付きの文字列はlxmlで読み込めないため、bytesに変換してから渡す
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    try:
+        return lxml_html.document_fromstring(
+            html.encode('utf-8', errors='replace'), parser=parser)
+    except etree.ParserError:
+        return None
+
+
+# htmlの断片(検索結果のtitleなど)からテキストを取得する
+def get_html_text(html: str):
+    """get_html_text
+
+    htmlの断片からタグを取り除いたテキストを返す.
+
+    Args:
+        html (str): htmlの断片.
+
+    Returns:
+        str: テキスト.
+    """
+
+    if html == '':
+        return ''
+
+    return str(lxml_html.fragment_fromstring(html, create_parent='div').text_content())
+
+
+# CSSセレクタに含まれるid, class名を取得する
+@functools.lru_cache(maxsize=None)
+def get_selector_keywords(selector: str):
+    """get_selector_keywords
+
+    CSSセレクタに含まれるid, class名を返す.
+    htmlを解析する前に、文字列として含まれているかを確認するために使用する.
+
+    Args:
+        selector (str): CSSセレクタ.
+
+    Returns:
+        tuple: id, class名のtuple.
+    """
+
+    return tuple(re.findall(r'[#.]([\w-]+)', selector))
+
+
+# 1つのレスポンスに対する解析結果を保持するClass
+class HtmlDocument:
+    """HtmlDocument
+
+    1つのレスポンス(html)に対する解析結果を保持するClass.
+    lxmlのtree, BeautifulSoupはそれぞれ必要になった時点で1度だけ作成し、
+    ReCaptchaの識別、検索結果の取得などで使い回す.
+    """
+
+    def __init__(self, html: str):
+        """[summary]
+
+        Args:
+            html (str): 解析するhtml.
+        """
+
+        self.HTML = html
+        self.TREE = None
+        self.SOUP = None
+        self.IS_PARSED = False
+
+    # lxmlのtree
+    @property
+    def tree(self):
+        if not self.IS_PARSED:
+            self.TREE = parse_html_tree(self.HTML)
+            self.IS_PARSED = True
+
+        return self.TREE
+
+    # BeautifulSoupのオブジェクト
+    @property
+    def soup(self):
+        if self.SOUP is None:
+            from bs4 import BeautifulSoup
+            self.SOUP = BeautifulSoup(self.HTML, 'lxml')
+
+        return self.SOUP
+
+    # htmlに文字列がすべて含まれているかを確認する(解析は行わない)
+    def contains(self, keywords):
+        """contains
+
+        htmlに指定した文字列がすべて含まれているかを、htmlを解析せずに確認する.
+
+        Args:
+            keywords (list): 確認する文字列のlist.
+
+        Returns:
+            bool: すべて含まれている場合はTrue.
+        """
+
+        return all(keyword in self.HTML for keyword in keywords)
+
+    # CSSセレクタに一致する要素を取得する
+    def select(self, selector: str):
+        """select
+
+        lxmlのtreeから、CSSセレクタに一致する要素をドキュメント順に返す.
+
+        Args:
+            selector (str): CSSセレクタ.
+
+        Returns:
+            list: 一致した要素のlist.
+        """
+
+        select = compile_selector(selector)
+        if select is None or self.tree is None:
+            return []
+
+        return select(self.tree)
 
 
 # 各検索エンジン用class共通の処理を記述した継承用class
@@ -64,11 +213,62 @@ class CommonEngine:
         self.MESSAGE: Message
         self.IGNORE_SSL_VERIFY = False
 
+        # requestsで通信する場合に使用するUser Agent(解析処理が特定のhtmlを前提とする検索エンジンで指定する. Noneの場合はデータベースから選択する)
+        self.DEFAULT_USER_AGENT = None
+
+        # リクエスト種別ごとの間隔制限の初期値((requests/sec, burst))
+        self.RATE_LIMITS = {
+            'search': (1 / 3, 1),  # 3秒に1回
+            'suggest': (2.0, 1),  # 0.5秒に1回
+        }
+
+        # サジェスト取得時に、文字ごとのリクエストを並行して行う数
+        self.SUGGEST_WORKERS = 8
+
+        # 検索タイプごとの、1ページごとに要求する検索結果の件数(ページの位置を件数で指定しない検索エンジンは空)
+        self.PAGE_SIZES = dict()
+
+        # 1ページごとの件数を指定できる検索タイプと、実際に返された件数の学習結果(pagesize.PageSizeStore. Noneの場合は無効)
+        # (学習が有効な場合、PAGE_SIZE_LIMIT(検索処理で設定する残りの必要件数)までに件数を抑える)
+        self.RESIZABLE_TYPES = []
+        self.PAGE_SIZE_STORE = None
+        self.PAGE_SIZE_LIMIT = None
+
+        # 最後に解析したページで返された検索結果の件数(processings_elistで除外する前の件数. 件数の学習に使用する)
+        self.RETURNED_LINK_COUNT = 0
+
+        # 次のページのリクエストを、直前のページの検索結果の処理と並行して行うかどうか(prefetch)と、
+        # 次のページのurlが直前のページのレスポンスに依存しない(prefetchできる)検索タイプ
+        self.IS_PREFETCH = False
+        self.PREFETCH_TYPES = []
+
         # ReCaptcha画面かどうかの識別用(初期値(ブランク))
         self.RECAPTCHA_SITEKEY = ''
         self.SOUP_RECAPTCHA_TAG = ''
         self.SOUP_RECAPTCHA_SITEKEY = ''
 
+        # 最後に解析したレスポンスの解析結果(HtmlDocument)
+        self.DOCUMENT = None
+
+        # レスポンスのキャッシュ(cache.ResponseCache. Noneの場合は無効)
+        self.CACHE = None
+
+        # レスポンスの記録・再生用アーカイブ(replay.ResponseArchive. Noneの場合は無効)
+        self.ARCHIVE = None
+
+        # リダイレクト先の取得を待たずに検索結果を返すかどうか(lazy resolve)
+        self.IS_LAZY_RESOLVE = False
+
+        # 遷移先を取得中のlink(lazy resolve時にprocessings_elistで追加する)
+        self.PENDING_LINKS = set()
+
+        # 検索結果の重複チェック用index(dedup.DedupIndex. Noneの場合は無効)と、重複チェックの範囲([run, engine, query])
+        self.DEDUP = None
+        self.DEDUP_SCOPE = 'run'
+
+        # 新しいurlが含まれないページがこの回数続いた場合、検索結果が飽和したとみなして検索を終了する(0の場合は無効)
+        self.SATURATION_PAGES = 2
+
     # 検索エンジンにわたす言語・国の設定を受け付ける
     def set_lang(self, lang: str, locale: str):
         """set_lang
@@ -97,39 +297,34 @@ class CommonEngine:
         self.RANGE_END = end
 
     # user_agentの設定値を受け付ける(引数がない場合はランダム。Seleniumの際は自動的に使用したbrowserのagentを指定)
-    def set_user_agent(self, user_agent: str = None, browser: str = None):  # type: ignore
+    def set_user_agent(self, user_agent: str = None, browser: str = None, key: str = None):  # type: ignore
         """set_user_agent
 
         user_agentの値を受け付ける.
-        user_agentの指定がない場合、 Chromeを使用したものとする.
+        user_agentの指定がない場合、同梱しているUser Agentのデータベース(`useragent.UserAgentPool`)から重み付きでランダムに選択する.
+        ただし、requestsで通信する場合に検索エンジンが `DEFAULT_USER_AGENT` を指定している場合は、そのUser Agentを使用する.
         また、もし`browser`が指定されている場合はそのブラウザのUser Agentを指定する.
+        `key` を指定した場合、同じkeyに対しては常に同じUser Agentを選択する(sticky).
 
         注) seleniumを利用する場合、事前に有効にする必要がある。
 
         Args:
             user_agent (str, optional): User Agentを指定する. Defaults to None.
             browser (str, optional): Seleniumで使用するBrowserを指定する([chrome, firefox]). Defaults to None.
+            key (str, optional): User Agentを固定する場合のkey(cookieファイルのPATHなど). Defaults to None.
         """
 
         if user_agent is None:
             # seleniumが有効になっている場合、そのままSeleniumで利用するブラウザのUAを使用する
             if self.USE_SELENIUM:
                 user_agent = ''
-            else:
-                try:
-                    ua = UserAgent(verify_ssl=False, use_cache_server=True)
-                    if user_agent is None:
-                        if browser is None:
-                            user_agent = ua.firefox
-
-                        elif browser == 'chrome':
-                            user_agent = ua.chrome
 
-                        elif browser == 'firefox':
-                            user_agent = ua.chrome
+            # requestsで通信する場合、解析処理が前提とするhtmlを返すUser Agentを使用する
+            elif not self.USE_SPLASH and self.DEFAULT_USER_AGENT is not None:
+                user_agent = self.DEFAULT_USER_AGENT
 
-                except Exception:
-                    user_agent = 'Mozilla/5.0 (Linux; Android 10; SM-A205U) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.131 Mobile Safari/537.36.'
+            else:
+                user_agent = get_user_agent_pool().choice(browser, key=key)
 
         self.USER_AGENT = user_agent
 
@@ -245,9 +440,13 @@ class CommonEngine:
         """write_cookies
 
         cookiesを `self.COOKIE_FILE` に書き込む.
+        replayモードの場合は書き込まない.
 
         """
 
+        if self.is_replay():
+            return
+
         cookies = None
 
         # seleniumを使う場合
@@ -263,8 +462,28 @@ class CommonEngine:
             cookies = self.session.cookies
 
         # cookieを書き込み
-        with open(self.COOKIE_FILE, 'wb') as f:
+        # (同じcookieファイルを複数のworkerで使用する場合があるため、一時ファイルに書き込んでから置き換える)
+        tmp_cookie_file = '{0}.{1}.tmp'.format(
+            self.COOKIE_FILE, threading.get_ident())
+        with open(tmp_cookie_file, 'wb') as f:
             pickle.dump(cookies, f)
+        os.replace(tmp_cookie_file, self.COOKIE_FILE)
+
+    # session上のcookieを削除する
+    def delete_cookies(self):
+        """delete_cookies
+
+        作成済みのsession(driver)上のcookieを削除する.
+        sessionを検索ごとに作り直さない場合に、cookieファイルの削除と合わせて使用する.
+        """
+
+        # seleniumを使う場合
+        if self.USE_SELENIUM and not self.is_replay():
+            self.driver.delete_all_cookies()
+
+        # splash, requestを使う場合
+        else:
+            self.session.cookies.clear()
 
     # seleniumのOptionsを作成
     def create_selenium_options(self):
@@ -276,6 +495,9 @@ class CommonEngine:
             Options: 指定されたブラウザに応じたSeleniumのOptionsを返す.
         """
 
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
         # browser別の処理
         if self.SELENIUM_BROWSER == 'chrome':
             options = ChromeOptions()
@@ -305,6 +527,12 @@ class CommonEngine:
         Optionsもこの関数で作成する.
         """
 
+        # driverのauto install用パッケージ、seleniumrequests
+        import chromedriver_autoinstaller
+        import geckodriver_autoinstaller
+        from selenium import webdriver
+        from seleniumrequests import Chrome, Firefox
+
         # optionsを取得する
         options = self.create_selenium_options()
 
@@ -392,6 +620,9 @@ class CommonEngine:
             str: htmlの文字列.
         """
 
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         if method == 'GET':
             response = self.driver.get(url)
 
@@ -497,8 +728,14 @@ class CommonEngine:
 
         指定された接続方式(Seleniumなどのヘッドレスブラウザの有無)に応じて、driverやsessionを作成する.
         cookiesの読み込みやproxyの設定が必要な場合、この関数内で処理を行う.
+        replayモードの場合は通信を行わないため、driverの作成・cookieの読み込みは行わない.
         """
 
+        # replayモードの場合
+        if self.is_replay():
+            self.session = requests.session()
+            return
+
         # seleniumを使う場合
         if self.USE_SELENIUM:
             self.create_selenium_driver()
@@ -550,16 +787,37 @@ class CommonEngine:
 
     # sessionをcloseする
     def close_session(self):
-        if self.USE_SELENIUM:
+        if self.USE_SELENIUM and not self.is_replay():
             self.driver.quit()
         else:
             self.session.close()
 
-    # リクエストを投げてhtmlを取得する(selenium/splash/requestで分岐してリクエストを投げるwrapperとして動作させる)
+    # seleniumやsplushなどのヘッドレスブラウザ、request.sessionの作成を行う(asyncio)
+    async def acreate_session(self):
+        """acreate_session
+
+        `create_session` のasyncio版.
+        driverやsessionの作成はブロッキング処理となるため、asyncio版の処理用のthread pool(`get_async_executor`)で処理を行う.
+        """
+
+        await run_in_executor(self.create_session)
+
+    # sessionをcloseする(asyncio)
+    async def aclose_session(self):
+        """aclose_session
+
+        `close_session` のasyncio版.
+        """
+
+        await run_in_executor(self.close_session)
+
+    # リクエストを投げてhtmlを取得する(キャッシュ・記録/再生の処理を行うwrapperとして動作させる)
     def get_result(self, url: str, method='GET', data=None):
         """get_result
 
         接続方式に応じて、urlへGETリクエストを投げてhtmlを文字列で返す関数.
+        キャッシュが有効な場合はキャッシュを使用し、記録(record)・再生(replay)が有効な場合はその処理も行う.
+        キャッシュを参照済みの場合は、キャッシュを参照しない `fetch_result` を使用する.
 
         Args:
             url (str):    リクエストを投げるurl.
@@ -570,6 +828,83 @@ class CommonEngine:
             str: htmlの文字列.
         """
 
+        # replayモードの場合、記録済みのレスポンスを返す(通信は行わない)
+        if self.is_replay():
+            result = self.ARCHIVE.replay(self, method, url, data)  # type: ignore
+
+            if result == '':
+                # debug
+                self.MESSAGE.print_text(
+                    url,
+                    mode='debug',
+                    separator=": ",  # type: ignore
+                    header=self.MESSAGE.HEADER + ': ' + \
+                    Color.GRAY + '[DEBUG]: [ReplayNotFound]' + Color.END
+                )
+
+            return result
+
+        # キャッシュが有効で、キャッシュが存在する場合はそちらを返す
+        result = self.read_cache(url, method=method, data=data)
+        if result is None:
+            return self.fetch_result(url, method=method, data=data)
+
+        # recordモードの場合、レスポンスを記録する
+        self.record_result(url, result, method=method, data=data)
+
+        return result
+
+    # キャッシュを参照せずにリクエストを投げてhtmlを取得する
+    def fetch_result(self, url: str, method='GET', data=None, is_write_cache: bool = True):
+        """fetch_result
+
+        キャッシュを参照せずにリクエストを投げて、htmlを文字列で返す関数(キャッシュを参照済みの場合に使用する).
+        キャッシュが有効な場合はレスポンスを保存し、記録(record)が有効な場合はレスポンスを記録する.
+
+        Args:
+            url (str):    リクエストを投げるurl.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用するdata.
+            is_write_cache (bool): レスポンスをキャッシュに保存するかどうか.
+                                   Falseの場合は呼び出し元で `write_cache` を行う(prefetchで、別threadでのhtmlの解析を避けるため).
+
+        Returns:
+            str: htmlの文字列.
+        """
+
+        result = self.send_request(url, method=method, data=data)
+
+        # キャッシュが有効な場合、レスポンスを保存する
+        if is_write_cache:
+            self.write_cache(url, result, method=method, data=data)
+
+        # recordモードの場合、レスポンスを記録する
+        self.record_result(url, result, method=method, data=data)
+
+        return result
+
+    # recordモードの場合、レスポンスを記録する
+    def record_result(self, url: str, html: str, method='GET', data=None):
+        if self.ARCHIVE is not None:
+            self.ARCHIVE.record(self, method, url, data, html)
+
+    # リクエストを投げてhtmlを取得する(selenium/splash/requestで分岐してリクエストを投げる)
+    def send_request(self, url: str, method='GET', data=None):
+        """send_request
+
+        接続方式に応じて、urlへリクエストを投げてhtmlを文字列で返す関数.
+
+        Args:
+            url (str):    リクエストを投げるurl.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用するdata.
+
+        Returns:
+            str: htmlの文字列.
+        """
+
+        result = None
+
         # 優先度1: Selenium経由でのアクセス
         if self.USE_SELENIUM:
             result = self.request_selenium(url, method=method, data=data)
@@ -597,6 +932,109 @@ class CommonEngine:
 
         return result
 
+    # replayモードかどうかを返す
+    def is_replay(self):
+        """is_replay
+
+        記録済みのレスポンスを再生する(replay)モードかどうかを返す.
+
+        Returns:
+            bool: replayモードの場合はTrue.
+        """
+
+        return self.ARCHIVE is not None and self.ARCHIVE.MODE == 'replay'
+
+    # キャッシュからレスポンスを取得する
+    def read_cache(self, url: str, method='GET', data=None):
+        """read_cache
+
+        キャッシュからレスポンスを取得する.
+
+        Args:
+            url (str):    リクエストを投げるurl.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用するdata.
+
+        Returns:
+            str: htmlの文字列. キャッシュが無効、または存在しない場合はNone.
+        """
+
+        if self.CACHE is None:
+            return None
+
+        result = self.CACHE.get(self.CACHE.gen_key(self, method, url, data))
+
+        if result is not None:
+            # debug
+            self.MESSAGE.print_text(
+                url,
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.MESSAGE.HEADER + ': ' + \
+                Color.GRAY + '[DEBUG]: [CacheHit]' + Color.END
+            )
+
+        return result
+
+    # レスポンスをキャッシュに保存する
+    def write_cache(self, url: str, html: str, method='GET', data=None):
+        """write_cache
+
+        レスポンスをキャッシュに保存する.
+        空のレスポンス、ReCaptcha画面のレスポンスは保存しない.
+
+        Args:
+            url (str):    リクエストを投げたurl.
+            html (str):   レスポンスのhtml.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用したdata.
+        """
+
+        if self.CACHE is None or not html:
+            return
+
+        if self.check_recaptcha(html):
+            return
+
+        self.CACHE.set(
+            self.CACHE.gen_key(self, method, url, data), self.NAME, url, html)
+
+    # リクエストを投げてhtmlを取得する(asyncio)
+    async def aget_result(self, url: str, method='GET', data=None):
+        """aget_result
+
+        `get_result` のasyncio版.
+        Selenium/Splash/requestsいずれの接続方式でも同じsession(driver)を使用するため、
+        リクエストはasyncio版の処理用のthread pool(`get_async_executor`)で処理を行い、待機中はloopを他のtaskに明け渡す.
+
+        Args:
+            url (str):    リクエストを投げるurl.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用するdata.
+
+        Returns:
+            str: htmlの文字列.
+        """
+
+        return await run_in_executor(self.get_result, url, method=method, data=data)
+
+    # キャッシュを参照せずにリクエストを投げてhtmlを取得する(asyncio)
+    async def afetch_result(self, url: str, method='GET', data=None):
+        """afetch_result
+
+        `fetch_result` のasyncio版.
+
+        Args:
+            url (str):    リクエストを投げるurl.
+            method (str): リクエストメソッド.
+            data (str):   POSTメソッド時に利用するdata.
+
+        Returns:
+            str: htmlの文字列.
+        """
+
+        return await run_in_executor(self.fetch_result, url, method=method, data=data)
+
     # 検索用のurlを生成
     def gen_search_url(self, keyword: str, type: str):
         """gen_search_url
@@ -617,6 +1055,140 @@ class CommonEngine:
         result = {}
         return 'GET', result, None
 
+    # ページング処理
+    #   検索処理(SearchEngine)は、以下の関数のみを使用してページングを行う.
+    #     - gen_search_url: 次のページのリクエスト(method, url, data)を返す
+    #     - has_next_page: 解析したページの検索結果から、次のページがあるかどうかを返す
+    #     - get_page_size: 1ページごとに要求する検索結果の件数を返す
+    #     - can_prefetch: 次のページのリクエストを、直前のページの検索結果の処理と並行して開始できるかどうかを返す
+
+    # 次のページがあるかどうかを返す
+    def has_next_page(self, links: list, type: str):
+        """has_next_page
+
+        直前に解析したページの検索結果(linksの取得直後, 重複除外前)から、次のページがあるかどうかを返す.
+        各検索エンジンで上書きする用の関数. デフォルトでは検索結果が1件以上あれば次のページがあるとみなす.
+
+        Args:
+            links (list): 直前に解析したページの検索結果.
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            bool: 次のページがある場合はTrue.
+        """
+
+        return len(links) > 0
+
+    # 1ページごとに要求する検索結果の件数を返す
+    def get_page_size(self, type: str):
+        """get_page_size
+
+        1ページごとに要求する検索結果の件数を返す.
+        件数の学習(`PAGE_SIZE_STORE`)が有効な場合、学習した件数と残りの必要件数(`PAGE_SIZE_LIMIT`)までに抑える.
+
+        Args:
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            int: 1ページごとに要求する検索結果の件数(件数を指定しない検索エンジンの場合はNone).
+        """
+
+        size = self.PAGE_SIZES.get(type)
+        if size is None or self.PAGE_SIZE_STORE is None or type not in self.RESIZABLE_TYPES:
+            return size
+
+        learned = self.get_learned_page_size(type)
+        if learned is not None:
+            size = min(size, learned)
+
+        if self.PAGE_SIZE_LIMIT is not None:
+            size = max(1, min(size, self.PAGE_SIZE_LIMIT))
+
+        return size
+
+    # 学習した1ページごとの件数を返す
+    def get_learned_page_size(self, type: str):
+        """get_learned_page_size
+
+        Args:
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            int: 学習した件数(学習が無効・未学習の場合はNone).
+        """
+
+        if self.PAGE_SIZE_STORE is None or type not in self.RESIZABLE_TYPES:
+            return None
+
+        return self.PAGE_SIZE_STORE.get(self, type)
+
+    # 実際に返された件数を学習する
+    def learn_page_size(self, type: str, requested: int, returned: int):
+        """learn_page_size
+
+        次のページがあるページで、要求した件数に対して実際に返された件数を学習する.
+        デフォルトの件数(`PAGE_SIZES`)で要求した場合のみ学習する(学習した件数や残りの必要件数に抑えて要求した場合は、
+        検索エンジンが返せる件数より少なくなるため、学習すると件数が小さくなり続ける).
+
+        Args:
+            type (str): 検索タイプ([text, image]).
+            requested (int): 要求した件数.
+            returned (int): 返された件数.
+        """
+
+        if self.PAGE_SIZE_STORE is None or type not in self.RESIZABLE_TYPES:
+            return
+
+        if requested != self.PAGE_SIZES.get(type):
+            return
+
+        if self.PAGE_SIZE_STORE.learn(self, type, requested, returned):
+            # debug
+            self.MESSAGE.print_text(
+                'learned page size: {0} (requested {1}, returned {2})'.format(
+                    self.PAGE_SIZE_STORE.get(self, type), requested, returned),
+                mode='debug',
+                separator=": ",  # type: ignore
+                header=self.MESSAGE.HEADER + ': ' + Color.GRAY + '[DEBUG]: [PageSize]' + Color.END
+            )
+
+    # 次のページのリクエストを先に開始できるかどうかを返す
+    def can_prefetch(self, type: str):
+        """can_prefetch
+
+        prefetchが有効で、次のページのurlが直前のページのレスポンスに依存しない(`PREFETCH_TYPES`)場合にTrueを返す.
+        Seleniumはブラウザを同時に操作できないため対象外とする.
+
+        Args:
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            bool: prefetchできる場合はTrue.
+        """
+
+        return self.IS_PREFETCH and type in self.PREFETCH_TYPES and not self.USE_SELENIUM
+
+    # htmlの解析結果(HtmlDocument)を取得する
+    def parse_html(self, html: str):
+        """parse_html
+
+        htmlの解析結果(HtmlDocument)を返す.
+        直前に解析したものと同じhtmlの場合は、同じHtmlDocumentを返す(ReCaptchaの識別とlinksの取得で解析を使い回すため).
+
+        Args:
+            html (str): 解析するhtml.
+
+        Returns:
+            HtmlDocument: htmlの解析結果.
+        """
+
+        document = self.DOCUMENT
+        if document is None or document.HTML is not html:
+            document = HtmlDocument(html)
+            self.DOCUMENT = document
+
+        return document
+
     # テキスト、画像検索の結果からlinksを取得するための集約function
     def get_links(self, source_url, html: str, type: str):
         """get_links
@@ -632,12 +1204,15 @@ class CommonEngine:
             list: 検索結果(`[{'title': 'title...', 'link': 'https://hogehoge....'}, {...}]`)
         """
 
-        # BeautifulSoupでの解析を実施
-        soup = BeautifulSoup(html, 'lxml')
+        # htmlの解析結果を取得(ReCaptchaの識別時に解析済みの場合は使い回す)
+        document = self.parse_html(html)
 
         if type == 'text':
+            # lxmlでの解析を実施
+            tree = document.tree
+
             # link, titleの組み合わせを取得する
-            elinks, etitles, etexts = self.get_text_links(soup)
+            elinks, etitles, etexts = self.get_text_links(tree)
 
             # before processing elists
             self.MESSAGE.print_text(
@@ -658,6 +1233,8 @@ class CommonEngine:
             )
 
             # 加工処理を行う関数に渡す(各エンジンで独自対応)
+            self.RETURNED_LINK_COUNT = len(elinks)
+            self.PENDING_LINKS = set()
             elinks, etitles, etexts = self.processings_elist(
                 elinks, etitles, etexts)
 
@@ -686,61 +1263,93 @@ class CommonEngine:
             return links
 
         elif type == 'image':
-            links = self.get_image_links(soup)
+            # BeautifulSoupでの解析を実施
+            links = self.get_image_links(document.soup)
+            self.RETURNED_LINK_COUNT = len(links)
 
             return links
 
     # テキスト検索ページの検索結果(links([{link: ..., title: ...},...]))を生成するfunction
-    def get_text_links(self, soup: BeautifulSoup):
+    def get_text_links(self, tree):
         """get_text_links
 
-        BeautifulSoupからテキスト検索ページを解析して結果を返す関数.
+        lxmlのtreeからテキスト検索ページを解析して結果を返す関数.
+        各セレクタに一致した要素をドキュメント順に走査し、linkの要素が見つかるごとに新しい検索結果として扱う.
+        title, textはその後に続く最初の要素を同じ検索結果のものとして紐付ける(見つからない場合はブランク).
 
         Args:
-            soup (BeautifulSoup): 解析するBeautifulSoupオブジェクト.
+            tree (lxml.html.HtmlElement): 解析するlxmlのルート要素.
 
         Returns:
             list: linkの検索結果([xxx,xxx,xxx...])
             list: titleの検索結果([xxx,xxx,xxx...])
             list: textの検索結果([xxx,xxx,xxx...])
         """
-        # linkのurlを取得する
-        self.MESSAGE.print_text(
-            self.SOUP_SELECT_URL,  # type: ignore
-            header=self.MESSAGE.HEADER + ': ' + \
-            Color.GREEN + '[get_text_link.SOUP_SELECT_URL]' + Color.END,
-            separator=" :",
-            mode="debug",
-        )
-        elements = soup.select(self.SOUP_SELECT_URL)
-        elinks = [e['href'] for e in elements]
-
-        # linkのtitleを取得する
-        self.MESSAGE.print_text(
-            self.SOUP_SELECT_TITLE,  # type: ignore
-            header=self.MESSAGE.HEADER + ': ' + \
-            Color.GREEN + '[get_text_link.SOUP_SELECT_TITLE]' + Color.END,
-            separator=" :",
-            mode="debug",
-        )
-        elements = soup.select(self.SOUP_SELECT_TITLE)
-        etitles = [e.text for e in elements]
-
-        # linkのtextを取得する
-        self.MESSAGE.print_text(
-            self.SOUP_SELECT_TEXT,  # type: ignore
-            header=self.MESSAGE.HEADER + ': ' + \
-            Color.GREEN + '[get_text_link.SOUP_SELECT_TEXT]' + Color.END,
-            separator=" :",
-            mode="debug",
-        )
-        elements = soup.select(self.SOUP_SELECT_TEXT)
-        etext = [e.text for e in elements]
-
-        return elinks, etitles, etext
+
+        elinks, etitles, etexts = [], [], []
+
+        for name, selector in (
+            ('SOUP_SELECT_URL', self.SOUP_SELECT_URL),  # type: ignore
+            ('SOUP_SELECT_TITLE', self.SOUP_SELECT_TITLE),  # type: ignore
+            ('SOUP_SELECT_TEXT', self.SOUP_SELECT_TEXT),  # type: ignore
+        ):
+            self.MESSAGE.print_text(
+                selector,
+                header=self.MESSAGE.HEADER + ': ' + \
+                Color.GREEN + '[get_text_link.{0}]'.format(name) + Color.END,
+                separator=" :",
+                mode="debug",
+            )
+
+        if tree is None:
+            return elinks, etitles, etexts
+
+        select_url = compile_selector(self.SOUP_SELECT_URL)  # type: ignore
+        select_title = compile_selector(self.SOUP_SELECT_TITLE)  # type: ignore
+        select_text = compile_selector(self.SOUP_SELECT_TEXT)  # type: ignore
+        if select_url is None:
+            return elinks, etitles, etexts
+
+        # 各セレクタに一致した要素
+        url_elements = set(select_url(tree))
+        title_elements = set(select_title(tree)) if select_title else set()
+        text_elements = set(select_text(tree)) if select_text else set()
+
+        # 全セレクタをまとめたセレクタで、ドキュメント順に要素を取得する
+        select_all = compile_selector(', '.join(
+            s for s in (
+                self.SOUP_SELECT_URL,  # type: ignore
+                self.SOUP_SELECT_TITLE,  # type: ignore
+                self.SOUP_SELECT_TEXT,  # type: ignore
+            ) if s != ''
+        ))
+
+        for element in select_all(tree):  # type: ignore
+            # linkの要素が見つかった場合、新しい検索結果として扱う
+            if element in url_elements:
+                href = element.get('href')
+                if href is not None:
+                    elinks.append(href)
+                    etitles.append(None)
+                    etexts.append(None)
+
+            # 最初のlinkより前の要素は無視する
+            if len(elinks) == 0:
+                continue
+
+            if element in title_elements and etitles[-1] is None:
+                etitles[-1] = str(element.text_content())
+
+            if element in text_elements and etexts[-1] is None:
+                etexts[-1] = str(element.text_content())
+
+        etitles = ['' if t is None else t for t in etitles]
+        etexts = ['' if t is None else t for t in etexts]
+
+        return elinks, etitles, etexts
 
     # 画像検索ページの検索結果(links(list()))を生成するfunction
-    def get_image_links(self, soup: BeautifulSoup):
+    def get_image_links(self, soup):
         """get_image_links
         BeautifulSoupから画像検索ページを解析して結果を返す関数.
         (実際の処理は各検索エンジンごとの関数で実施).
@@ -795,19 +1404,22 @@ class CommonEngine:
         n = 0
         before_link = ""
         for link in elinks:
-            d = dict()
-            d['link'] = link
+            d = SearchResult(link=link)
 
-            # etitle(urlのtitle)をdictに追加する
+            # etitle(urlのtitle)を追加する
             if len(etitles) > n:
-                d['title'] = etitles[n]
+                d.title = etitles[n]
 
-            # etext(urlに対応する検索結果のテキスト文)をdictに追加する
+            # etext(urlに対応する検索結果のテキスト文)を追加する
             if len(etext) > n:
-                d['text'] = etext[n]
+                d.text = etext[n]
 
-            # 検索元urlをdictに追加する
-            d['source_url'] = source_url
+            # 検索元urlを追加する
+            d.source_url = source_url
+
+            # 遷移先を取得中のlinkはstatusを付与する(lazy resolve)
+            if link in self.PENDING_LINKS:
+                d.status = 'pending'
 
             if before_link != link:
                 links.append(d)
@@ -867,16 +1479,21 @@ class CommonEngine:
 
         result = False
 
-        # BeautifulSoupでの識別を実施
-        soup = BeautifulSoup(html, 'lxml')
+        if self.SOUP_RECAPTCHA_TAG == '':
+            return result
+
+        document = self.parse_html(html)
+
+        # 解析前に、SOUP_RECAPTCHA_TAGのid, class名がhtmlに含まれているかを確認する(含まれていない場合は解析不要)
+        if not document.contains(get_selector_keywords(self.SOUP_RECAPTCHA_TAG)):
+            return result
 
         # 要素が存在するかを確認
-        if self.SOUP_RECAPTCHA_TAG != '':
-            elements = soup.select(self.SOUP_RECAPTCHA_TAG)
+        elements = document.select(self.SOUP_RECAPTCHA_TAG)
 
-            # 要素のチェック
-            if len(elements) > 0:
-                result = True
+        # 要素のチェック
+        if len(elements) > 0:
+            result = True
 
         return result
 
@@ -895,6 +1512,10 @@ class CommonEngine:
             str: ReCaptchaを突破後のurlのhtml
         """
 
+        # replayモードの場合はBypassできないため、Noneを返す
+        if self.is_replay():
+            return None
+
         # seleniumを使う場合
         if self.USE_SELENIUM:
             html = self.bypass_recaptcha_selenium(url, html)
@@ -17,10 +17,10 @@ import sys
 
 from time import sleep
 from urllib import parse
-from bs4 import BeautifulSoup
 
 from .common import Color
-from .engine_common import CommonEngine
+from .engine_common import CommonEngine, get_html_text
+from .result import SearchResult
 
 
 class DuckDuckGo(CommonEngine):
@@ -44,6 +44,9 @@ class DuckDuckGo(CommonEngine):
         self.IMAGE_URL = 'https://duckduckgo.com/i.js'
         self.SUGGEST_URL = 'https://duckduckgo.com/ac/'
 
+        # 次のページのurl(`gen_search_url` で初期化し、`get_links` で更新する)
+        self.next_url = ''
+
     def request_selenium(self, url: str, method='GET', data=None):
         if self.SUGGEST_URL in url:
             # 最初にTOPページを表示
@@ -160,6 +163,22 @@ class DuckDuckGo(CommonEngine):
 
             page += 1
 
+    def has_next_page(self, links: list, type: str):
+        """has_next_page
+
+        次のページがあるかどうかを返す.
+        DuckDuckGoの場合、検索結果に含まれる次のページのurl(`get_links` で `next_url` に設定する)の有無で判定する.
+
+        Args:
+            links (list): 直前に解析したページの検索結果.
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            bool: 次のページがある場合はTrue.
+        """
+
+        return len(links) > 0 and self.next_url != ''
+
     def gen_suggest_url(self, keyword: str):
         """gen_suggest_url
 
@@ -213,14 +232,12 @@ class DuckDuckGo(CommonEngine):
 
             for r_data in r_dict:
                 if "u" in r_data and "s" in r_data:
-                    d = {
-                        "link": r_data["u"],
-                        "title": BeautifulSoup(
-                            r_data["t"], "lxml").text,
-                        "text": BeautifulSoup(
-                            r_data["a"], "lxml").text,
-                        "source_url": source_url,
-                    }
+                    d = SearchResult(
+                        link=r_data["u"],
+                        title=get_html_text(r_data["t"]),
+                        text=get_html_text(r_data["a"]),
+                        source_url=source_url,
+                    )
                     links.append(d)
 
                 elif "n" in r_data:
@@ -232,9 +249,8 @@ class DuckDuckGo(CommonEngine):
         elif type == 'image':
             # seleniumを使用している場合、htmlを上書き
             if self.USE_SELENIUM or self.USE_SPLASH:
-                soup = BeautifulSoup(html, "lxml")
-                selected_one = soup.select_one('html > body > pre')
-                html = selected_one.text
+                selected = self.parse_html(html).select('html > body > pre')
+                html = selected[0].text_content()
 
             # jsonとして読み込む
             try:
@@ -247,11 +263,11 @@ class DuckDuckGo(CommonEngine):
                 results = data['results']
 
                 for r in results:
-                    d = {
-                        'link': r['image'],
-                        'title': r['title'],
-                        'pagelink': r['url']
-                    }
+                    d = SearchResult(
+                        link=r['image'],
+                        title=r['title'],
+                        pagelink=r['url']
+                    )
                     links.append(d)
 
             if 'vqd' in data:
@@ -266,8 +282,8 @@ class DuckDuckGo(CommonEngine):
                 )
                 url = base_url + next_path
 
-        if url != "":
-            self.next_url = url
+        # 次のページのurlを更新する(次のページが無い場合はブランクにする)
+        self.next_url = url
 
         return links
 
@@ -14,6 +14,7 @@
 
 import json
 import os
+import re
 
 from time import sleep
 from json.decoder import JSONDecodeError
@@ -22,8 +23,9 @@ from lxml import etree
 # from bs4 import BeautifulSoup
 
 from .common import Color
-from .recaptcha import TwoCaptcha
 from .engine_common import CommonEngine
+from .result import SearchResult
+from .useragent import DEFAULT_USER_AGENT
 
 
 # Google画像検索で使用するパラメータID
@@ -53,9 +55,21 @@ class Google(CommonEngine):
         # 次の検索ページのURL(`self.get_nextpage_url`の処理で取得する)
         self.SEARCH_NEXT_URL = None
 
+        # 1ページごとに要求する検索結果の件数
+        self.PAGE_SIZES = {'text': 100}
+
+        # prefetchできる検索タイプ(画像検索は直前のレスポンスのカーソルを使用するため対象外)
+        self.PREFETCH_TYPES = ['text']
+
+        # 1ページごとの件数を指定できる検索タイプ
+        self.RESIZABLE_TYPES = ['text']
+
         # ReCaptcha画面かどうかの識別用
         self.SOUP_RECAPTCHA_TAG = '#captcha-form > #recaptcha'
 
+        # requestsでの検索結果の解析(`.kCrYT`)はモバイル向けのhtmlを前提とするため、モバイルのUser Agentを使用する
+        self.DEFAULT_USER_AGENT = DEFAULT_USER_AGENT
+
     def gen_search_url(self, keyword: str, type: str):
         """gen_search_url
 
@@ -79,7 +93,7 @@ class Google(CommonEngine):
             url_param = {
                 'q': keyword,   # 検索キーワード
                 'oq': keyword,   # 検索キーワード
-                'num': 100,   # 1ページごとの表示件数.
+                'num': self.get_page_size('text'),   # 1ページごとの表示件数.
                 'filter': 0,  # 類似ページのフィルタリング(0...無効, 1...有効)
                 'nfpr': 1     # もしかして検索(Escape hatch)を無効化
             }
@@ -104,16 +118,19 @@ class Google(CommonEngine):
             except AttributeError:
                 None
 
-            page = 0
+            start = 0
             while True:
-                # parameterにページを開始する番号を指定
-                url_param['start'] = str(page * 100)
+                # parameterに1ページごとの件数、ページを開始する番号を指定
+                url_param['num'] = self.get_page_size('text')
+                url_param['start'] = str(start)
                 params = parse.urlencode(url_param)
 
                 target_url = search_url + '?' + params
 
                 yield 'GET', target_url, None
-                page += 1
+
+                # 次のページの開始位置(学習した件数が少ない場合はその件数分だけ進める)
+                start += min(url_param['num'], self.get_learned_page_size('text') or url_param['num'])
 
         elif type == 'image':
             # 検索用urlを指定
@@ -154,6 +171,22 @@ class Google(CommonEngine):
 
                 yield 'POST', target_url, data
 
+    def has_next_page(self, links: list, type: str):
+        """has_next_page
+
+        次のページがあるかどうかを返す.
+        検索結果が0件の場合でも、次の検索ページのURL(`SEARCH_NEXT_URL`)が取得できている場合は次のページがあるとみなす.
+
+        Args:
+            links (list): 直前に解析したページの検索結果.
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            bool: 次のページがある場合はTrue.
+        """
+
+        return len(links) > 0 or self.SEARCH_NEXT_URL is not None
+
     def gen_suggest_url(self, keyword: str):
         """gen_suggest_url
 
@@ -270,11 +303,11 @@ class Google(CommonEngine):
             title = img[1][9]['2003'][3]  # 画像ファイルのあるページのtitle
             pagelink = img[1][9]['2003'][2]  # 画像ファイルのあるページのurl
             links.append(
-                {
-                    "link": link,
-                    "title": title,
-                    "pagelink": pagelink,
-                }
+                SearchResult(
+                    link=link,
+                    title=title,
+                    pagelink=pagelink,
+                )
             )
 
         return links
@@ -318,21 +351,28 @@ class Google(CommonEngine):
         """
 
         # seleniumでfirefoxを使っていない、かつsplashを使っていない場合
-        new_elinks = []
-        for elink in elinks:
+        # NOTE: title, textとの組み合わせを崩さないよう、linkと一緒に重複除外を行う
+        new_elinks, new_etitles, new_etexts = [], [], []
+        seen = set()
+        for elink, etitle, etext in zip(elinks, etitles, etexts):
             parsed = parse.urlparse(elink)
             parsed_query = parse.parse_qs(parsed.query)
 
             if 'url' in parsed_query and elink[0] == '/':
                 parsed_q = parsed_query['url']
-                if len(parsed_q) > 0:
-                    new_elink = parsed_q[0]
-                    new_elinks.append(new_elink)
-            else:
-                new_elinks.append(elink)
-        elinks = list(dict.fromkeys(new_elinks))
+                if len(parsed_q) == 0:
+                    continue
+                elink = parsed_q[0]
+
+            if elink in seen:
+                continue
 
-        return elinks, etitles, etexts
+            seen.add(elink)
+            new_elinks.append(elink)
+            new_etitles.append(etitle)
+            new_etexts.append(etext)
+
+        return new_elinks, new_etitles, new_etexts
 
     def bypass_recaptcha_selenium(self, url: str, html: str):
         """bypass_recaptcha_selenium
@@ -377,6 +417,7 @@ class Google(CommonEngine):
         # self.IS_DISABLE_HEADLESS がFalseで、かつ`API_KEY_2CAPTCHA`が定義されている場合
         elif TC_API_KEY is not None:
             # solverを作成
+            from .recaptcha import TwoCaptcha
             solver = TwoCaptcha(TC_API_KEY)
 
             # flag set
@@ -536,27 +577,42 @@ def build_rpc_request(keyword: str, cursor: list, page: int):
     )
 
 
+# JSON文字列内のエスケープ(`\` と続く1文字)
+PJSON_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+
+
 def pjson_loads(text):
     """pjson_loads
 
     画像検索で使用するデータの生成用関数.
+    不正なエスケープ(`\\x` など)を含む場合は、すべての不正なエスケープのバックスラッシュを1回の走査でエスケープしてから再度読み込む.
+    (1件ずつ修正して先頭から読み込み直すと、不正なエスケープの件数に対して2乗の時間がかかるため)
 
     Original:
         https://github.com/Wikidepia/py-googleimages/blob/b781b79e9bf40d29cf6fcbdcf625303abf3718bd/googleimages/utils.py
 
     Args:
-        text ([type]): [description]
+        text (str): 読み込むjson文字列.
 
     Returns:
-        [type]: [description]
+        読み込んだデータ.
     """
-    while True:
-        try:
-            data = json.loads(text, strict=False)
-        except JSONDecodeError as exc:
-            if exc.msg == "Invalid \\escape":
-                text = text[: exc.pos] + "\\" + text[exc.pos:]
-            else:
-                raise
-        else:
-            return data
+    try:
+        return json.loads(text, strict=False)
+    except JSONDecodeError as exc:
+        if exc.msg != "Invalid \\escape":
+            raise
+
+    text = PJSON_ESCAPE_RE.sub(_repair_escape, text)
+    return json.loads(text, strict=False)
+
+
+def _repair_escape(match):
+    """_repair_escape
+
+    jsonとして有効なエスケープはそのまま、不正なエスケープはバックスラッシュをエスケープして返す.
+    """
+    if match.group(1) in '"\\/bfnrtu':
+        return match.group(0)
+
+    return '\\' + match.group(0)
@@ -16,10 +16,10 @@ import re
 import sys
 
 from urllib import parse
-from bs4 import BeautifulSoup
 
 from .common import Color
 from .engine_common import CommonEngine
+from .result import SearchResult
 
 
 class Yahoo(CommonEngine):
@@ -43,6 +43,12 @@ class Yahoo(CommonEngine):
         self.IMAGE_URL = 'https://search.yahoo.co.jp/image/api/search'
         self.SUGGEST_URL = 'https://ff.search.yahoo.com/gossip'
 
+        # 1ページごとの検索結果の件数(件数は指定できないため、開始位置の計算にのみ使用する)
+        self.PAGE_SIZES = {'text': 10, 'image': 10}
+
+        # prefetchできる検索タイプ
+        self.PREFETCH_TYPES = ['text']
+
     def gen_search_url(self, keyword: str, type: str):
         """gen_search_url
 
@@ -124,10 +130,7 @@ class Yahoo(CommonEngine):
         page = 0
         while True:
             # parameterにページを開始する番号を指定
-            if type == 'text':
-                url_param['b'] = str(page * 10)
-            elif type == 'image':
-                url_param['b'] = str(page * 10)
+            url_param['b'] = str(page * self.get_page_size(type))
 
             # パラメータをセット
             params = parse.urlencode(url_param)
@@ -180,9 +183,8 @@ class Yahoo(CommonEngine):
                 self.SOUP_SELECT_TEXT = ''
 
                 # Yahooの場合、jsonから検索結果を取得する
-                soup = BeautifulSoup(html, 'lxml')
-                elements = soup.select(self.SOUP_SELECT_JSON)
-                element = elements[0].string
+                elements = self.parse_html(html).select(self.SOUP_SELECT_JSON)
+                element = elements[0].text
 
                 # debug
                 if self.IS_DEBUG:
@@ -223,7 +225,7 @@ class Yahoo(CommonEngine):
         return links
 
     # 画像検索ページの検索結果(links(list()))を生成するfunction
-    def get_image_links(self, soup: BeautifulSoup):
+    def get_image_links(self, soup):
         """get_image_links
         BeautifulSoupから画像検索ページを解析して結果を返す関数.
 
@@ -246,11 +248,11 @@ class Yahoo(CommonEngine):
             elink = d['refererUrl']
             eimage = d['original']['url']
 
-            el = {
-                'title': etitle,
-                'pagelink': elink,
-                'link': eimage,
-            }
+            el = SearchResult(
+                title=etitle,
+                pagelink=elink,
+                link=eimage,
+            )
 
             result.append(el)
 
@@ -270,6 +272,7 @@ class Yahoo(CommonEngine):
             dict: サジェスト配列
         """
         if self.USE_SELENIUM and self.SELENIUM_BROWSER == 'firefox':
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html, features="lxml")
             html = soup.find("pre").text
         data = json.loads(html)
@@ -26,6 +26,7 @@ if lang == 'ja_JP.UTF-8':
     help_message_op_country = "国を指定"
     help_message_op_proxy_server = "プロキシサーバーを指定(例:socks5://hogehoge:8080, https://fugafuga:18080)"
     help_message_op_json = "json形式で出力する"
+    help_message_op_ndjson = "1件ごとに1行のjson(ndjson)形式で、取得した順に出力する(--jsonより優先)"
     help_message_op_insecure = "sslエラーを無視する"
     help_message_op_selenium = "Selenium(headless browser)を使用する(排他: Splashより優先)"
     help_message_op_splash = "Splash(headless browser)を使用する(排他: Seleniumの方が優先)"
@@ -34,6 +35,20 @@ if lang == 'ja_JP.UTF-8':
     help_message_op_color = "color出力の切り替え"
     help_message_op_cookies_dir = "使用するcookieファイルの格納先ディレクトリのPATH(各検索エンジンごとでcookieファイルを個別保存)"
     help_message_op_delete_cookies = "検索クエリ実行ごとにCookieを削除する"
+    help_message_op_sticky_user_agent = "Cookieファイルごとに同じUser Agentを使用する(Selenium・Splashを使用しないGoogleは常に固定のUser Agent)"
+    help_message_op_jobs = "検索エンジンごとに並列で処理するクエリ数を指定(Selenium使用時はその数だけブラウザを起動する)"
+    help_message_op_rate = "検索エンジン・Proxyごとの1秒あたりのリクエスト数を指定(0で制限なし. デフォルトは検索時3秒に1回、サジェスト時0.5秒に1回)"
+    help_message_op_burst = "--rate指定時に連続で送信できるリクエスト数を指定"
+    help_message_op_cache = "検索エンジンのレスポンス(suggestの場合は解析済みのサジェストも)を--cookiesのディレクトリにキャッシュする(キャッシュがある場合はリクエストを送らない)"
+    help_message_op_cache_ttl = "--cache指定時のキャッシュの有効期間(秒)を指定(0で期限なし)"
+    help_message_op_cache_size = "--cache指定時のキャッシュの合計サイズの上限(MB)を指定(0で上限なし)"
+    help_message_op_record = "検索エンジンのレスポンスを指定したファイル(gzip圧縮したJSON Lines)に記録する"
+    help_message_op_replay = "--recordで記録したファイルからレスポンスを再生する(通信は行わない)"
+    help_message_op_lazy_resolve = "リダイレクト用リンク(bing, baidu)の遷移先の取得を待たずに次のページを検索し、遷移先は並行して取得する(遷移先を取得中のリンクは重複除外・飽和検出の対象外)"
+    help_message_op_dedup = "正規化したurlが重複する検索結果を除外する(run: 全検索エンジン・クエリ, engine: 検索エンジンごと, query: 検索ごと)"
+    help_message_op_saturation = "新しいurlが含まれないページが指定した回数続いた場合に検索を終了する(0で無効)"
+    help_message_op_prefetch = "ページの検索結果の出力中に次のページのリクエストを開始する(google, bing, baidu, yahoo. Seleniumでは無効)"
+    help_message_op_adaptive_page_size = "検索エンジンが実際に返す1ページごとの件数を学習して、リクエストする件数を調整する(google, bing, baidu)"
 
     # other_map
     help_message_op_title = "検索結果のタイトルをセットで出力する"
@@ -49,6 +64,8 @@ if lang == 'ja_JP.UTF-8':
     help_message_op_suggest_jap = "日本語の文字を検索キーワードに追加してサジェストを取得"
     help_message_op_suggest_alph = "アルファベット文字を検索キーワードに追加してサジェストを取得"
     help_message_op_suggest_num = "数字を検索キーワードに追加してサジェストを取得"
+    help_message_op_suggest_workers = "文字ごとのサジェストのリクエストを並行して行う数を指定(--rate, --burstの範囲内で行う. Seleniumでは常に1)"
+    help_message_op_suggest_depth = "取得したサジェストを検索キーワードとして、指定した階層まで再帰的にサジェストを取得する(重複したサジェストは除外)"
 
 
 else:
@@ -64,6 +81,7 @@ else:
     help_message_op_country = "Specify country"
     help_message_op_proxy_server = "Specify proxy server(example: socks5://hogehoge:8080, https://fugafuga:18080)"
     help_message_op_json = "Output in json format"
+    help_message_op_ndjson = "Output one json line per result (ndjson) as soon as it is obtained (takes precedence over --json)"
     help_message_op_insecure = "ignore ssl errors"
     help_message_op_selenium = "Use Selenium (headless browser). (exclusive: takes precedence over Splash)"
     help_message_op_splash = "Use Splash (headless browser) (exclusive: Selenium is preferred)"
@@ -72,6 +90,20 @@ else:
     help_message_op_color = "Switching color output"
     help_message_op_cookies_dir = "PATH of the directory where the cookie files to be used are stored (cookie files are stored separately for each search engine)"
     help_message_op_delete_cookies = "Delete cookies on every search query execution"
+    help_message_op_sticky_user_agent = "Use the same User Agent for each cookie file (Google without Selenium/Splash always uses a fixed User Agent)"
+    help_message_op_jobs = "Number of queries processed in parallel for each search engine (with Selenium, the same number of browsers are started)"
+    help_message_op_rate = "Requests per second for each search engine and proxy (0 for no limit. default: once every 3 seconds for search, every 0.5 seconds for suggest)"
+    help_message_op_burst = "Number of requests that can be sent in a row when --rate is specified"
+    help_message_op_cache = "Cache search engine responses (and parsed suggestions for suggest) in the --cookies directory (no request is sent when cached)"
+    help_message_op_cache_ttl = "Cache lifetime in seconds when --cache is specified (0 for no expiration)"
+    help_message_op_cache_size = "Max total size of the cache in MB when --cache is specified (0 for no limit)"
+    help_message_op_record = "Record search engine responses to the specified file (gzip compressed JSON Lines)"
+    help_message_op_replay = "Replay responses from a file recorded with --record (no request is sent)"
+    help_message_op_lazy_resolve = "Do not wait for redirect links (bing, baidu) to be resolved before fetching the next page; resolve them in the background (pending links are not deduplicated nor counted for saturation)"
+    help_message_op_dedup = "Drop results whose canonicalized url has already been returned (run: across all engines and queries, engine: per engine, query: per search)"
+    help_message_op_saturation = "Stop paging after the specified number of consecutive pages without new urls (0 to disable)"
+    help_message_op_prefetch = "Start the request for the next page while the results of the current page are printed (google, bing, baidu, yahoo; not with Selenium)"
+    help_message_op_adaptive_page_size = "Learn the page size the search engine really returns and adjust the requested size (google, bing, baidu)"
 
     # other_map
     help_message_op_title = "Output a set of search result titles"
@@ -87,3 +119,5 @@ else:
     help_message_op_suggest_jap = "Add Japanese characters to search keywords to get suggestions"
     help_message_op_suggest_alph = "Add alphabetic characters to search keywords to get suggestions"
     help_message_op_suggest_num = "Add numbers to search keywords to get suggestions"
+    help_message_op_suggest_workers = "Number of suggest requests (one per added character) sent concurrently, within --rate and --burst (always 1 with Selenium)"
+    help_message_op_suggest_depth = "Feed the suggestions back as keywords, breadth-first up to the specified depth (duplicate suggestions are skipped)"
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""pagesize
+    * 検索エンジンが実際に返す1ページごとの検索結果の件数を学習し、jsonファイルに保存する `PageSizeStore` を持つモジュール.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from time import time
+
+
+# プロセス内で共有するPageSizeStore(keyはファイルのフルパス)
+STORES = dict()
+STORES_LOCK = threading.Lock()
+
+
+# PageSizeStoreを取得する
+def open_store(store_file: str, ttl: int = 7 * 86400):
+    """open_store
+
+    同じファイルに対しては、プロセス内で1つのPageSizeStoreを共有する(複数のworkerから同時に書き込むため).
+
+    Args:
+        store_file (str): 保存先のjsonファイルのPATH.
+        ttl (int, optional): 学習した件数の有効期間(秒). Defaults to 7 days.
+
+    Returns:
+        PageSizeStore: PageSizeStore.
+    """
+
+    store_file = os.path.abspath(os.path.expanduser(store_file))
+
+    with STORES_LOCK:
+        store = STORES.get(store_file)
+        if store is None:
+            store = PageSizeStore(store_file, ttl)
+            STORES[store_file] = store
+
+    return store
+
+
+# 学習した1ページごとの件数を保存するClass
+class PageSizeStore:
+    """PageSizeStore
+
+    検索エンジン・検索タイプ・lang・localeごとに、検索エンジンが実際に返した1ページごとの検索結果の件数を保持し、jsonファイルに保存する.
+    有効期間を過ぎたものは使用しない(検索エンジンの仕様変更で件数が増えた場合に、再度デフォルトの件数から学習し直すため).
+
+    Examples:
+        store = open_store('~/.pydork_cookies/.page_size.json')
+        size = store.get(engine, 'text')
+        store.learn(engine, 'text', 100, 50)
+    """
+
+    # 要求した件数に対して、この割合以上が返された場合は要求どおりの件数を返したとみなす
+    # (ページ内の重複除外などによる多少の減少で、件数を小さくし続けないため)
+    TOLERANCE = 0.8
+
+    def __init__(self, store_file: str, ttl: int = 7 * 86400):
+        """[summary]
+
+        Args:
+            store_file (str): 保存先のjsonファイルのPATH. ブランクの場合は保存しない.
+            ttl (int, optional): 学習した件数の有効期間(秒). Defaults to 7 days.
+        """
+
+        self.STORE_FILE = store_file
+        self.TTL = ttl
+        self.LOCK = threading.Lock()
+
+        # {key: {'size': 件数, 'updated': 更新日時}}
+        self.SIZES = dict()
+
+        self.load()
+
+    # keyを生成する
+    @staticmethod
+    def gen_key(engine, type: str):
+        return '{0}:{1}:{2}:{3}'.format(engine.NAME, type, engine.LANG, engine.LOCALE)
+
+    # ファイルから読み込む
+    def load(self):
+        if self.STORE_FILE == '' or not os.path.exists(self.STORE_FILE):
+            return
+
+        try:
+            with open(self.STORE_FILE) as f:
+                sizes = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        with self.LOCK:
+            self.SIZES = sizes
+
+    # ファイルに保存する
+    def save(self):
+        if self.STORE_FILE == '':
+            return
+
+        with self.LOCK:
+            data = json.dumps(self.SIZES, indent=2, sort_keys=True)
+
+            # 書き込み途中のファイルを読み込まないよう、一時ファイルに書き込んでから置き換える
+            directory = os.path.dirname(self.STORE_FILE)
+            fd, tmp_file = tempfile.mkstemp(dir=directory, prefix='.page_size.')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(data + '\n')
+                os.replace(tmp_file, self.STORE_FILE)
+            except OSError:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+
+    # 学習した件数を取得する
+    def get(self, engine, type: str):
+        """get
+
+        Args:
+            engine (CommonEngine): 検索エンジン.
+            type (str): 検索タイプ([text, image]).
+
+        Returns:
+            int: 学習した件数(未学習・有効期間切れの場合はNone).
+        """
+
+        with self.LOCK:
+            entry = self.SIZES.get(self.gen_key(engine, type))
+
+        if entry is None or entry['updated'] + self.TTL < time():
+            return None
+
+        return entry['size']
+
+    # 1ページごとの件数を学習する
+    def learn(self, engine, type: str, requested: int, returned: int):
+        """learn
+
+        次のページがあるページで、デフォルトの件数(requested)に対して返された件数(returned)から、検索エンジンが返す件数を学習する.
+        検索エンジンが実際に返す最大の件数を学習するため、有効期間内に返された件数の最大値を保存する.
+        最大値が要求した件数の `TOLERANCE` 以上になった場合は、要求どおりの件数を返すとみなして学習した件数を削除する.
+        (学習した件数で要求した場合は、それより多くは返されないため、呼び出し元でデフォルトの件数で要求した場合のみ学習する)
+
+        Args:
+            engine (CommonEngine): 検索エンジン.
+            type (str): 検索タイプ([text, image]).
+            requested (int): 要求した件数(デフォルトの件数).
+            returned (int): 返された件数.
+
+        Returns:
+            bool: 学習した件数が変わった場合はTrue.
+        """
+
+        if requested <= 0 or returned <= 0:
+            return False
+
+        # これまでに返された件数の最大値
+        learned = self.get(engine, type)
+        size = returned if learned is None else max(learned, returned)
+
+        key = self.gen_key(engine, type)
+        with self.LOCK:
+            if size >= requested * self.TOLERANCE:
+                # 要求どおりの件数を返した場合は、学習した件数を削除する
+                if self.SIZES.pop(key, None) is None:
+                    return False
+
+            elif size == learned:
+                return False
+
+            else:
+                self.SIZES[key] = {'size': size, 'updated': time()}
+
+        self.save()
+
+        return True
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""ratelimit
+    * 検索エンジンへのリクエスト間隔を制御する、Token Bucket方式のRate Limiterを持つモジュール.
+"""
+
+import threading
+
+from time import monotonic, sleep
+
+
+# Token Bucket方式でリクエスト間隔を制御するClass
+class TokenBucket:
+    """TokenBucket
+
+    Token Bucket方式でリクエスト間隔を制御するClass.
+    threading/asyncioのどちらから呼び出されても、同一のBucketを共有できるようにしている.
+
+    Examples:
+        bucket = TokenBucket(rate=0.5, burst=2)
+        bucket.acquire()
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """[summary]
+
+        Args:
+            rate (float): 1秒あたりに補充されるtoken数(requests/sec). 0以下の場合は制限なし.
+            burst (int, optional): 溜めておけるtokenの上限数. Defaults to 1.
+        """
+
+        self.LOCK = threading.Lock()
+        self.RATE = rate
+        self.BURST = max(1, burst)
+        self.TOKENS = float(self.BURST)
+        self.UPDATED = monotonic()
+
+    # rate, burstを変更する
+    def set_rate(self, rate: float = None, burst: int = None):  # type: ignore
+        """set_rate
+
+        Bucketのrate, burstを変更する.
+
+        Args:
+            rate (float, optional): 1秒あたりに補充されるtoken数(requests/sec). Defaults to None.
+            burst (int, optional): 溜めておけるtokenの上限数. Defaults to None.
+        """
+
+        with self.LOCK:
+            self._refill()
+
+            if rate is not None:
+                self.RATE = rate
+
+            if burst is not None:
+                self.BURST = max(1, burst)
+                self.TOKENS = min(self.TOKENS, float(self.BURST))
+
+    # 経過時間に応じてtokenを補充する(LOCK取得済みの状態で呼び出すこと)
+    def _refill(self):
+        now = monotonic()
+        if self.RATE > 0:
+            self.TOKENS = min(
+                float(self.BURST), self.TOKENS + (now - self.UPDATED) * self.RATE)
+        self.UPDATED = now
+
+    # tokenを1つ予約し、待機が必要な秒数を返す
+    def reserve(self):
+        """reserve
+
+        tokenを1つ予約し、リクエストを送るまでに待機が必要な秒数を返す.
+        予約した時点でtokenは消費済みとなるため、複数のthread/taskから同時に呼び出された場合でも順番に間隔が空くようになる.
+
+        Returns:
+            float: 待機が必要な秒数.
+        """
+
+        with self.LOCK:
+            # rateが0以下の場合は制限なし
+            if self.RATE <= 0:
+                return 0.0
+
+            self._refill()
+            self.TOKENS -= 1
+
+            if self.TOKENS >= 0:
+                return 0.0
+
+            return -self.TOKENS / self.RATE
+
+    # tokenを取得するまで待機する
+    def acquire(self):
+        """acquire
+
+        tokenを取得できるまで待機する.
+
+        Returns:
+            float: 待機した秒数.
+        """
+
+        wait = self.reserve()
+        if wait > 0:
+            sleep(wait)
+
+        return wait
+
+    # tokenを取得するまで待機する(asyncio)
+    async def aacquire(self):
+        """aacquire
+
+        `acquire` のasyncio版.
+
+        Returns:
+            float: 待機した秒数.
+        """
+
+        # NOTE: asyncioは読み込みに時間がかかるため、asyncio版の処理でのみ読み込む
+        import asyncio
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait
+
+
+# 検索エンジン名・Proxy・リクエスト種別ごとにTokenBucketを管理するClass
+class RateLimiter:
+    """RateLimiter
+
+    検索エンジン名・Proxy・リクエスト種別(`search`, `suggest`)の組み合わせごとにTokenBucketを保持し、共有するClass.
+    rate, burstの初期値は各検索エンジンClassの `RATE_LIMITS` を使用する.
+
+    Examples:
+        limiter = RateLimiter()
+        limiter.set_rate_limit(1.0, burst=3, engine='Google')
+        limiter.acquire(engine, 'search')
+    """
+
+    def __init__(self):
+        self.LOCK = threading.Lock()
+
+        # (engine_name, proxy, kind) をkeyとしたTokenBucketのdict
+        self.BUCKETS = dict()
+
+        # (engine_name, kind) をkeyとした(rate, burst)の上書き設定. engine_nameがNoneの場合は全検索エンジンに適用
+        self.RATE_LIMITS = dict()
+
+    # rate, burstの設定を行う
+    def set_rate_limit(self, rate: float, burst: int = 1, engine: str = None, kind: str = 'search'):  # type: ignore
+        """set_rate_limit
+
+        rate, burstを設定する. 既に作成済みのBucketにも反映する.
+
+        Args:
+            rate (float): 1秒あたりのリクエスト数(requests/sec). 0以下の場合は制限なし.
+            burst (int, optional): 連続で送れるリクエストの上限数. Defaults to 1.
+            engine (str, optional): 対象の検索エンジン名(ex: `Google`). Noneの場合は全検索エンジン. Defaults to None.
+            kind (str, optional): リクエスト種別(`search`, `suggest`). Defaults to 'search'.
+        """
+
+        with self.LOCK:
+            self.RATE_LIMITS[(engine, kind)] = (rate, burst)
+
+            for (name, _, bucket_kind), bucket in self.BUCKETS.items():
+                if bucket_kind == kind and engine in (None, name):
+                    bucket.set_rate(rate, burst)
+
+    # 検索エンジンに対応するTokenBucketを取得する
+    def get_bucket(self, engine, kind: str = 'search'):
+        """get_bucket
+
+        検索エンジン(CommonEngine)とリクエスト種別に対応するTokenBucketを取得する.
+        存在しない場合は新規に作成する.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            kind (str, optional): リクエスト種別(`search`, `suggest`). Defaults to 'search'.
+
+        Returns:
+            TokenBucket: 対応するTokenBucket.
+        """
+
+        key = (engine.NAME, engine.PROXY, kind)
+
+        with self.LOCK:
+            bucket = self.BUCKETS.get(key)
+            if bucket is None:
+                # 設定値の優先順位: 検索エンジン個別の設定 > 全体の設定 > 検索エンジンClassの初期値
+                rate, burst = self.RATE_LIMITS.get(
+                    (engine.NAME, kind),
+                    self.RATE_LIMITS.get((None, kind), engine.RATE_LIMITS[kind])
+                )
+
+                bucket = TokenBucket(rate, burst)
+                self.BUCKETS[key] = bucket
+
+        return bucket
+
+    # リクエストを送れるようになるまで待機する
+    def acquire(self, engine, kind: str = 'search'):
+        """acquire
+
+        検索エンジンへリクエストを送れるようになるまで待機する.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            kind (str, optional): リクエスト種別(`search`, `suggest`). Defaults to 'search'.
+
+        Returns:
+            float: 待機した秒数.
+        """
+
+        return self.get_bucket(engine, kind).acquire()
+
+    # リクエストを送れるようになるまで待機する(asyncio)
+    async def aacquire(self, engine, kind: str = 'search'):
+        """aacquire
+
+        `acquire` のasyncio版.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            kind (str, optional): リクエスト種別(`search`, `suggest`). Defaults to 'search'.
+
+        Returns:
+            float: 待機した秒数.
+        """
+
+        return await self.get_bucket(engine, kind).aacquire()
+
+
+# プロセス内で共有するRateLimiter
+RATE_LIMITER = RateLimiter()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""replay
+    * 検索エンジンから取得したレスポンスを記録(record)・再生(replay)する、`ResponseArchive` を持つモジュール.
+"""
+
+import gzip
+import json
+import os
+import threading
+
+from time import time
+
+from .cache import ResponseCache
+
+
+# (archive_file, mode)をkeyとした、プロセス内で共有するResponseArchiveのdict
+ARCHIVES = dict()
+ARCHIVES_LOCK = threading.Lock()
+
+
+# プロセス内で共有するResponseArchiveを取得する
+def open_archive(archive_file: str, mode: str = 'record'):
+    """open_archive
+
+    ResponseArchiveを取得する.
+    同じファイル・モードの場合は、プロセス内で同じResponseArchiveを共有する(複数threadからの書き込みを排他するため).
+
+    Args:
+        archive_file (str): アーカイブファイル(gzip圧縮したJSON Lines)のPATH.
+        mode (str, optional): `record` or `replay`. Defaults to 'record'.
+
+    Returns:
+        ResponseArchive: ResponseArchive.
+    """
+
+    archive_file = os.path.abspath(os.path.expanduser(archive_file))
+
+    with ARCHIVES_LOCK:
+        archive = ARCHIVES.get((archive_file, mode))
+        if archive is None:
+            archive = ResponseArchive(archive_file, mode)
+            ARCHIVES[(archive_file, mode)] = archive
+
+    return archive
+
+
+# 検索エンジンから取得したレスポンスを記録・再生するClass
+class ResponseArchive:
+    """ResponseArchive
+
+    検索エンジンから取得したレスポンス(html)を、gzip圧縮したJSON Linesのファイルに記録・再生するClass.
+    recordモードでは `CommonEngine.get_result` で取得したレスポンスをファイルに追記し、
+    replayモードでは通信を行わずに記録済みのレスポンスを返す.
+    リクエストの識別には `ResponseCache.gen_key` と同じkeyを使用する.
+
+    Examples:
+        archive = open_archive('serps.jsonl.gz', 'record')
+        archive.record(engine, 'GET', url, None, html)
+
+        archive = open_archive('serps.jsonl.gz', 'replay')
+        html = archive.replay(engine, 'GET', url, None)
+    """
+
+    def __init__(self, archive_file: str, mode: str = 'record'):
+        """[summary]
+
+        Args:
+            archive_file (str): アーカイブファイル(gzip圧縮したJSON Lines)のPATH.
+            mode (str, optional): `record` or `replay`. Defaults to 'record'.
+        """
+
+        if mode not in ('record', 'replay'):
+            raise ValueError('mode must be record or replay: {0}'.format(mode))
+
+        self.ARCHIVE_FILE = archive_file
+        self.MODE = mode
+        self.LOCK = threading.Lock()
+
+        # keyごとのレスポンスのlist(同じリクエストが複数記録されている場合は、記録された順に返す)
+        self.RESPONSES = dict()
+        self.INDEXES = dict()
+
+        if mode == 'replay':
+            self.load()
+
+    # アーカイブファイルを読み込む
+    def load(self):
+        """load
+
+        アーカイブファイルから記録済みのレスポンスを読み込む.
+        """
+
+        responses = dict()
+        with gzip.open(self.ARCHIVE_FILE, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip() == '':
+                    continue
+
+                record = json.loads(line)
+                responses.setdefault(record['key'], []).append(record['html'])
+
+        with self.LOCK:
+            self.RESPONSES = responses
+            self.INDEXES = dict()
+
+    # レスポンスを記録する
+    def record(self, engine, method: str, url: str, data, html: str):
+        """record
+
+        レスポンスをアーカイブファイルに追記する.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            method (str): リクエストメソッド.
+            url (str): リクエスト先のurl.
+            data (optional): POSTメソッド時に利用したdata.
+            html (str): レスポンスのhtml.
+        """
+
+        if self.MODE != 'record' or html is None:
+            return
+
+        record = {
+            'key': ResponseCache.gen_key(engine, method, url, data),
+            'engine': engine.NAME,
+            'method': method,
+            'url': url,
+            'data': data,
+            'lang': engine.LANG,
+            'locale': engine.LOCALE,
+            'time': time(),
+            'html': html,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+        # NOTE: gzipはmember単位で追記できるため、1レスポンスごとに追記モードで開く
+        with self.LOCK:
+            with gzip.open(self.ARCHIVE_FILE, 'at', encoding='utf-8') as f:
+                f.write(line)
+
+    # 記録済みのレスポンスを返す
+    def replay(self, engine, method: str, url: str, data=None):
+        """replay
+
+        記録済みのレスポンスを返す.
+        同じリクエストが複数記録されている場合は記録された順に返し、最後まで返した後は最後のレスポンスを返し続ける.
+
+        Args:
+            engine (CommonEngine): 検索エンジンのClass.
+            method (str): リクエストメソッド.
+            url (str): リクエスト先のurl.
+            data (optional): POSTメソッド時に利用するdata.
+
+        Returns:
+            str: レスポンスのhtml. 記録されていない場合はブランク.
+        """
+
+        key = ResponseCache.gen_key(engine, method, url, data)
+
+        with self.LOCK:
+            responses = self.RESPONSES.get(key)
+            if not responses:
+                return ''
+
+            index = self.INDEXES.get(key, 0)
+            self.INDEXES[key] = index + 1
+
+        return responses[min(index, len(responses) - 1)]
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""resolver
+    * 検索結果のリダイレクト用リンク(Bingの `/ck/a`, Baiduの `/link?url=` など)から遷移先のurlを取得する、`RedirectResolver` を持つモジュール.
+"""
+
+import sys
+import threading
+import requests
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from time import monotonic, sleep
+
+
+# リダイレクト先のurlを取得するClass
+class RedirectResolver:
+    """RedirectResolver
+
+    リダイレクト用リンクから遷移先のurlを取得するClass.
+    プロセス内で共有し、Proxy・UserAgentごとのsession(コネクションプール)、同時実行数を制限したthread pool、
+    解決済みurlのキャッシュ(LRU+TTL)を保持する.
+    遷移先の取得は各検索エンジンの関数(`extract(session, url, timeout)`)で行い、失敗した場合は間隔を空けて一定回数までリトライする.
+
+    `resolve` はすべての遷移先を取得するまで待機し、`submit_links` は取得を開始してすぐに返す(lazy resolve).
+    `submit_links` で取得を開始したurlは、`wait` / `resolve_result` で遷移先を受け取る.
+
+    Examples:
+        resolver = RedirectResolver(max_workers=8, timeout=10)
+        elinks = resolver.resolve(elinks, resolv_url, proxy=self.PROXY)
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10, retries: int = 2, backoff: float = 0.5,
+                 cache_size: int = 10000, cache_ttl: float = 86400):
+        """[summary]
+
+        Args:
+            max_workers (int, optional): 同時に実行するリクエストの上限数. Defaults to 8.
+            timeout (float, optional): リクエストのtimeout(秒). Defaults to 10.
+            retries (int, optional): 失敗時のリトライ回数. Defaults to 2.
+            backoff (float, optional): リトライ時の待機時間(秒). リトライごとに2倍にする. Defaults to 0.5.
+            cache_size (int, optional): キャッシュする件数の上限. Defaults to 10000.
+            cache_ttl (float, optional): キャッシュの有効期間(秒). Defaults to 86400.
+        """
+
+        self.LOCK = threading.Lock()
+        self.MAX_WORKERS = max_workers
+        self.TIMEOUT = timeout
+        self.RETRIES = retries
+        self.BACKOFF = backoff
+        self.CACHE_SIZE = cache_size
+        self.CACHE_TTL = cache_ttl
+
+        # (proxy, user_agent)をkeyとしたrequests.Session
+        self.SESSIONS = dict()
+
+        # 解決済みurlのキャッシュ(url: (遷移先のurl, 期限))
+        self.CACHE = OrderedDict()
+
+        # 遷移先を取得中のurlのFuture
+        self.PENDING = dict()
+
+        # `wait` で遷移先を返すための、取得を開始したurlのFuture(キャッシュとは別に、直近 `CACHE_SIZE` 件を保持する)
+        self.FUTURES = OrderedDict()
+
+        self.EXECUTOR = None
+
+    # Proxy・UserAgentに対応するsessionを取得する
+    def get_session(self, proxy: str = '', user_agent: str = ''):
+        """get_session
+
+        Proxy・UserAgentに対応するsessionを取得する. 存在しない場合は新規に作成する.
+
+        Args:
+            proxy (str, optional): proxy uri. Defaults to ''.
+            user_agent (str, optional): UserAgent. Defaults to ''.
+
+        Returns:
+            requests.Session: session.
+        """
+
+        key = (proxy, user_agent)
+
+        with self.LOCK:
+            session = self.SESSIONS.get(key)
+            if session is None:
+                session = requests.session()
+
+                # pool sizeを同時実行数に合わせる
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=self.MAX_WORKERS, pool_maxsize=self.MAX_WORKERS)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                # proxyを設定
+                if proxy != '':
+                    session.proxies = {
+                        'http': proxy,
+                        'https': proxy
+                    }
+
+                # user-agentを設定
+                if user_agent != '':
+                    session.headers.update(
+                        {
+                            'User-Agent': user_agent,
+                            'Accept-Language': 'ja,en-US;q=0.7,en;q=0.3'
+                        }
+                    )
+
+                self.SESSIONS[key] = session
+
+        return session
+
+    # thread poolを取得する
+    def get_executor(self):
+        with self.LOCK:
+            if self.EXECUTOR is None:
+                self.EXECUTOR = ThreadPoolExecutor(
+                    max_workers=self.MAX_WORKERS, thread_name_prefix='pydork_resolver')
+
+        return self.EXECUTOR
+
+    # キャッシュから遷移先のurlを取得する
+    def get_cache(self, url: str):
+        with self.LOCK:
+            cached = self.CACHE.get(url)
+            if cached is None:
+                return None
+
+            target, expire = cached
+            if expire < monotonic():
+                del self.CACHE[url]
+                return None
+
+            self.CACHE.move_to_end(url)
+
+        return target
+
+    # 遷移先のurlをキャッシュに保存する
+    def set_cache(self, url: str, target: str):
+        with self.LOCK:
+            self.CACHE[url] = (target, monotonic() + self.CACHE_TTL)
+            self.CACHE.move_to_end(url)
+
+            while len(self.CACHE) > self.CACHE_SIZE:
+                self.CACHE.popitem(last=False)
+
+    # 1件のurlの遷移先を取得する
+    def resolve_url(self, url: str, extract, session: requests.Session):
+        """resolve_url
+
+        1件のurlの遷移先を取得する.
+        失敗した場合は `BACKOFF` 秒(リトライごとに2倍)待機して `RETRIES` 回までリトライし、それでも失敗した場合は元のurlを返す.
+        通信以外のエラー(遷移先の解析の失敗など)はリトライせず、エラーを出力して元のurlを返す.
+
+        Args:
+            url (str): リダイレクト用リンク.
+            extract (function): 遷移先を取得する関数(`extract(session, url, timeout)`).
+            session (requests.Session): 使用するsession.
+
+        Returns:
+            str: 遷移先のurl.
+        """
+
+        target = self.get_cache(url)
+        if target is not None:
+            return target
+
+        for retry in range(self.RETRIES + 1):
+            try:
+                target = extract(session, url, self.TIMEOUT)
+            except requests.RequestException:
+                if retry < self.RETRIES:
+                    sleep(self.BACKOFF * (2 ** retry))
+                continue
+            except Exception as e:
+                print('Failed to resolve {0}: {1!r}'.format(url, e), file=sys.stderr)
+                return url
+            else:
+                self.set_cache(url, target)
+                return target
+
+        return url
+
+    # 1件のurlの遷移先の取得を開始する
+    def submit(self, url: str, extract, session: requests.Session):
+        """submit
+
+        1件のurlの遷移先の取得をthread poolで開始し、Futureを返す.
+        キャッシュ済みの場合は完了済みのFutureを、取得中の場合は取得中のFutureを返す.
+
+        Args:
+            url (str): リダイレクト用リンク.
+            extract (function): 遷移先を取得する関数(`extract(session, url, timeout)`).
+            session (requests.Session): 使用するsession.
+
+        Returns:
+            concurrent.futures.Future: 遷移先のurlを返すFuture.
+        """
+
+        target = self.get_cache(url)
+        if target is not None:
+            future = Future()
+            future.set_result(target)
+            self._set_future(url, future)
+            return future
+
+        executor = self.get_executor()
+        with self.LOCK:
+            future = self.PENDING.get(url)
+            if future is not None:
+                return future
+
+            future = executor.submit(self.resolve_url, url, extract, session)
+            self.PENDING[url] = future
+
+        self._set_future(url, future)
+
+        # NOTE: 完了済みの場合はその場で呼び出されるため、LOCKの外で登録する
+        future.add_done_callback(lambda f: self._remove_pending(url, f))
+
+        return future
+
+    # 取得を開始したurlのFutureを保存する
+    def _set_future(self, url: str, future: Future):
+        with self.LOCK:
+            self.FUTURES[url] = future
+            self.FUTURES.move_to_end(url)
+
+            while len(self.FUTURES) > self.CACHE_SIZE:
+                self.FUTURES.popitem(last=False)
+
+    # Futureから遷移先のurlを取得する(エラーの場合は元のurl)
+    def _get_target(self, url: str, future: Future, timeout: float = None):  # type: ignore
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            raise
+        except Exception as e:
+            print('Failed to resolve {0}: {1!r}'.format(url, e), file=sys.stderr)
+            return url
+
+    # 取得済みのFutureをPENDINGから削除する
+    def _remove_pending(self, url: str, future: Future):
+        with self.LOCK:
+            if self.PENDING.get(url) is future:
+                del self.PENDING[url]
+
+    # リダイレクト用リンクの遷移先を並列で取得する
+    def resolve(self, urls: list, extract, proxy: str = '', user_agent: str = '', is_target=None):
+        """resolve
+
+        リダイレクト用リンクの遷移先を、同時実行数を制限して並列で取得する.
+
+        Args:
+            urls (list): urlのlist.
+            extract (function): 遷移先を取得する関数(`extract(session, url, timeout)`).
+            proxy (str, optional): proxy uri. Defaults to ''.
+            user_agent (str, optional): UserAgent. Defaults to ''.
+            is_target (function, optional): 遷移先を取得するurlかどうかを判定する関数. Noneの場合はすべて対象. Defaults to None.
+
+        Returns:
+            list: 遷移先のurlに置き換えたlist(順番は維持し、対象外のurlはそのまま).
+        """
+
+        session = self.get_session(proxy, user_agent)
+
+        futures = dict()
+        for url in urls:
+            if url in futures or (is_target is not None and not is_target(url)):
+                continue
+
+            futures[url] = self.submit(url, extract, session)
+
+        return [self._get_target(url, futures[url]) if url in futures else url for url in urls]
+
+    # リダイレクト用リンクの遷移先の取得を開始する(取得完了は待たない)
+    def submit_links(self, urls: list, extract, proxy: str = '', user_agent: str = '', is_target=None):
+        """submit_links
+
+        リダイレクト用リンクの遷移先の取得を開始し、完了を待たずに返す(lazy resolve).
+        遷移先は `wait` / `resolve_result` で取得する.
+
+        Args:
+            urls (list): urlのlist.
+            extract (function): 遷移先を取得する関数(`extract(session, url, timeout)`).
+            proxy (str, optional): proxy uri. Defaults to ''.
+            user_agent (str, optional): UserAgent. Defaults to ''.
+            is_target (function, optional): 遷移先を取得するurlかどうかを判定する関数. Noneの場合はすべて対象. Defaults to None.
+
+        Returns:
+            list: 遷移先の取得を開始したurlのlist.
+        """
+
+        session = self.get_session(proxy, user_agent)
+
+        submitted = []
+        for url in urls:
+            if is_target is not None and not is_target(url):
+                continue
+
+            self.submit(url, extract, session)
+            submitted.append(url)
+
+        return submitted
+
+    # 遷移先の取得完了を待機する
+    def wait(self, url: str, timeout: float = None):  # type: ignore
+        """wait
+
+        `submit_links` で取得を開始したurlの遷移先を返す.
+        遷移先はキャッシュではなく取得を開始したFutureから返すため、キャッシュから削除済みの場合も遷移先を返す.
+
+        Args:
+            url (str): リダイレクト用リンク.
+            timeout (float, optional): 待機する秒数. Noneの場合は完了するまで待機する. Defaults to None.
+
+        Raises:
+            concurrent.futures.TimeoutError: timeoutまでに取得が完了しなかった場合.
+
+        Returns:
+            str: 遷移先のurl(取得に失敗した場合は元のurl).
+        """
+
+        with self.LOCK:
+            future = self.FUTURES.get(url)
+
+        if future is not None:
+            return self._get_target(url, future, timeout)
+
+        target = self.get_cache(url)
+        return url if target is None else target
+
+    # 検索結果(dict)のlinkを遷移先のurlに置き換える
+    def resolve_result(self, result: dict, timeout: float = None):  # type: ignore
+        """resolve_result
+
+        `status` が `pending` の検索結果のlinkを遷移先のurlに置き換え、`status` を `resolved` にする.
+        timeoutまでに取得が完了しなかった場合は `pending` のまま返す.
+
+        Args:
+            result (dict): 検索結果.
+            timeout (float, optional): 待機する秒数. Noneの場合は完了するまで待機する. Defaults to None.
+
+        Returns:
+            dict: 検索結果.
+        """
+
+        if result.get('status') != 'pending':
+            return result
+
+        try:
+            target = self.wait(result['link'], timeout)
+        except TimeoutError:
+            return result
+
+        result['link'] = target
+        result['status'] = 'resolved'
+
+        return result
+
+
+# プロセス内で共有するRedirectResolver
+RESOLVER = RedirectResolver()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""result
+    * 検索結果を保持する `SearchResult` と、複数の検索結果を列ごとにまとめて保持する `ResultBatch` を持つモジュール.
+"""
+
+from collections.abc import MutableMapping
+
+
+# 検索結果のフィールド(to_dictでの出力順)
+FIELDS = ('link', 'title', 'text', 'source_url', 'pagelink', 'status', 'num')
+
+
+# 1件の検索結果
+class SearchResult(MutableMapping):
+    """SearchResult
+
+    1件の検索結果を保持するClass.
+    dictの代わりに `__slots__` で値を保持し、1件あたりのメモリ使用量を抑える.
+    これまでのdictと同様に `d['link']`, `'title' in d`, `d.get('text')`, `dict(d)` などでアクセスできる.
+    値がNoneのフィールドは存在しないキーとして扱う.
+
+    Examples:
+        d = SearchResult(link='https://...', title='...')
+        d['num'] = 1
+        d.to_dict()  # {'link': 'https://...', 'title': '...', 'num': 1}
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, link=None, title=None, text=None, source_url=None, pagelink=None, status=None, num=None):
+        self.link = link
+        self.title = title
+        self.text = text
+        self.source_url = source_url
+        self.pagelink = pagelink
+        self.status = status
+        self.num = num
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in FIELDS or getattr(self, key) is None:
+            raise KeyError(key)
+
+        setattr(self, key, None)
+
+    def __iter__(self):
+        for key in FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return 'SearchResult({0})'.format(self.to_dict())
+
+    # dictに変換する
+    def to_dict(self):
+        """to_dict
+
+        検索結果をdictに変換する(値がNoneのフィールドは含めない).
+
+        Returns:
+            dict: 検索結果(`{'link': 'https://...', 'title': '...', 'num': 1}`)
+        """
+
+        return {key: getattr(self, key) for key in self}
+
+    # 複製する
+    def copy(self):
+        """copy
+
+        Returns:
+            SearchResult: 同じ値を持つ検索結果(dictの `copy()` と同様のshallow copy).
+        """
+
+        return SearchResult(**{key: getattr(self, key) for key in FIELDS})
+
+    # dictから生成する
+    @classmethod
+    def from_dict(cls, data: dict):
+        """from_dict
+
+        dictから検索結果を生成する(FIELDS以外のキーは無視する).
+
+        Args:
+            data (dict): 検索結果のdict.
+
+        Returns:
+            SearchResult: 検索結果.
+        """
+
+        return cls(**{key: data[key] for key in FIELDS if key in data})
+
+
+# 複数の検索結果を列ごとに保持する
+class ResultBatch:
+    """ResultBatch
+
+    大量の検索結果を、フィールドごとのlist(列)で保持するClass.
+    1件ごとにオブジェクトを保持しないため、大量の検索結果を集計する場合のメモリ使用量を抑えられる.
+    要素へのアクセス時には `SearchResult` を生成して返す.
+
+    Examples:
+        batch = ResultBatch(search_engine.iter_search('zelda'))
+        links = batch.column('link')
+        for d in batch:
+            print(d['num'], d['link'])
+    """
+
+    def __init__(self, results=()):
+        self.COLUMNS = {key: [] for key in FIELDS}
+        self.extend(results)
+
+    def __len__(self):
+        return len(self.COLUMNS['link'])
+
+    def __getitem__(self, index: int):
+        return SearchResult(**{key: values[index] for key, values in self.COLUMNS.items()})
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    # 検索結果を追加する
+    def append(self, result):
+        """append
+
+        Args:
+            result (SearchResult or dict): 検索結果.
+        """
+
+        for key, values in self.COLUMNS.items():
+            values.append(result.get(key))
+
+    # 複数の検索結果を追加する
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    # フィールドの値のlistを取得する
+    def column(self, key: str):
+        """column
+
+        Args:
+            key (str): フィールド名(FIELDS).
+
+        Returns:
+            list: 各検索結果のフィールドの値(存在しない場合はNone).
+        """
+
+        return self.COLUMNS[key]
+
+    # dictのlistに変換する
+    def to_dicts(self):
+        return [d.to_dict() for d in self]
@@ -10,21 +10,26 @@
 """
 
 
+import collections
 import sys
 import threading
+import queue
 import json
 import os
 import pathlib
 
 from typing import List
 from argparse import Namespace
-from jinja2 import Template
 
 from .engine import SearchEngine, ENGINES
 from .common import Color
 from .common import Message
 
 
+# 出力時に使用するLock(lockが指定されない場合に使用する. 複数のworkerの出力が行の途中で混ざらないよう、プロセス内で共有する)
+PRINT_LOCK = threading.Lock()
+
+
 # サブコマンドの動作集約用関数
 def run_subcommand(subcommand, args):
     """run_subcommand
@@ -99,6 +104,7 @@ def run_subcommand(subcommand, args):
             template_data = f.read()
 
             # template fileから値を取得
+            from jinja2 import Template
             tmpl = Template(template_data)
 
             # 設定情報を取得
@@ -129,13 +135,34 @@ def run_subcommand(subcommand, args):
     # engine_listから、重複したリストを削除
     engine_list = list(set(engine_list))
 
+    # 検索エンジンごとに、`--jobs` で指定された数までのworker(thread)を起動する
+    # 各workerは検索エンジンごとのqueueからクエリを取り出して処理する
+    jobs = max(1, args.jobs)
+
     tasks = []
-    thread_result = dict()
-    lock = threading.Lock()
+    engine_results = dict()
+    lock = PRINT_LOCK
+
+    # suggestの場合、解析済みのサジェストのキャッシュ(cookieのディレクトリに作成する)は1つだけ作成し、全workerで共有する
+    worker_options = dict()
+    suggest_cache = None
+    if subcommand == 'suggest' and args.cache:
+        from .cache import SuggestCache
+
+        suggest_cache_file = os.path.join(
+            os.path.expanduser(args.cookies), '.suggest_cache.sqlite3')
+        suggest_cache = SuggestCache(suggest_cache_file, args.cache_ttl)
+        worker_options['suggest_cache'] = suggest_cache
+
     for engine in engine_list:
-        task = threading.Thread(
-            target=target, args=(engine, query_list, args, thread_result, True, lock, search_mode))
-        tasks.append(task)
+        query_queue = generate_query_queue(query_list)
+        engine_results[engine] = dict()
+
+        for _ in range(max(1, min(jobs, len(query_list)))):
+            task = threading.Thread(
+                target=target, args=(engine, query_queue, args, engine_results[engine], True, lock, search_mode),
+                kwargs=worker_options)
+            tasks.append(task)
 
     for task in tasks:
         task.start()
@@ -143,18 +170,28 @@ def run_subcommand(subcommand, args):
     for task in tasks:
         task.join()
 
-    # json出力が有効だった場合、json形式で出力
-    if args.json:
+    if suggest_cache is not None:
+        suggest_cache.close()
+
+    # json出力が有効だった場合、json形式で出力(クエリの順番で並べ替える)
+    # (ndjson出力の場合は各workerで出力済み)
+    if args.json and not args.ndjson:
+        thread_result = dict()
+        for engine, engine_result in engine_results.items():
+            thread_result[engine] = [
+                r for n in sorted(engine_result) for r in engine_result[n]]
+
         print(json.dumps(thread_result, ensure_ascii=False, indent=2))
 
 
 # SearchEngineのオプション設定用関数
-def set_se_options(se: SearchEngine, args: Namespace):
+def set_se_options(se: SearchEngine, args: Namespace, suggest_cache=None):
     """set_se_options
 
     Args:
         se (SearchEngine): argsの情報を元に、オプションを設定するSearchEngine.
         args (Namespace): argparseで取得した引数(Namespace).
+        suggest_cache (cache.SuggestCache, optional): 全workerで共有する、解析済みのサジェストのキャッシュ. Defaults to None.
 
     Returns:
         SearchEngine: オプションを設定したSearchEngine.
@@ -215,6 +252,57 @@ def set_se_options(se: SearchEngine, args: Namespace):
     # set cookie file delete
     se.set_cookie_files_delete(args.delete_cookies)
 
+    # useragentをcookieファイルごとに固定する
+    if 'sticky_user_agent' in args and args.sticky_user_agent:
+        se.set_user_agent(sticky_key=se.ENGINE.COOKIE_FILE)
+
+    # response cache(cookieのディレクトリに作成する)
+    if 'cache' in args and args.cache:
+        cache_file = os.path.join(
+            os.path.expanduser(args.cookies), '.cache.sqlite3')
+        se.set_cache(cache_file, args.cache_ttl, args.cache_size * 1024 * 1024)
+
+        # suggestの場合、解析済みのサジェストもキャッシュする(`run_subcommand` で作成したものを共有する)
+        if suggest_cache is not None:
+            se.set_suggest_cache(suggest_cache)
+
+    # record/replay(replayを優先)
+    if 'replay' in args and args.replay != '':
+        se.set_archive(args.replay, 'replay')
+    elif 'record' in args and args.record != '':
+        se.set_archive(args.record, 'record')
+
+    # dedup
+    if 'dedup' in args and args.dedup is not None:
+        se.set_dedup(args.dedup)
+
+    # saturation
+    if 'saturation' in args:
+        se.set_saturation(args.saturation)
+
+    # prefetch
+    if 'prefetch' in args and args.prefetch:
+        se.set_prefetch(True)
+
+    # adaptive page size(cookieのディレクトリに学習結果を保存する)
+    if 'adaptive_page_size' in args and args.adaptive_page_size:
+        store_file = os.path.join(
+            os.path.expanduser(args.cookies), '.page_size.json')
+        se.set_adaptive_page_size(store_file)
+
+    # suggest workers
+    if 'suggest_workers' in args:
+        se.set_suggest_workers(args.suggest_workers)
+
+    # lazy resolve
+    if 'lazy_resolve' in args and args.lazy_resolve:
+        se.set_lazy_resolve(True)
+
+    # rate limit
+    if 'rate' in args and args.rate is not None:
+        kind = 'suggest' if args.subcommand == 'suggest' else 'search'
+        se.set_rate_limit(args.rate, args.burst, kind=kind)
+
     return se
 
 
@@ -274,6 +362,25 @@ def print_search_result(result, args: Namespace, message: Message):
         message.print_line(*data, separator=sep)
 
 
+# ndjson形式で1行出力する
+def print_ndjson(data: dict, lock=None):
+    """print_ndjson
+
+    dataを1行のjsonとしてstdoutへ出力する.
+    複数のworkerから呼び出されるため、lockを取得して1行ずつ書き込み、都度flushする.
+
+    Args:
+        data (dict): 出力するdata.
+        lock (threading.Lock): 出力時に使用するLock. Defaults to None (`PRINT_LOCK`).
+    """
+
+    line = json.dumps(data, ensure_ascii=False)
+
+    with lock or PRINT_LOCK:
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+
 # generate
 def generate_query_list(args: Namespace):
     """generate_query_list
@@ -299,17 +406,38 @@ def generate_query_list(args: Namespace):
     return query_list
 
 
+# クエリのqueueを生成する
+def generate_query_queue(query_list: list):
+    """generate_query_queue
+
+    query_listから、workerで共有するqueueを生成する.
+    出力順を維持できるよう、要素は `(クエリの番号, クエリ)` とする.
+
+    Args:
+        query_list(list): 検索クエリのリスト.
+
+    Returns:
+        queue.Queue: `(クエリの番号, クエリ)` のqueue.
+    """
+
+    query_queue: queue.Queue = queue.Queue()
+    for n, query in enumerate(query_list):
+        query_queue.put((n, query))
+
+    return query_queue
+
+
 # 検索
-def run_search(engine: str, query_list: list, args, thread_result: dict, cmd=False, lock=None, mode='text'):
+def run_search(engine: str, query_queue: queue.Queue, args, thread_result: dict, cmd=False, lock=None, mode='text'):
     """search
 
     Args:
         engine (str): 使用する検索エンジン(.engine.ENGINES).
-        query_list(list): 検索クエリのリスト.
+        query_queue(queue.Queue): 検索クエリのqueue(`generate_query_queue` で生成). 同じ検索エンジンのworkerで共有する.
         args (Namespace): argparseで取得した引数(Namespace).
-        thread_result(dict): 結果を1箇所に集約するためのresult dict. json出力するときのみ使用.
+        thread_result(dict): 結果を1箇所に集約するための、クエリの番号をkeyとしたresult dict. json出力するときのみ使用.
         cmd (bool, optional): commandで実行しているか否か. Defaults to False.
-        lock (threading.Lock): threadingのマルチスレッドで使用するLock.現在は未使用. Defaults to None.
+        lock (threading.Lock): threadingのマルチスレッドで使用するLock. 検索結果の出力時に使用する. Defaults to None.
         type (str, optional): 検索タイプ. `text` or `image`.
     """
 
@@ -337,53 +465,116 @@ def run_search(engine: str, query_list: list, args, thread_result: dict, cmd=Fal
     if args.nullchar:
         sep = '\0'
 
-    # json出力時の変数を宣言
-    all_result_json = list()
-
-    # query_listの内容を順番に処理
-    for query in query_list:
-        # 検索を実行
-        result = se.search(
-            query, search_type=search_type,
-            maximum=args.num
-        )
-
-        # debug
-        se.ENGINE.MESSAGE.print_text(
-            json.dumps(result),
-            separator=sep,
-            header=se.ENGINE.MESSAGE.HEADER + ': ' +
-            Color.GRAY + '[DEBUG]: [Result]' + Color.END,
-            mode="debug",
-        )
-
-        if args.json:
-            # all_result_jsonへ組み込むためのjson方式へ加工.
-            append_result = {
-                'query': query,
-                'result': result
-            }
-            all_result_json.append(append_result)
+    # query_queueが空になるまで順番に処理(session(ブラウザ)は全クエリで使い回す)
+    with se:
+        while True:
+            try:
+                n, query = query_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            # ndjson出力の場合、1ページ解析するごとに検索結果を1行ずつ出力する
+            # (lazy resolveの場合は、遷移先を取得できたものから検索結果の順番どおりに出力する)
+            if args.ndjson:
+                pending: collections.deque = collections.deque()
+                for d in se.iter_search(query, search_type=search_type, maximum=args.num):
+                    pending.append(d)
+                    while pending and se.resolve_links([pending[0]], timeout=0)[0].get('status') != 'pending':
+                        print_ndjson(
+                            dict({'engine': engine, 'query': query}, **pending.popleft()), lock)
+
+                for d in se.resolve_links(list(pending)):
+                    print_ndjson(
+                        dict({'engine': engine, 'query': query}, **d), lock)
+
+                continue
+
+            # 検索を実行
+            result = se.search(
+                query, search_type=search_type,
+                maximum=args.num
+            )
+
+            # lazy resolveの場合は遷移先の取得を待つ(次のページの取得と並行して取得済み)
+            result = se.resolve_links(result)
+
+            # debug
+            se.ENGINE.MESSAGE.print_text(
+                json.dumps(result),
+                separator=sep,
+                header=se.ENGINE.MESSAGE.HEADER + ': ' +
+                Color.GRAY + '[DEBUG]: [Result]' + Color.END,
+                mode="debug",
+            )
+
+            if args.json:
+                # thread_resultへ組み込むためのjson方式へ加工.
+                thread_result[n] = [
+                    {
+                        'query': query,
+                        'result': result
+                    }
+                ]
+
+            else:
+                # 他のworkerと出力が混ざらないよう、クエリ単位でまとめて出力する
+                with lock or PRINT_LOCK:
+                    print_search_result(result, args, se.ENGINE.MESSAGE)
+
+
+# サジェスト
+def run_suggest_crawl(se: SearchEngine, engine: str, n: int, query: str, args: Namespace, thread_result: dict, lock=None):
+    """run_suggest_crawl
+
+    サジェストを再帰的に取得して出力する(`--depth`).
+    json出力の場合は、取得元のキーワードごとにまとめて出力する.
+
+    Args:
+        se (SearchEngine): sessionを作成済みのSearchEngine.
+        engine (str): 使用する検索エンジン(.engine.ENGINES).
+        n (int): クエリの番号.
+        query (str): 検索クエリ.
+        args (Namespace): argparseで取得した引数(Namespace).
+        thread_result(dict): 結果を1箇所に集約するための、クエリの番号をkeyとしたresult dict. json出力するときのみ使用.
+        lock (threading.Lock): threadingのマルチスレッドで使用するLock. サジェストの出力時に使用する. Defaults to None.
+    """
+
+    # 取得元のキーワードごとのサジェスト(json出力時のみ使用)
+    result = dict()
+
+    for d in se.iter_suggest_crawl(query, depth=args.depth, jap=args.jap, alph=args.alph, num=args.num):
+        if args.ndjson:
+            print_ndjson(dict({'engine': engine, 'query': query}, **d), lock)
+
+        elif args.json:
+            result.setdefault(d['parent'], []).append(d['suggest'])
 
         else:
-            print_search_result(result, args, se.ENGINE.MESSAGE)
+            with lock or PRINT_LOCK:
+                se.ENGINE.MESSAGE.print_line(d['suggest'], separator=": ")
 
     if args.json:
-        thread_result[engine] = all_result_json
+        thread_result[n] = [
+            {
+                'query': parent,
+                'result': words
+            } for parent, words in result.items()
+        ]
 
 
-# サジェスト
-def run_suggest(engine: str, query_list: list, args: Namespace, thread_result: dict, cmd=False, lock=None, mode=''):
+def run_suggest(engine: str, query_queue: queue.Queue, args: Namespace, thread_result: dict, cmd=False, lock=None, mode='',
+                suggest_cache=None):
     """suggest
 
     Args:
         engine (str): 使用する検索エンジン(.engine.ENGINES).
-        query_list(list): 検索クエリのリスト.
+        query_queue(queue.Queue): 検索クエリのqueue(`generate_query_queue` で生成). 同じ検索エンジンのworkerで共有する.
         args (Namespace): argparseで取得した引数(Namespace).
-        thread_result(dict): 結果を1箇所に集約するためのresult dict. json出力するときのみ使用.
+        thread_result(dict): 結果を1箇所に集約するための、クエリの番号をkeyとしたresult dict. json出力するときのみ使用.
         cmd (bool, optional): commandで実行しているか否か. Defaults to False.
-        lock (threading.Lock): threadingのマルチスレッドで使用するLock.現在は未使用. Defaults to None.
+        lock (threading.Lock): threadingのマルチスレッドで使用するLock. サジェストの出力時に使用する. Defaults to None.
         mode (str, optional): マルチスレッドでsearchある程度共用で使えるようにするための引数. 利用していない. Defaults to ''.
+        suggest_cache (cache.SuggestCache, optional): 全workerで共有する、解析済みのサジェストのキャッシュ. Defaults to None.
     """
 
     # start search engine class
@@ -403,7 +594,7 @@ def run_suggest(engine: str, query_list: list, args: Namespace, thread_result: d
     se.ENGINE.set_messages(msg)
 
     # Set SearchEngine options
-    se = set_se_options(se, args)
+    se = set_se_options(se, args, suggest_cache)
 
     # Set lock
     se.set_lock(lock)
@@ -415,29 +606,43 @@ def run_suggest(engine: str, query_list: list, args: Namespace, thread_result: d
         header = sc.out(header)
     se.ENGINE.MESSAGE.set_header(header)
 
-    # json出力時の変数を宣言
-    all_result_json = list()
+    # Suggestを取得(session(ブラウザ)は全クエリで使い回す)
+    with se:
+        while True:
+            try:
+                n, query = query_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            # --depthが2以上の場合、サジェストを再帰的に取得し、新しいサジェストを取得した時点で出力する
+            if args.depth > 1:
+                run_suggest_crawl(se, engine, n, query, args, thread_result, lock)
+                continue
+
+            result = se.suggest(
+                query,
+                jap=args.jap,
+                alph=args.alph,
+                num=args.num,
+            )
 
-    # Suggestを取得
-    for query in query_list:
-        result = se.suggest(
-            query,
-            jap=args.jap,
-            alph=args.alph,
-            num=args.num,
-        )
+            if args.ndjson:
+                for words in result.values():
+                    for w in words:
+                        print_ndjson(
+                            {'engine': engine, 'query': query, 'suggest': w}, lock)
 
-        for words in result.values():
-            if args.json:
-                append_result = {
-                    'query': query,
-                    'result': words
-                }
-                all_result_json.append(append_result)
+            elif args.json:
+                thread_result[n] = [
+                    {
+                        'query': query,
+                        'result': words
+                    } for words in result.values()
+                ]
 
             else:
-                for w in words:
-                    se.ENGINE.MESSAGE.print_line(w, separator=": ")
-
-    if args.json:
-        thread_result[engine] = all_result_json
+                # 他のworkerと出力が混ざらないよう、クエリ単位でまとめて出力する
+                with lock or PRINT_LOCK:
+                    for words in result.values():
+                        for w in words:
+                            se.ENGINE.MESSAGE.print_line(w, separator=": ")
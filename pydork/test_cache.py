@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_cache
+    * cacheモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from .cache import ResponseCache, SuggestCache
+from .common import Message
+from .engine import SearchEngine
+from .engine_google import Google
+from .ratelimit import RateLimiter
+from .test_replay import GOOGLE_HTML
+from .test_suggest import gen_google_suggest_xml
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmpdir.name, '.cache.sqlite3')
+
+        self.engine = Google()
+        self.engine.set_messages(Message())
+        self.engine.set_lang('ja', 'JP')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_set(self):
+        cache = ResponseCache(self.cache_file)
+        key = cache.gen_key(self.engine, 'GET', 'https://example.com/')
+
+        self.assertIsNone(cache.get(key))
+        cache.set(key, 'Google', 'https://example.com/', '<html>テスト</html>')
+        self.assertEqual('<html>テスト</html>', cache.get(key))
+        cache.close()
+
+        # ファイルに保存されている
+        cache = ResponseCache(self.cache_file)
+        self.assertEqual('<html>テスト</html>', cache.get(key))
+        cache.close()
+
+    def test_gen_key(self):
+        key = ResponseCache.gen_key(self.engine, 'GET', 'https://example.com/')
+
+        # lang, locale, dataが異なる場合は別のkey
+        self.assertNotEqual(key, ResponseCache.gen_key(
+            self.engine, 'POST', 'https://example.com/', {'q': 'a'}))
+
+        self.engine.set_lang('en', 'US')
+        self.assertNotEqual(key, ResponseCache.gen_key(
+            self.engine, 'GET', 'https://example.com/'))
+
+    def test_ttl(self):
+        cache = ResponseCache(self.cache_file, ttl=-1)
+        cache.set('key', 'Google', 'https://example.com/', 'html')
+        self.assertEqual('html', cache.get('key'))
+
+        cache.TTL = 1
+        cache.CONNECTION.execute('UPDATE responses SET created = created - 10')
+        self.assertIsNone(cache.get('key'))
+        cache.close()
+
+    def test_max_size(self):
+        cache = ResponseCache(self.cache_file, max_size=2048)
+
+        # 圧縮が効かないデータで上限を超えさせる
+        for i in range(4):
+            cache.set(str(i), 'Google', 'https://example.com/', os.urandom(512).hex())
+
+        # 古いものから削除される
+        self.assertIsNone(cache.get('0'))
+        self.assertIsNotNone(cache.get('3'))
+        cache.close()
+
+    def test_get_result(self):
+        self.engine.CACHE = ResponseCache(self.cache_file)  # type: ignore
+
+        # キャッシュが存在する場合、リクエストを送らずにキャッシュを返す(sessionは作成していない)
+        self.engine.write_cache('https://example.com/', '<html>cached</html>')
+        self.assertEqual(
+            '<html>cached</html>', self.engine.get_result('https://example.com/'))
+
+        # ReCaptcha画面は保存しない
+        html = '<html><body><form id="captcha-form"><div id="recaptcha"></div></form></body></html>'
+        self.engine.write_cache('https://example.com/captcha', html)
+        self.assertIsNone(self.engine.read_cache('https://example.com/captcha'))
+        self.engine.CACHE.close()  # type: ignore
+
+    def test_search(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_cache(self.cache_file)
+        se.set_rate_limiter(RateLimiter())
+
+        # リクエストは送らずにhtmlを返す(通信は発生しない)
+        requests = []
+        se.ENGINE.send_request = lambda url, method='GET', data=None: requests.append(url) or GOOGLE_HTML  # type: ignore
+
+        # キャッシュの参照回数を記録する
+        lookups = []
+        get = se.ENGINE.CACHE.get  # type: ignore
+        se.ENGINE.CACHE.get = lambda key: lookups.append(key) or get(key)  # type: ignore
+
+        # キャッシュが無い場合も、キャッシュの参照は1リクエストにつき1回だけ
+        self.assertEqual(2, len(se.search('zelda', maximum=2)))
+        self.assertEqual((1, 1), (len(requests), len(lookups)))
+
+        # 2回目はキャッシュから返す
+        self.assertEqual(2, len(se.search('zelda', maximum=2)))
+        self.assertEqual((1, 2), (len(requests), len(lookups)))
+
+        se.ENGINE.CACHE.close()  # type: ignore
+
+    def test_suggest(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_cache(self.cache_file)
+        se.set_rate_limiter(RateLimiter())
+        se.set_rate_limit(0, kind='suggest')
+        se.set_suggest_workers(8)
+
+        # リクエストは送らずにサジェストのxmlを返す(通信は発生しない)
+        chars = SearchEngine._gen_suggest_chars(alph=True)
+        responses = {
+            se.ENGINE.gen_suggest_url('zelda' + char): gen_google_suggest_xml(['zelda{0}'.format(char)])
+            for char in chars
+        }
+        requests = []
+        se.ENGINE.send_request = lambda url, method='GET', data=None: requests.append(url) or responses[url]  # type: ignore
+
+        # キャッシュの保存時にhtmlの解析(ReCaptchaの識別)を行ったthreadを記録する
+        threads = set()
+        parse_html = se.ENGINE.parse_html
+        se.ENGINE.parse_html = lambda html: threads.add(threading.current_thread().name) or parse_html(html)  # type: ignore
+
+        # 並行してリクエストを行った場合も、キャッシュの保存は呼び出し元のthreadで行う
+        self.assertEqual(['zelda a'], se.suggest('zelda', alph=True)['a'])
+        self.assertEqual(len(chars), len(requests))
+        self.assertEqual({threading.current_thread().name}, threads)
+
+        # asyncio版でも、リクエストを行ったthreadでは保存しない
+        se.ENGINE.CACHE.CONNECTION.execute('DELETE FROM responses')  # type: ignore
+        threads.clear()
+        self.assertEqual(['zelda a'], asyncio.run(se.asuggest('zelda', alph=True))['a'])
+        self.assertEqual(len(chars) * 2, len(requests))
+        self.assertEqual(1, len(threads))
+
+        # 2回目はキャッシュから返す
+        self.assertEqual(['zelda a'], se.suggest('zelda', alph=True)['a'])
+        self.assertEqual(len(chars) * 2, len(requests))
+
+        se.ENGINE.CACHE.close()  # type: ignore
+
+
+class SuggestCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmpdir.name, '.suggest_cache.sqlite3')
+
+        self.engine = Google()
+        self.engine.set_messages(Message())
+        self.engine.set_lang('ja', 'JP')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lru(self):
+        cache = SuggestCache(max_entries=2)
+        keys = [cache.gen_key(self.engine, prefix) for prefix in ['zelda', 'zelda a', 'zelda b']]
+
+        cache.set(keys[0], {'': ['zelda switch']})
+        cache.set(keys[1], {'a': ['zelda amiibo']})
+        self.assertEqual({'': ['zelda switch']}, cache.get(keys[0]))
+
+        # 上限を超えた場合、最も参照されていないものから削除する
+        cache.set(keys[2], {'b': ['zelda botw']})
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual({'': ['zelda switch']}, cache.get(keys[0]))
+        self.assertEqual((2, 1), (cache.HITS, cache.MISSES))
+
+        # lang, localeが異なる場合は別のkey
+        self.engine.set_lang('en', 'US')
+        self.assertNotEqual(keys[0], cache.gen_key(self.engine, 'zelda'))
+
+    def test_file(self):
+        cache = SuggestCache(self.cache_file)
+        key = cache.gen_key(self.engine, 'zelda')
+        cache.set(key, {'': ['zelda switch']})
+        cache.close()
+
+        # 別のインスタンス(プロセス)から取得できる
+        self.assertEqual({'': ['zelda switch']}, SuggestCache(self.cache_file).get(key))
+
+        # 有効期間を過ぎたものは使用しない
+        cache = SuggestCache(self.cache_file, ttl=60)
+        with cache.CONNECTION:  # type: ignore
+            cache.CONNECTION.execute('UPDATE suggests SET created = created - 120')  # type: ignore
+        self.assertIsNone(cache.get(key))
+        cache.close()
+
+    def test_suggest(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_cache(os.path.join(self.tmpdir.name, '.cache.sqlite3'))
+
+        # レスポンスはResponseCacheから返す(通信は発生しない)
+        for char in SearchEngine._gen_suggest_chars(alph=True):
+            se.ENGINE.write_cache(
+                se.ENGINE.gen_suggest_url('zelda' + char), gen_google_suggest_xml(['zelda{0}'.format(char)]))
+
+        suggest_cache = SuggestCache()
+        se.set_suggest_cache(suggest_cache)
+
+        result = se.suggest('zelda', alph=True)
+        self.assertEqual((0, 28), (suggest_cache.HITS, suggest_cache.MISSES))
+
+        # 2回目はすべてSuggestCacheから取得する(返したlistを変更してもキャッシュは変わらない)
+        result['a'].append('changed')
+        self.assertEqual(['zelda a'], se.suggest('zelda', alph=True)['a'])
+        self.assertEqual((28, 28), (suggest_cache.HITS, suggest_cache.MISSES))
+        self.assertEqual(['', ' ', 'a'], list(se.suggest('zelda', alph=True))[:3])
+
+        se.ENGINE.CACHE.close()  # type: ignore
+
+    def test_asuggest(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_cache(os.path.join(self.tmpdir.name, '.cache.sqlite3'))
+
+        # 指定するまではSuggestCacheを使用しない
+        self.assertIsNone(se.SUGGEST_CACHE)
+
+        for char in SearchEngine._gen_suggest_chars(alph=False):
+            se.ENGINE.write_cache(
+                se.ENGINE.gen_suggest_url('zelda' + char), gen_google_suggest_xml(['zelda{0}'.format(char)]))
+
+        suggest_cache = SuggestCache(os.path.join(self.tmpdir.name, '.suggest_cache.sqlite3'))
+        se.set_suggest_cache(suggest_cache)
+
+        # SuggestCacheの参照・保存を行ったthreadを記録する
+        threads = set()
+        get, set_ = suggest_cache.get, suggest_cache.set
+        suggest_cache.get = lambda *args: threads.add(threading.current_thread().name) or get(*args)  # type: ignore
+        suggest_cache.set = lambda *args: threads.add(threading.current_thread().name) or set_(*args)  # type: ignore
+
+        # SQLiteへのアクセスはloopではなく、thread poolで行う
+        self.assertEqual({'': ['zelda'], ' ': ['zelda ']}, asyncio.run(se.asuggest('zelda')))
+        self.assertEqual({'': ['zelda'], ' ': ['zelda ']}, asyncio.run(se.asuggest('zelda')))
+        self.assertEqual((2, 2), (suggest_cache.HITS, suggest_cache.MISSES))
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('pydork_async') for name in threads))
+
+        suggest_cache.close()
+        se.ENGINE.CACHE.close()  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_dedup
+    * dedupモジュール、検索結果の飽和検出のテストコード.
+    * 検索はreplayモードで行うため、通信は発生しない.
+"""
+
+
+import os
+import tempfile
+import unittest
+
+from .dedup import DedupIndex, canonicalize_url
+from .engine import SearchEngine
+from .replay import ResponseArchive
+from .result import SearchResult
+from .test_replay import GOOGLE_HTML
+
+
+class CanonicalizeUrlTestCase(unittest.TestCase):
+    def test_canonicalize_url(self):
+        self.assertEqual(
+            canonicalize_url('https://example.com/a?b=2&a=1'),
+            canonicalize_url('HTTP://Example.COM:80/a/?a=1&utm_source=x&b=2&gclid=y#top'))
+        self.assertNotEqual(
+            canonicalize_url('https://example.com/a?id=1'),
+            canonicalize_url('https://example.com/a?id=2'))
+        self.assertEqual('https://example.com:8080', canonicalize_url('https://example.com:8080/'))
+
+        # urlとして解析できない場合はそのまま
+        self.assertEqual('http://[::1', canonicalize_url('http://[::1'))
+
+
+class DedupIndexTestCase(unittest.TestCase):
+    def test_filter(self):
+        index = DedupIndex()
+        links = [SearchResult(link=url) for url in [
+            'https://a.example/', 'https://a.example/?utm_medium=x', 'https://b.example/', 'https://c.example/',
+        ]]
+
+        # limit以降の検索結果はindexに追加しない
+        self.assertEqual(
+            ['https://a.example/', 'https://b.example/'],
+            [d['link'] for d in index.filter(links, 'google', limit=2)])
+        self.assertEqual(1, index.count_duplicates('google'))
+
+        self.assertEqual(
+            ['https://c.example/'], [d['link'] for d in index.filter(links, 'google')])
+        self.assertEqual(4, index.count_duplicates())
+
+        # scopeが異なる場合は重複として扱わない
+        self.assertEqual(3, len(index.filter(links, 'bing')))
+
+    def test_filter_pending(self):
+        index = DedupIndex()
+        links = [SearchResult(link='https://a.example/', status='pending'), SearchResult(link='https://a.example/')]
+
+        # 遷移先を取得中の検索結果は重複チェックを行わず、indexにも追加しない
+        self.assertEqual(2, len(index.filter(links)))
+        self.assertEqual(0, index.count_duplicates())
+        self.assertEqual(1, len(index.filter(links)))
+        self.assertEqual(1, index.count_duplicates())
+
+
+class DedupSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+        # 2つのクエリで同じ検索結果を返す
+        se = self.create_engine()
+        archive = ResponseArchive(self.archive_file, 'record')
+        for keyword in ['zelda', 'mario']:
+            method, url, data = next(se.ENGINE.gen_search_url(keyword, 'text'))
+            archive.record(se.ENGINE, method, url, data, GOOGLE_HTML)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def create_engine(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        return se
+
+    def search(self, scope: str, index: DedupIndex):
+        se = self.create_engine()
+        se.set_archive(self.archive_file, 'replay')
+        se.set_dedup(scope, index)
+        return [len(se.search(keyword, maximum=2)) for keyword in ['zelda', 'mario']]
+
+    def test_search(self):
+        self.assertEqual([2, 0], self.search('run', DedupIndex()))
+        self.assertEqual([2, 2], self.search('query', DedupIndex()))
+
+        with self.assertRaises(ValueError):
+            self.search('page', DedupIndex())
+
+    def test_search_twice(self):
+        se = self.create_engine()
+        se.set_archive(self.archive_file, 'replay')
+
+        # queryの範囲は検索ごとのため、同じクエリを繰り返し検索しても(共有のindexでも)除外しない
+        se.set_dedup('query')
+        self.assertEqual([2, 2], [len(se.search('zelda', maximum=2)) for _ in range(2)])
+
+        # runの範囲はindexが保持している間続く
+        se.set_dedup('run', DedupIndex())
+        self.assertEqual([2, 0], [len(se.search('zelda', maximum=2)) for _ in range(2)])
+
+
+class SaturationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+        # 5ページ分、同じ検索結果を返す
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        archive = ResponseArchive(self.archive_file, 'record')
+        gen_url = se.ENGINE.gen_search_url('zelda', 'text')
+        for _ in range(5):
+            method, url, data = next(gen_url)
+            archive.record(se.ENGINE, method, url, data, GOOGLE_HTML)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def search(self, pages: int, is_pending: bool = False):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_archive(self.archive_file, 'replay')
+        se.set_saturation(pages)
+
+        # lazy resolveで遷移先を取得中の状態にする
+        if is_pending:
+            processings_elist = se.ENGINE.processings_elist
+
+            def wrapper(elinks, etitles, etexts):
+                elinks, etitles, etexts = processings_elist(elinks, etitles, etexts)
+                se.ENGINE.PENDING_LINKS = set(elinks)
+                return elinks, etitles, etexts
+
+            se.ENGINE.processings_elist = wrapper  # type: ignore
+
+        return se.search('zelda', maximum=100)
+
+    def test_saturation(self):
+        # 新しいurlが含まれないページが2回続いた時点で終了する(3ページ目の結果は返さない)
+        self.assertEqual(4, len(self.search(2)))
+        self.assertEqual(2, len(self.search(1)))
+
+        # 無効の場合は記録したページがなくなるまで取得する
+        self.assertEqual(10, len(self.search(0)))
+
+        # 遷移先を取得中の検索結果しか無いページは、飽和の判定に数えない
+        self.assertEqual(10, len(self.search(2, is_pending=True)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_engine_common
+    * engine_commonモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import unittest
+
+from .common import Message
+from .engine_common import CommonEngine, compile_selector, parse_html_tree
+
+
+TEXT_HTML = """<?xml version="1.0" encoding="utf-8"?>
+<html><body><p class="summary">header</p><ol>
+<li><h2><a href="https://a.example/">A title</a></h2><div><p class="summary">A text</p></div></li>
+<li><h2><a href="https://b.example/">B title</a></h2></li>
+<li><h2><a href="https://c.example/">C <b>title</b></a></h2><div><p class="summary">C text</p></div></li>
+</ol></body></html>
+"""
+
+
+class CommonEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = CommonEngine()
+        self.engine.MESSAGE = Message()
+        self.engine.SOUP_SELECT_URL = 'h2 > a'
+        self.engine.SOUP_SELECT_TITLE = 'h2 > a'
+        self.engine.SOUP_SELECT_TEXT = 'li > div > .summary'
+
+    def test_compile_selector(self):
+        self.assertIs(compile_selector('h2 > a'), compile_selector('h2 > a'))
+        self.assertIsNone(compile_selector(''))
+
+    def test_get_text_links(self):
+        elinks, etitles, etexts = self.engine.get_text_links(
+            parse_html_tree(TEXT_HTML))
+
+        # textが存在しない検索結果があっても、link, title, textの組み合わせがずれない
+        self.assertEqual(
+            ['https://a.example/', 'https://b.example/', 'https://c.example/'], elinks)
+        self.assertEqual(['A title', 'B title', 'C title'], etitles)
+        self.assertEqual(['A text', '', 'C text'], etexts)
+
+    def test_get_text_links_empty(self):
+        self.assertEqual(
+            ([], [], []), self.engine.get_text_links(parse_html_tree('')))
+
+    def test_parse_html(self):
+        # 同じhtmlの場合は解析結果を使い回す
+        document = self.engine.parse_html(TEXT_HTML)
+        self.assertIs(document, self.engine.parse_html(TEXT_HTML))
+        self.assertIs(document.tree, document.tree)
+
+        self.engine.get_links('', TEXT_HTML, 'text')
+        self.assertIs(document, self.engine.DOCUMENT)
+
+    def test_check_recaptcha(self):
+        self.engine.SOUP_RECAPTCHA_TAG = '#captcha-form > #recaptcha'
+
+        # id, class名が含まれていない場合は解析を行わない
+        self.assertFalse(self.engine.check_recaptcha(TEXT_HTML))
+        self.assertFalse(self.engine.DOCUMENT.IS_PARSED)  # type: ignore
+
+        html = '<html><body><form id="captcha-form"><div id="recaptcha"></div></form></body></html>'
+        self.assertTrue(self.engine.check_recaptcha(html))
+
+        # 文字列として含まれているだけの場合はFalse
+        html = '<html><body><p>captcha-form recaptcha</p></body></html>'
+        self.assertFalse(self.engine.check_recaptcha(html))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_engine_google
+    * engine_googleモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import json
+import unittest
+
+from json.decoder import JSONDecodeError
+
+from .engine_google import pjson_loads
+
+
+class PjsonLoadsTestCase(unittest.TestCase):
+    def test_valid(self):
+        text = '[["a\\"b", "\\u00e9\\n", "c\\/d", "\\\\"]]'
+        self.assertEqual(json.loads(text), pjson_loads(text))
+
+    def test_invalid_escape(self):
+        # 不正なエスケープはバックスラッシュを残したまま読み込む
+        text = '["C:\\Users\\x", "\\\\x", "\\/", "a\\\nb"]'
+        self.assertEqual(['C:\\Users\\x', '\\x', '/', 'a\\\nb'], pjson_loads(text))
+
+    def test_many_invalid_escapes(self):
+        text = json.dumps(['\\d+'] * 10000).replace('\\\\', '\\')
+        self.assertEqual(['\\d+'] * 10000, pjson_loads(text))
+
+    def test_error(self):
+        # 不正なエスケープ以外のエラーはそのまま送出する
+        with self.assertRaises(JSONDecodeError):
+            pjson_loads('["a\\x", ')
+
+        with self.assertRaises(JSONDecodeError):
+            pjson_loads('["\\u00zz"]')
+
+
+if __name__ == '__main__':
+    unittest.main()
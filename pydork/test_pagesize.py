@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_pagesize
+    * pagesizeモジュール、1ページごとの件数の学習のテストコード.
+    * 検索はreplayモードで行うため、通信は発生しない.
+"""
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from urllib import parse
+
+from .engine import SearchEngine
+from .pagesize import PageSizeStore
+from .replay import ResponseArchive
+from .test_replay import GOOGLE_HTML
+
+
+class PageSizeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_file = os.path.join(self.tmpdir.name, 'page_size.json')
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def create_engine(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        return se
+
+    def gen_params(self, se, count: int):
+        gen_url = se.ENGINE.gen_search_url('zelda', 'text')
+        return [parse.parse_qs(parse.urlsplit(next(gen_url)[1]).query) for _ in range(count)]
+
+    def test_store(self):
+        se = self.create_engine()
+        store = PageSizeStore(self.store_file)
+
+        # 要求した件数を返した(TOLERANCE以上の)場合は学習しない
+        self.assertFalse(store.learn(se.ENGINE, 'text', 100, 90))
+        self.assertIsNone(store.get(se.ENGINE, 'text'))
+
+        self.assertTrue(store.learn(se.ENGINE, 'text', 100, 10))
+        self.assertEqual(10, store.get(se.ENGINE, 'text'))
+
+        # 返された件数の最大値を保持する(少ない件数では小さくならない)
+        self.assertFalse(store.learn(se.ENGINE, 'text', 100, 5))
+        self.assertEqual(10, store.get(se.ENGINE, 'text'))
+        self.assertTrue(store.learn(se.ENGINE, 'text', 100, 20))
+        self.assertEqual(20, store.get(se.ENGINE, 'text'))
+
+        # ファイルに保存される(lang, localeごと)
+        self.assertEqual(20, PageSizeStore(self.store_file).get(se.ENGINE, 'text'))
+        se.set_lang('en', 'US')
+        self.assertIsNone(store.get(se.ENGINE, 'text'))
+
+        # 有効期間を過ぎたものは使用しない
+        se.set_lang('ja', 'JP')
+        self.assertIsNone(PageSizeStore(self.store_file, ttl=-1).get(se.ENGINE, 'text'))
+
+    def test_search_url(self):
+        se = self.create_engine()
+        se.set_adaptive_page_size(self.store_file)
+
+        # 残りの必要件数までに抑える
+        se.ENGINE.PAGE_SIZE_LIMIT = 37
+        self.assertEqual(['37'], self.gen_params(se, 1)[0]['num'])
+
+        # 学習した件数ずつリクエストする
+        se.ENGINE.PAGE_SIZE_LIMIT = None
+        se.ENGINE.PAGE_SIZE_STORE.learn(se.ENGINE, 'text', 100, 10)
+        params = self.gen_params(se, 3)
+        self.assertEqual([['10']] * 3, [p['num'] for p in params])
+        self.assertEqual([['0'], ['10'], ['20']], [p['start'] for p in params])
+
+        # デフォルト以外の件数(学習した件数、残りの必要件数)で要求した場合は学習しない
+        se.ENGINE.learn_page_size('text', 10, 2)
+        se.ENGINE.PAGE_SIZE_LIMIT = 37
+        se.ENGINE.learn_page_size('text', 37, 2)
+        se.ENGINE.PAGE_SIZE_LIMIT = None
+        self.assertEqual(10, se.ENGINE.get_page_size('text'))
+
+        # 最大件数が要求どおりになった場合は、デフォルトの件数に戻す
+        se.ENGINE.learn_page_size('text', 100, 95)
+        self.assertEqual(100, se.ENGINE.get_page_size('text'))
+
+        # 無効の場合は変わらない
+        params = self.gen_params(self.create_engine(), 2)
+        self.assertEqual([['100']] * 2, [p['num'] for p in params])
+        self.assertEqual([['0'], ['100']], [p['start'] for p in params])
+
+    def test_search(self):
+        # 1ページ目で返された件数は、2ページ目にも検索結果があった時点で学習し、3ページ目から使用する
+        archive = ResponseArchive(self.archive_file, 'record')
+        se = self.create_engine()
+        for num, start in [(100, 0), (100, 100), (2, 102)]:
+            se.ENGINE.PAGE_SIZES = {'text': num}
+            method, url, data = next(se.ENGINE.gen_search_url('zelda', 'text'))
+            url = url.replace('start=0', 'start={0}'.format(start))
+            archive.record(se.ENGINE, method, url, data, GOOGLE_HTML)
+
+        se = self.create_engine()
+        se.set_archive(self.archive_file, 'replay')
+        se.set_saturation(0)
+        se.set_adaptive_page_size(self.store_file)
+        self.assertEqual(6, len(se.search('zelda', maximum=1000)))
+
+        with open(self.store_file) as f:
+            self.assertEqual([2], [v['size'] for v in json.load(f).values()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_ratelimit
+    * ratelimitモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import unittest
+
+from .engine_google import Google
+from .engine_bing import Bing
+from .ratelimit import TokenBucket, RateLimiter
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def test_burst(self):
+        bucket = TokenBucket(rate=1.0, burst=3)
+
+        # burst数までは待機なし
+        for _ in range(3):
+            self.assertEqual(0.0, bucket.reserve())
+
+        # burst数を超えた場合は、rateに応じて待機時間が伸びていく
+        self.assertAlmostEqual(1.0, bucket.reserve(), delta=0.1)
+        self.assertAlmostEqual(2.0, bucket.reserve(), delta=0.1)
+
+    def test_no_limit(self):
+        bucket = TokenBucket(rate=0, burst=1)
+
+        for _ in range(10):
+            self.assertEqual(0.0, bucket.reserve())
+
+    def test_set_rate(self):
+        bucket = TokenBucket(rate=0.1, burst=1)
+        bucket.reserve()
+        self.assertAlmostEqual(10.0, bucket.reserve(), delta=0.1)
+
+        bucket.set_rate(0)
+        self.assertEqual(0.0, bucket.reserve())
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_shared_bucket(self):
+        limiter = RateLimiter()
+
+        # 同一の検索エンジン・Proxyの場合は同じBucketを共有する
+        google1, google2 = Google(), Google()
+        self.assertIs(
+            limiter.get_bucket(google1, 'search'),
+            limiter.get_bucket(google2, 'search'),
+        )
+
+        # 検索エンジン・Proxy・リクエスト種別が異なる場合は別のBucket
+        google2.set_proxy('socks5://localhost:11080')
+        self.assertIsNot(
+            limiter.get_bucket(google1, 'search'),
+            limiter.get_bucket(google2, 'search'),
+        )
+        self.assertIsNot(
+            limiter.get_bucket(google1, 'search'),
+            limiter.get_bucket(google1, 'suggest'),
+        )
+        self.assertIsNot(
+            limiter.get_bucket(google1, 'search'),
+            limiter.get_bucket(Bing(), 'search'),
+        )
+
+    def test_default_rate(self):
+        limiter = RateLimiter()
+
+        bucket = limiter.get_bucket(Google(), 'search')
+        self.assertAlmostEqual(1 / 3, bucket.RATE)
+        self.assertEqual(1, bucket.BURST)
+
+    def test_set_rate_limit(self):
+        limiter = RateLimiter()
+        google, bing = Google(), Bing()
+
+        # 作成済みのBucketにも反映される
+        bucket = limiter.get_bucket(google, 'search')
+        limiter.set_rate_limit(5.0, burst=2, engine='Google')
+        self.assertEqual(5.0, bucket.RATE)
+        self.assertEqual(2, bucket.BURST)
+
+        # 他の検索エンジンには影響しない
+        self.assertAlmostEqual(1 / 3, limiter.get_bucket(bing, 'search').RATE)
+
+        # 検索エンジンの指定がない場合は全体に適用
+        limiter.set_rate_limit(0, engine=None, kind='search')
+        self.assertEqual(0, limiter.get_bucket(bing, 'search').RATE)
+        self.assertEqual(0, bucket.RATE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_replay
+    * replayモジュールのテストコード.
+    * 記録済みのレスポンスを再生するため、通信は発生しない.
+"""
+
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from .engine import SearchEngine
+from .ratelimit import RateLimiter
+from .replay import ResponseArchive
+
+
+GOOGLE_HTML = """<html><body><div id="main">
+<div><div>
+<div class="kCrYT"><a href="/url?q=a&url=https://a.example/"><h3><div>A title</div></h3></a></div>
+<div class="kCrYT"><div><div><div><div><div>A text</div></div></div></div></div></div>
+</div></div>
+<div><div>
+<div class="kCrYT"><a href="/url?q=b&url=https://b.example/"><h3><div>B title</div></h3></a></div>
+<div class="kCrYT"><div><div><div><div><div>B text</div></div></div></div></div></div>
+</div></div>
+</div></body></html>
+"""
+
+GOOGLE_SELENIUM_HTML = """<html><body>
+<div class="yuRUbf"><div><span><a href="https://a.example/"><h3>A title</h3></a></span></div></div>
+<div class="yXK7lf">A text</div>
+</body></html>
+"""
+
+
+class ReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self, se: SearchEngine, keyword: str, html: str):
+        # 1ページ目のレスポンスを記録する
+        method, url, data = next(se.ENGINE.gen_search_url(keyword, 'text'))
+        archive = ResponseArchive(self.archive_file, 'record')
+        archive.record(se.ENGINE, method, url, data, html)
+
+    def test_replay_search(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        self.record(se, 'zelda', GOOGLE_HTML)
+
+        se.set_archive(self.archive_file, 'replay')
+        result = se.search('zelda', maximum=10)
+
+        self.assertEqual(
+            ['https://a.example/', 'https://b.example/'], [d['link'] for d in result])
+        self.assertEqual(['A title', 'B title'], [d['title'] for d in result])
+        self.assertEqual(['A text', 'B text'], [d['text'] for d in result])
+        self.assertEqual([1, 2], [d['num'] for d in result])
+
+        # 検索結果はそのままjsonに変換できる
+        self.assertEqual(result, json.loads(json.dumps(result)))
+        self.assertEqual(result, json.loads(json.dumps(asyncio.run(se.asearch('zelda', maximum=10)))))
+
+    def test_replay_selenium(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        se.set_selenium()
+        self.record(se, 'zelda', GOOGLE_SELENIUM_HTML)
+
+        # replayモードではブラウザを起動しない
+        se.set_archive(self.archive_file, 'replay')
+        result = se.search('zelda', maximum=10)
+
+        self.assertFalse(hasattr(se.ENGINE, 'driver'))
+        self.assertEqual(['https://a.example/'], [d['link'] for d in result])
+
+    def test_replay_prefetch(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+
+        # ページごとに異なる検索結果を3ページ分記録する
+        archive = ResponseArchive(self.archive_file, 'record')
+        gen_url = se.ENGINE.gen_search_url('zelda', 'text')
+        for page in range(3):
+            method, url, data = next(gen_url)
+            html = GOOGLE_HTML.replace('a.example', 'a{0}.example'.format(page))
+            html = html.replace('b.example', 'b{0}.example'.format(page))
+            archive.record(se.ENGINE, method, url, data, html)
+
+        def search(is_prefetch: bool, is_async: bool = False):
+            se = SearchEngine()
+            se.set('google')
+            se.set_lang('ja', 'JP')
+            se.set_archive(self.archive_file, 'replay')
+            se.set_prefetch(is_prefetch)
+
+            # リクエストを行ったthreadを記録する
+            threads = []
+            get_result = se.ENGINE.get_result
+
+            def wrapper(*args, **kwargs):
+                threads.append(threading.current_thread().name)
+                return get_result(*args, **kwargs)
+
+            se.ENGINE.get_result = wrapper  # type: ignore
+
+            # NOTE: 1ページで終了すると見込まれる場合はprefetchを行わないため、maximumは1ページの件数より大きくする
+            if is_async:
+                result = asyncio.run(se.asearch('zelda', maximum=1000))
+            else:
+                result = se.search('zelda', maximum=1000)
+
+            return [(d['num'], d['link']) for d in result], threads
+
+        expected, threads = search(False)
+        self.assertEqual(6, len(expected))
+        self.assertFalse([t for t in threads if t.startswith('pydork_prefetch')])
+
+        # prefetchを行っても検索結果(順番)は変わらない
+        result, threads = search(True)
+        self.assertEqual(expected, result)
+        self.assertTrue([t for t in threads if t.startswith('pydork_prefetch')])
+
+        result, threads = search(True, is_async=True)
+        self.assertEqual(expected, result)
+
+    def test_prefetch_next_url(self):
+        def search(is_async: bool = False):
+            se = SearchEngine()
+            se.set('google')
+            se.set_lang('ja', 'JP')
+            se.set_cache(os.path.join(self.tmpdir.name, 'cache_{0}.sqlite3'.format(is_async)))
+            se.set_rate_limiter(RateLimiter())
+            se.set_rate_limit(0)
+            se.set_prefetch(True)
+
+            # 解析したページ数によって次のページのurlが変わる検索エンジンにする
+            parsed = []
+            get_links = se.ENGINE.get_links
+
+            def get_links_wrapper(*args):
+                parsed.append(args[0])
+                return get_links(*args)
+
+            def gen_search_url(keyword, search_type):
+                while True:
+                    yield 'GET', 'https://example.com/search?q={0}&parsed={1}'.format(keyword, len(parsed)), None
+
+            se.ENGINE.get_links = get_links_wrapper  # type: ignore
+            se.ENGINE.gen_search_url = gen_search_url  # type: ignore
+
+            # リクエストを送らずに、3ページ目まではページごとに異なるhtml、4ページ目は検索結果の無いhtmlを返す(通信は発生しない)
+            requests = []
+
+            def send_request(url, method='GET', data=None):
+                requests.append(url)
+                if len(requests) > 3:
+                    return '<html><body></body></html>'
+                return GOOGLE_HTML.replace('.example', '.{0}.example'.format(len(requests)))
+
+            se.ENGINE.send_request = send_request  # type: ignore
+
+            # htmlを解析したthreadを記録する
+            threads = []
+            parse_html = se.ENGINE.parse_html
+
+            def parse_html_wrapper(html):
+                threads.append(threading.current_thread().name)
+                return parse_html(html)
+
+            se.ENGINE.parse_html = parse_html_wrapper  # type: ignore
+
+            if is_async:
+                result = asyncio.run(se.asearch('zelda', maximum=1000))
+            else:
+                result = se.search('zelda', maximum=1000)
+
+            se.ENGINE.CACHE.close()  # type: ignore
+            return result, requests, threads
+
+        for is_async in [False, True]:
+            result, requests, threads = search(is_async)
+
+            # 次のページのurlは解析後に取得するため、必要なページだけを正しいurlでリクエストする
+            # (検索結果の無いページの後にはリクエストしない)
+            self.assertEqual(6, len(result))
+            self.assertEqual(
+                ['https://example.com/search?q=zelda&parsed={0}'.format(n) for n in range(4)], requests)
+
+            # prefetchしたレスポンスの解析(キャッシュ保存時のReCaptchaの識別を含む)は、prefetchのthreadでは行わない
+            self.assertTrue(threads)
+            self.assertFalse([t for t in threads if t.startswith('pydork_prefetch')])
+
+    def test_replay_asearch_concurrent(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        self.record(se, 'zelda', GOOGLE_HTML)
+        self.record(se, 'mario', GOOGLE_HTML.replace('.example', '.mario.example'))
+
+        se.set_archive(self.archive_file, 'replay')
+
+        # リクエストを行ったthreadを記録する
+        threads = []
+        get_result = se.ENGINE.get_result
+
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return get_result(*args, **kwargs)
+
+        se.ENGINE.get_result = wrapper  # type: ignore
+
+        # 検索の開始・終了を記録する
+        events = []
+        start_search, finish_search = se._start_search, se._finish_search
+        se._start_search = lambda *args: events.append('start') or start_search(*args)  # type: ignore
+        se._finish_search = lambda *args: events.append('finish') or finish_search(*args)  # type: ignore
+
+        # 同じSearchEngineで同時に実行しても、1クエリずつ実行され、クエリごとの検索結果は混ざらない
+        async def main():
+            return await asyncio.gather(*[se.asearch(keyword, maximum=10) for keyword in ['zelda', 'mario', 'zelda']])
+
+        zelda, mario, _ = asyncio.run(main())
+        self.assertEqual(['https://a.example/', 'https://b.example/'], [d['link'] for d in zelda])
+        self.assertEqual(['https://a.mario.example/', 'https://b.mario.example/'], [d['link'] for d in mario])
+        self.assertEqual(['start', 'finish'] * 3, events)
+
+        # ブロッキング処理はloopのデフォルトのexecutorではなく、専用のthread poolで実行する
+        self.assertTrue(threads)
+        self.assertTrue(all(t.startswith('pydork_async') for t in threads))
+
+    def test_replay_not_found(self):
+        archive = ResponseArchive(self.archive_file, 'record')
+        se = SearchEngine()
+        se.set('google')
+        archive.record(se.ENGINE, 'GET', 'https://example.com/1', None, 'first')
+        archive.record(se.ENGINE, 'GET', 'https://example.com/1', None, 'second')
+
+        # 同じリクエストは記録された順に返し、記録されていない場合はブランク
+        archive = ResponseArchive(self.archive_file, 'replay')
+        self.assertEqual('first', archive.replay(se.ENGINE, 'GET', 'https://example.com/1'))
+        self.assertEqual('second', archive.replay(se.ENGINE, 'GET', 'https://example.com/1'))
+        self.assertEqual('second', archive.replay(se.ENGINE, 'GET', 'https://example.com/1'))
+        self.assertEqual('', archive.replay(se.ENGINE, 'GET', 'https://example.com/2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
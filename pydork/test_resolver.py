@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_resolver
+    * resolverモジュールのテストコード.
+    * 遷移先の取得には通信を行わない関数を使用するため、通信は発生しない.
+"""
+
+
+import contextlib
+import io
+import threading
+import unittest
+import requests
+
+from .resolver import RedirectResolver
+from .engine_bing import is_redirect_link as is_bing_redirect_link
+from .engine_baidu import is_redirect_link as is_baidu_redirect_link
+
+
+class RedirectResolverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def extract(self, session, url, timeout):
+        with self.lock:
+            self.calls.append(url)
+        return url.replace('/link/', '/target/')
+
+    def test_resolve(self):
+        resolver = RedirectResolver(max_workers=4)
+        urls = ['https://a.example/link/1', 'https://b.example/page',
+                'https://a.example/link/2', 'https://a.example/link/1']
+
+        result = resolver.resolve(
+            urls, self.extract, is_target=lambda url: '/link/' in url)
+
+        # 順番は維持し、対象外のurlはそのまま
+        self.assertEqual([
+            'https://a.example/target/1', 'https://b.example/page',
+            'https://a.example/target/2', 'https://a.example/target/1',
+        ], result)
+
+        # 同じurlは1度だけ取得し、2回目以降はキャッシュを使用する
+        self.assertEqual(2, len(self.calls))
+        resolver.resolve(urls, self.extract, is_target=lambda url: '/link/' in url)
+        self.assertEqual(2, len(self.calls))
+
+    def test_cache(self):
+        resolver = RedirectResolver(max_workers=1, cache_size=2, cache_ttl=-1)
+        resolver.resolve(['https://a.example/link/1'], self.extract)
+        resolver.resolve(['https://a.example/link/1'], self.extract)
+
+        # 期限切れのキャッシュは使用しない
+        self.assertEqual(2, len(self.calls))
+
+        # 上限を超えた場合は古いものから削除する
+        resolver.CACHE_TTL = 60
+        resolver.resolve(
+            ['https://a.example/link/{0}'.format(n) for n in range(3)], self.extract)
+        self.assertEqual(
+            ['https://a.example/link/1', 'https://a.example/link/2'], list(resolver.CACHE))
+
+    def test_retry(self):
+        resolver = RedirectResolver(retries=2, backoff=0)
+
+        def extract(session, url, timeout):
+            with self.lock:
+                self.calls.append(url)
+            raise requests.ConnectionError()
+
+        # リトライ回数を超えた場合は元のurlを返す(キャッシュはしない)
+        self.assertEqual(
+            ['https://a.example/link/1'], resolver.resolve(['https://a.example/link/1'], extract))
+        self.assertEqual(3, len(self.calls))
+        self.assertEqual(0, len(resolver.CACHE))
+
+    def test_lazy_resolve(self):
+        resolver = RedirectResolver(max_workers=2)
+        event = threading.Event()
+
+        def extract(session, url, timeout):
+            event.wait(5)
+            return self.extract(session, url, timeout)
+
+        urls = ['https://a.example/link/1', 'https://b.example/page']
+        submitted = resolver.submit_links(
+            urls, extract, is_target=lambda url: '/link/' in url)
+        self.assertEqual(['https://a.example/link/1'], submitted)
+
+        # 取得が完了するまではpendingのまま返す
+        results = [{'link': url, 'status': 'pending'} for url in submitted]
+        results.append({'link': 'https://b.example/page'})
+        resolver.resolve_result(results[0], timeout=0)
+        self.assertEqual('pending', results[0]['status'])
+        self.assertEqual('https://a.example/link/1', results[0]['link'])
+
+        # 完了を待ってlinkを置き換える(対象外のものはそのまま)
+        event.set()
+        for d in results:
+            resolver.resolve_result(d)
+        self.assertEqual(
+            {'link': 'https://a.example/target/1', 'status': 'resolved'}, results[0])
+        self.assertEqual({'link': 'https://b.example/page'}, results[1])
+
+    def test_extract_error(self):
+        resolver = RedirectResolver(retries=2, backoff=0)
+
+        def extract(session, url, timeout):
+            with self.lock:
+                self.calls.append(url)
+            raise ValueError('parse error')
+
+        # 通信以外のエラーはリトライせず、元のurlを返す
+        urls = ['https://a.example/link/1']
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(urls, resolver.resolve(urls, extract))
+            resolver.submit_links(['https://a.example/link/2'], extract)
+            self.assertEqual('https://a.example/link/2', resolver.wait('https://a.example/link/2'))
+        self.assertEqual(['https://a.example/link/1', 'https://a.example/link/2'], self.calls)
+
+    def test_wait_evicted(self):
+        resolver = RedirectResolver(max_workers=1, cache_size=1)
+        urls = ['https://a.example/link/{0}'.format(n) for n in range(2)]
+        resolver.submit_links(urls, self.extract)
+
+        # キャッシュから削除済みでも、取得した遷移先を返す
+        self.assertEqual('https://a.example/target/1', resolver.wait(urls[1]))
+        resolver.CACHE.clear()
+        self.assertEqual('https://a.example/target/1', resolver.wait(urls[1]))
+
+    def test_is_redirect_link(self):
+        self.assertTrue(is_bing_redirect_link('https://www.bing.com/ck/a?!&&p=abc'))
+        self.assertFalse(is_bing_redirect_link('https://example.com/ck/a'))
+        self.assertTrue(is_baidu_redirect_link('http://www.baidu.com/link?url=abc'))
+        self.assertFalse(is_baidu_redirect_link('https://example.com/link?url=abc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_result
+    * resultモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import json
+import unittest
+
+from .common import set_counter
+from .result import SearchResult, ResultBatch
+
+
+class SearchResultTestCase(unittest.TestCase):
+    def test_mapping(self):
+        d = SearchResult(link='https://a.example/', title='A title')
+
+        # dictと同様にアクセスできる(値がNoneのフィールドは存在しないキーとして扱う)
+        self.assertEqual('https://a.example/', d['link'])
+        self.assertIn('title', d)
+        self.assertNotIn('text', d)
+        self.assertIsNone(d.get('text'))
+        with self.assertRaises(KeyError):
+            d['text']
+
+        d['num'] = 1
+        self.assertEqual({'link': 'https://a.example/', 'title': 'A title', 'num': 1}, d)
+        self.assertEqual(
+            {'engine': 'google', 'link': 'https://a.example/', 'title': 'A title', 'num': 1},
+            dict({'engine': 'google'}, **d))
+        self.assertEqual(
+            '{"link": "https://a.example/", "title": "A title", "num": 1}', json.dumps(d.to_dict()))
+
+        # 未定義のフィールドは追加できない
+        with self.assertRaises(KeyError):
+            d['unknown'] = 1
+
+        self.assertFalse(hasattr(d, '__dict__'))
+
+        # 複製は元の検索結果に影響しない
+        c = d.copy()
+        c['link'] = 'https://b.example/'
+        self.assertIsInstance(c, SearchResult)
+        self.assertEqual('https://a.example/', d['link'])
+
+    def test_set_counter(self):
+        links = [SearchResult(link='https://a.example/'), SearchResult(link='https://b.example/')]
+        self.assertIs(links, set_counter(links, 3))
+        self.assertEqual([3, 4], [d['num'] for d in links])
+
+
+class ResultBatchTestCase(unittest.TestCase):
+    def test_batch(self):
+        batch = ResultBatch([
+            SearchResult(link='https://a.example/', title='A title', num=1),
+            {'link': 'https://b.example/', 'num': 2},
+        ])
+
+        self.assertEqual(2, len(batch))
+        self.assertEqual(['https://a.example/', 'https://b.example/'], batch.column('link'))
+        self.assertEqual(['A title', None], batch.column('title'))
+        self.assertEqual({'link': 'https://b.example/', 'num': 2}, batch[1])
+        self.assertEqual([
+            {'link': 'https://a.example/', 'title': 'A title', 'num': 1},
+            {'link': 'https://b.example/', 'num': 2},
+        ], batch.to_dicts())
+
+
+if __name__ == '__main__':
+    unittest.main()
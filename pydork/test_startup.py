@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_startup
+    * 起動時に読み込むモジュールのテストコード(`python -X importtime` で計測する).
+    * 通信は発生しない.
+"""
+
+
+import json
+import subprocess
+import sys
+import unittest
+
+
+# 起動時に読み込まないモジュール(Selenium, Splashなどを使用する場合のみ読み込む)
+LAZY_MODULES = [
+    'selenium', 'seleniumrequests', 'chromedriver_autoinstaller', 'geckodriver_autoinstaller',
+    'fake_useragent', 'jinja2', 'pkg_resources',
+]
+
+# 起動時に読み込まないモジュール(検索・キャッシュ・asyncio版の処理などを使用する場合のみ読み込む)
+DEFERRED_MODULES = ['requests', 'bs4', 'lxml', 'asyncio', 'sqlite3']
+
+# import時間の予算の基準(以前のバージョンで `import pydork` 時に読み込んでいたモジュール)
+BUDGET_STATEMENT = 'import requests, bs4'
+
+
+# 新しいプロセスで処理を実行し、読み込んだモジュールのlistと、`-X importtime` で計測したimport時間(µs)を返す
+# (`importlib.import_module` で読み込んだモジュールは `-X importtime` に出力されないため、モジュールはsys.modulesから取得する)
+def importtime(statement: str):
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         statement + '; import json, sys; print(json.dumps(sorted(sys.modules)))'],
+        capture_output=True, text=True, check=True,
+    )
+
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        # 最上位の階層のcumulativeの合計をimport時間とする
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            total += int(cumulative_us)
+
+    return json.loads(proc.stdout.splitlines()[-1]), total
+
+
+class StartupTestCase(unittest.TestCase):
+    def assertNotImported(self, modules: list, names: list):
+        imported = [m for m in modules if m.split('.')[0] in names]
+        self.assertEqual([], imported)
+
+    def test_import(self):
+        modules, total = importtime('import pydork')
+        self.assertIn('pydork', modules)
+        self.assertGreater(total, 0)
+
+        # 検索エンジンのモジュールは、使用する検索エンジンを指定するまで読み込まない
+        self.assertEqual([], [m for m in modules if m.startswith('pydork.engine_')])
+        self.assertNotImported(modules, LAZY_MODULES + DEFERRED_MODULES)
+        self.assertNotIn('pydork.resolver', modules)
+        self.assertNotIn('pydork.cache', modules)
+        self.assertNotIn('pydork.replay', modules)
+
+    def test_import_budget(self):
+        # 計測のばらつきを抑えるため、それぞれ3回計測した最小値で比較する
+        budget = min(importtime(BUDGET_STATEMENT)[1] for _ in range(3))
+        total = min(importtime('import pydork')[1] for _ in range(3))
+
+        # `import pydork` は、以前のバージョンで読み込んでいたモジュールのimportより短い時間で完了する
+        self.assertLess(total, budget)
+
+    def test_set_engine(self):
+        modules, _ = importtime(
+            'from pydork.engine import SearchEngine; SearchEngine().set("google")')
+
+        # 指定した検索エンジンのモジュールのみ読み込む
+        self.assertIn('pydork.engine_google', modules)
+        self.assertNotIn('pydork.engine_bing', modules)
+        self.assertNotImported(modules, LAZY_MODULES + ['bs4', 'asyncio'])
+
+        # bs4は解析時に必要な場合のみ読み込む
+        for engine in ['baidu', 'bing', 'yahoo']:
+            modules, _ = importtime(
+                'from pydork.engine import SearchEngine; SearchEngine().set("{0}")'.format(engine))
+            self.assertNotImported(modules, ['bs4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
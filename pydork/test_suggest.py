@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_suggest
+    * サジェスト取得のテストコード.
+    * 記録済みのレスポンスを再生するため、通信は発生しない.
+"""
+
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from xml.sax.saxutils import quoteattr
+
+from .engine import SearchEngine
+from .replay import ResponseArchive
+
+
+# Googleのサジェストのレスポンス
+def gen_google_suggest_xml(words: list):
+    suggestions = ''.join(
+        '<CompleteSuggestion><suggestion data={0}/></CompleteSuggestion>'.format(quoteattr(w)) for w in words)
+    return '<?xml version="1.0"?><toplevel>{0}</toplevel>'.format(suggestions)
+
+
+class SuggestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+        # キーワードに追加する文字ごとに、異なるサジェストを記録する
+        se = self.create_engine()
+        archive = ResponseArchive(self.archive_file, 'record')
+        for char in SearchEngine._gen_suggest_chars(alph=True):
+            url = se.ENGINE.gen_suggest_url('zelda' + char)
+            html = gen_google_suggest_xml(['zelda{0} 1'.format(char), 'zelda{0} 2'.format(char)])
+            archive.record(se.ENGINE, 'GET', url, None, html)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def create_engine(self):
+        se = SearchEngine()
+        se.set('google')
+        se.set_lang('ja', 'JP')
+        return se
+
+    def suggest(self, workers: int, is_async: bool = False):
+        se = self.create_engine()
+        se.set_archive(self.archive_file, 'replay')
+        se.set_suggest_workers(workers)
+
+        # リクエストを行ったthreadを記録する
+        threads = set()
+        get_result = se.ENGINE.get_result
+
+        def recorded_get_result(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return get_result(*args, **kwargs)
+
+        se.ENGINE.get_result = recorded_get_result
+
+        if is_async:
+            result = asyncio.run(se.asuggest('zelda', alph=True))
+        else:
+            result = se.suggest('zelda', alph=True)
+
+        return result, threads
+
+    def test_suggest(self):
+        expected, threads = self.suggest(1)
+        self.assertEqual(['', ' '] + list('abcdefghijklmnopqrstuvwxyz'), list(expected))
+        self.assertEqual(['zelda a 1', 'zelda a 2'], expected['a'])
+        self.assertEqual({threading.current_thread().name}, threads)
+
+        # 並行してリクエストを行っても、結果(文字の順)は変わらない
+        result, threads = self.suggest(8)
+        self.assertEqual(list(expected.items()), list(result.items()))
+        self.assertTrue(all(name.startswith('pydork_suggest') for name in threads))
+
+        result, threads = self.suggest(8, is_async=True)
+        self.assertEqual(list(expected.items()), list(result.items()))
+
+
+class SuggestCrawlTestCase(unittest.TestCase):
+    # キーワードごとのサジェスト(キーワードに追加する文字 '', ' ' ごと)
+    GRAPH = {
+        'zelda': [['zelda switch', 'zelda botw'], ['zelda switch', 'zelda totk']],
+        'zelda switch': [['zelda switch 2', 'Zelda  BOTW'], []],
+        'zelda botw': [['zelda botw map'], ['zelda']],
+        'zelda totk': [['zelda totk map', 'zelda switch 2'], []],
+    }
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.archive_file = os.path.join(self.tmpdir.name, 'google.jsonl.gz')
+
+        se = SearchEngine()
+        se.set('google')
+        archive = ResponseArchive(self.archive_file, 'record')
+        for keyword, suggests in self.GRAPH.items():
+            for char, words in zip(['', ' '], suggests):
+                url = se.ENGINE.gen_suggest_url(keyword + char)
+                archive.record(se.ENGINE, 'GET', url, None, gen_google_suggest_xml(words))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def crawl(self, depth: int, maximum: int = 0, is_async: bool = False):
+        se = SearchEngine()
+        se.set('google')
+        se.set_archive(self.archive_file, 'replay')
+
+        # 取得したキーワードを記録する
+        expanded = []
+        get_suggests = se._get_suggests
+
+        def recorded_get_suggests(keyword, chars):
+            expanded.append(keyword)
+            return get_suggests(keyword, chars)
+
+        se._get_suggests = recorded_get_suggests
+
+        if is_async:
+            async def collect():
+                return [d async for d in se.aiter_suggest_crawl('zelda', depth=depth, maximum=maximum)]
+
+            return asyncio.run(collect()), expanded
+
+        return list(se.iter_suggest_crawl('zelda', depth=depth, maximum=maximum)), expanded
+
+    def test_crawl(self):
+        result, expanded = self.crawl(1)
+        self.assertEqual(['zelda switch', 'zelda botw', 'zelda totk'], [d['suggest'] for d in result])
+        self.assertEqual(['zelda'], expanded)
+
+        # 重複したサジェスト(大文字・小文字、空白の違いを含む)は出力・取得しない
+        result, expanded = self.crawl(2)
+        self.assertEqual([
+            ('zelda switch', 'zelda', 1),
+            ('zelda botw', 'zelda', 1),
+            ('zelda totk', 'zelda', 1),
+            ('zelda switch 2', 'zelda switch', 2),
+            ('zelda botw map', 'zelda botw', 2),
+            ('zelda totk map', 'zelda totk', 2),
+        ], [(d['suggest'], d['parent'], d['depth']) for d in result])
+        self.assertEqual(['zelda', 'zelda switch', 'zelda botw', 'zelda totk'], expanded)
+
+        self.assertEqual(4, len(self.crawl(2, maximum=4)[0]))
+
+        async_result, _ = self.crawl(2, is_async=True)
+        self.assertEqual(result, async_result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""test_useragent
+    * useragentモジュールのテストコード.
+    * 通信は発生しない.
+"""
+
+
+import subprocess
+import sys
+import unittest
+
+from .engine import SearchEngine
+from .useragent import DEFAULT_USER_AGENT, UserAgentPool, get_user_agent_pool
+
+
+DATABASE = {
+    'version': 'test',
+    'user_agents': [
+        {'browser': 'chrome', 'platform': 'windows', 'weight': 3, 'user_agent': 'chrome-ua'},
+        {'browser': 'firefox', 'platform': 'linux', 'weight': 1, 'user_agent': 'firefox-ua'},
+        {'browser': 'safari', 'platform': 'macos', 'weight': 0, 'user_agent': 'safari-ua'},
+    ],
+}
+
+
+class UserAgentPoolTestCase(unittest.TestCase):
+    def test_choice(self):
+        pool = UserAgentPool(DATABASE)
+
+        self.assertEqual('firefox-ua', pool.choice('firefox'))
+
+        # weightが0のもの、該当するブラウザが無い場合は全体から選択する
+        self.assertIn(pool.choice('safari'), ['chrome-ua', 'firefox-ua'])
+        self.assertEqual({'chrome-ua', 'firefox-ua'}, {pool.choice() for _ in range(200)})
+
+        self.assertEqual(DEFAULT_USER_AGENT, UserAgentPool({}).choice())
+
+    def test_sticky(self):
+        pool = UserAgentPool(DATABASE)
+
+        # 同じkeyに対しては常に同じUser Agentを選択する
+        keys = ['cookie-{0}'.format(i) for i in range(20)]
+        selected = [pool.choice(key=key) for key in keys]
+        self.assertEqual(selected, [pool.choice(key=key) for key in keys])
+        self.assertEqual({'chrome-ua', 'firefox-ua'}, set(selected))
+
+    def test_bundled_database(self):
+        # 同梱しているデータベースはプロセス内で1度だけ読み込む
+        pool = get_user_agent_pool()
+        self.assertIs(pool, get_user_agent_pool())
+        self.assertNotEqual('', pool.VERSION)
+        self.assertTrue(pool.ENTRIES)
+        self.assertTrue(pool.choice('chrome').startswith('Mozilla/5.0'))
+
+
+class SetUserAgentTestCase(unittest.TestCase):
+    def test_set_user_agent(self):
+        se = SearchEngine()
+        se.set('google')
+
+        se.set_user_agent('test-ua')
+        self.assertEqual('test-ua', se.ENGINE.USER_AGENT)
+
+        # Googleをrequestsで使用する場合は、解析処理が前提とするモバイルのUser Agentを使用する
+        se.set_user_agent()
+        self.assertEqual(DEFAULT_USER_AGENT, se.ENGINE.USER_AGENT)
+        se.set_user_agent(sticky_key='~/.pydork_cookies/.google_requests_cookies')
+        self.assertEqual(DEFAULT_USER_AGENT, se.ENGINE.USER_AGENT)
+
+        se = SearchEngine()
+        se.set('bing')
+        se.set_user_agent(sticky_key='~/.pydork_cookies/.bing_requests_cookies')
+        user_agent = se.ENGINE.USER_AGENT
+        se.set_user_agent(sticky_key='~/.pydork_cookies/.bing_requests_cookies')
+        self.assertEqual(user_agent, se.ENGINE.USER_AGENT)
+        self.assertNotEqual(DEFAULT_USER_AGENT, user_agent)
+
+        # Splashを使用する場合はデータベースから選択する
+        se = SearchEngine()
+        se.set('google')
+        se.set_splash('localhost:8050')
+        se.set_user_agent()
+        self.assertNotEqual(DEFAULT_USER_AGENT, se.ENGINE.USER_AGENT)
+
+    def test_no_fake_useragent(self):
+        # User Agentの選択でfake_useragentを読み込まない
+        proc = subprocess.run(
+            [sys.executable, '-c',
+             'import sys; from pydork.engine import SearchEngine; se = SearchEngine(); se.set("google"); '
+             'se.set_user_agent(); print("fake_useragent" in sys.modules)'],
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual('False', proc.stdout.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Blacknon. All rights reserved.
+# Use of this source code is governed by an MIT license
+# that can be found in the LICENSE file.
+# =======================================================
+
+
+"""useragent
+    * パッケージに同梱したUser Agentのデータベース(`data/user_agents.json`)から、重み付きでUser Agentを選択する `UserAgentPool` を持つモジュール.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+
+
+# 同梱しているUser Agentのデータベース
+USER_AGENTS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'user_agents.json')
+
+# データベースが読み込めない場合に使用するUser Agent
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Linux; Android 10; SM-A205U) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.131 Mobile Safari/537.36.'
+
+
+# User Agentを重み付きで選択するClass
+class UserAgentPool:
+    """UserAgentPool
+
+    User Agentのデータベース(`{'version': ..., 'user_agents': [{'browser', 'platform', 'weight', 'user_agent'}, ...]}`)から、
+    weightに応じてランダムにUser Agentを選択するClass. 通信は行わない.
+    keyを指定した場合は、同じkey(sessionやcookieファイル)に対して常に同じUser Agentを選択する(sticky).
+
+    Examples:
+        pool = get_user_agent_pool()
+        user_agent = pool.choice('chrome')
+        user_agent = pool.choice(key='~/.pydork_cookies/.google_requests_cookies')
+    """
+
+    def __init__(self, database: dict):
+        """[summary]
+
+        Args:
+            database (dict): User Agentのデータベース.
+        """
+
+        self.VERSION = database.get('version', '')
+        self.ENTRIES = [d for d in database.get('user_agents', []) if d.get('weight', 0) > 0]
+
+    # User Agentを選択する
+    def choice(self, browser: str = None, key: str = None):  # type: ignore
+        """choice
+
+        Args:
+            browser (str, optional): ブラウザ([chrome, firefox, edge, safari]). 該当するものが無い場合は全体から選択する. Defaults to None.
+            key (str, optional): stickyにする場合のkey(同じkeyに対しては、プロセスをまたいでも同じUser Agentを選択する). Defaults to None.
+
+        Returns:
+            str: User Agent.
+        """
+
+        entries = [d for d in self.ENTRIES if d['browser'] == browser] or self.ENTRIES
+        if not entries:
+            return DEFAULT_USER_AGENT
+
+        # keyを指定した場合は、keyとデータベースのversionから乱数のseedを生成する
+        rng = random
+        if key is not None:
+            seed = hashlib.blake2b(
+                '{0}\0{1}'.format(self.VERSION, key).encode('utf-8'), digest_size=8).digest()
+            rng = random.Random(int.from_bytes(seed, 'big'))
+
+        return rng.choices(entries, weights=[d['weight'] for d in entries])[0]['user_agent']
+
+
+# プロセス内で共有するUserAgentPool(最初に使用した時点で1度だけ読み込む)
+USER_AGENT_POOL = None
+USER_AGENT_POOL_LOCK = threading.Lock()
+
+
+# UserAgentPoolを取得する
+def get_user_agent_pool():
+    """get_user_agent_pool
+
+    同梱しているデータベースを読み込んだUserAgentPoolを返す(プロセス内で1度だけ読み込む).
+
+    Returns:
+        UserAgentPool: UserAgentPool.
+    """
+
+    global USER_AGENT_POOL
+
+    with USER_AGENT_POOL_LOCK:
+        if USER_AGENT_POOL is None:
+            try:
+                with open(USER_AGENTS_FILE) as f:
+                    database = json.load(f)
+            except (OSError, ValueError):
+                database = dict()
+
+            USER_AGENT_POOL = UserAgentPool(database)
+
+    return USER_AGENT_POOL
@@ -102,8 +102,8 @@ if __name__ == "__main__":
             'get-gecko-driver',
             'chromedriver_autoinstaller',
             'geckodriver_autoinstaller',
-            'fake_useragent',
             'lxml',
+            'cssselect',
             'requests[socks]',
             'selenium==4.7.2',
             'selenium_requests',
@@ -113,7 +113,8 @@ if __name__ == "__main__":
             'sphinx-autobuild'
         ],
         url='https://github.com/blacknon/pydork',
-        packages=setuptools.find_packages(),
+        packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
+        package_data={'pydork': ['data/*.json']},
         py_modules=['pydork'],
         entry_points={
             'console_scripts': [